@@ -0,0 +1,278 @@
+import argparse
+import json
+import os
+import re
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is an optional dependency (the "columnar" extra)
+    pa = None
+
+from .metrics_reader import LOGS_DIRECTORY, discover_runs, is_up_to_date, mean_user_delays, read_run, run_inputs
+
+AVAILABLE = pa is not None  # Whether runs can be aggregated (pyarrow is installed)
+AGGREGATES_DIRECTORY = "logs/aggregates"
+RUN_METADATA_FILE = "run.json"  # Parameters of a run, written to its logs directory when it finishes
+UNKNOWN_SCENARIO = "unknown"
+
+# Runs are partitioned by configuration ("<series>/distance_threshold=0.6/migration_recency_threshold=8/scenario=.../"),
+# with one file per run whose rows are sorted by time step
+PARTITION_COLUMNS = ["distance_threshold", "migration_recency_threshold", "scenario"]
+RUN_COLUMN = "Run"
+
+# Logs directories written before runs had metadata: ".../[scenario-<name>_...]/<d>dist-<r>migr-<s>steps/<timestamp>"
+RUN_DIRECTORY_PATTERN = re.compile(
+    r"(?P<distance_threshold>[\d.]+)dist-(?P<migration_recency_threshold>\d+)migr-(?P<steps_limit>\d+)steps"
+)
+SCENARIO_DIRECTORY_PATTERN = re.compile(r"scenario-(?P<scenario>[^_/]+)")
+
+# Series extracted from each run (see "metrics_reader.read_run"), by name
+AGGREGATE_SERIES: dict[str, Callable[[dict], pd.DataFrame]] = {
+    "service_distance": lambda run: run["services"][["Time Step", "Instance ID", "Total Distance From Users"]],
+    "edge_server_resources": lambda run: run["edge_servers"][["Time Step", "Instance ID", "Model Name", "Resources Score"]],
+    # Mean delay of each user over its applications (infinite if any delay is)
+    "user_delay": lambda run: mean_user_delays(run["user_delays"]).reset_index(),
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError('The aggregate store requires pyarrow (install the "columnar" extra)')
+
+
+def partitioning() -> "ds.Partitioning":
+    # Explicit types, otherwise hexadecimal scenario fingerprints made only of digits would be read as integers
+    schema = pa.schema(
+        [("distance_threshold", pa.float64()), ("migration_recency_threshold", pa.int64()), ("scenario", pa.string())]
+    )
+    return ds.partitioning(schema, flavor="hive")
+
+
+def write_run_metadata(logs_directory: str, metadata: dict):
+    """Records the parameters of a run (thresholds, steps limit, scenario fingerprint, ...) in its logs directory."""
+    os.makedirs(logs_directory, exist_ok=True)
+    with open(os.path.join(logs_directory, RUN_METADATA_FILE), "w", encoding="UTF-8") as output_file:
+        json.dump(metadata, output_file, indent=4)
+
+
+def run_metadata(run_directory: str) -> dict:
+    """Reads the parameters of a run, parsing them out of the logs directory path for runs without metadata.
+
+    Args:
+        run_directory (str): Logs directory of the run.
+
+    Returns:
+        metadata (dict): Parameters of the run (at least "distance_threshold", "migration_recency_threshold" and
+            "scenario").
+    """
+    metadata_path = os.path.join(run_directory, RUN_METADATA_FILE)
+    if os.path.exists(metadata_path):
+        with open(metadata_path, encoding="UTF-8") as input_file:
+            metadata = json.load(input_file)
+    else:
+        match = RUN_DIRECTORY_PATTERN.search(run_directory)
+        if match is None:
+            raise ValueError(f"Run parameters of {run_directory} are unknown (no {RUN_METADATA_FILE})")
+        scenario = SCENARIO_DIRECTORY_PATTERN.search(run_directory)
+        metadata = {
+            "distance_threshold": float(match["distance_threshold"]),
+            "migration_recency_threshold": int(match["migration_recency_threshold"]),
+            "steps_limit": int(match["steps_limit"]),
+            "scenario": scenario["scenario"] if scenario is not None else None,
+        }
+    if metadata.get("scenario") is None:
+        metadata["scenario"] = UNKNOWN_SCENARIO
+    return metadata
+
+
+def aggregate_path(store_directory: str, series: str, metadata: dict, run_name: str) -> str:
+    return os.path.join(
+        store_directory,
+        series,
+        f"distance_threshold={float(metadata['distance_threshold'])}",
+        f"migration_recency_threshold={int(metadata['migration_recency_threshold'])}",
+        f"scenario={metadata['scenario']}",
+        f"{run_name}.parquet",
+    )
+
+
+def aggregate_run(
+    run_directory: str, store_directory: str = AGGREGATES_DIRECTORY, run: dict | None = None, force: bool = False
+) -> bool:
+    """Adds the AGGREGATE_SERIES of a finished run to the store, unless they are newer than the run metrics.
+
+    Args:
+        run_directory (str): Logs directory of the run.
+        store_directory (str, optional): Root of the store. Defaults to AGGREGATES_DIRECTORY.
+        run (dict | None, optional): Metrics of the run, if already read (see "metrics_reader.read_run"). Defaults to None.
+        force (bool, optional): Whether up-to-date series are extracted again. Defaults to False.
+
+    Returns:
+        aggregated (bool): Whether the series of the run were written.
+    """
+    _require_pyarrow()
+    metadata = run_metadata(run_directory)
+    run_name = os.path.basename(os.path.normpath(run_directory))  # Timestamp of the run
+    paths = {series: aggregate_path(store_directory, series, metadata, run_name) for series in AGGREGATE_SERIES}
+    if not force and is_up_to_date(list(paths.values()), run_inputs(run_directory)):
+        return False
+
+    if run is None:
+        run = read_run(run_directory)
+    for series, extract in AGGREGATE_SERIES.items():
+        df = extract(run).sort_values("Time Step", kind="stable")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.append_column(RUN_COLUMN, pa.array([run_name] * len(df), type=pa.string()).dictionary_encode())
+
+        # Files starting with "." are skipped by dataset discovery, so queries never see a partially written file
+        directory, file_name = os.path.split(paths[series])
+        os.makedirs(directory, exist_ok=True)
+        pq.write_table(table, os.path.join(directory, f".{file_name}.tmp"))
+        os.replace(os.path.join(directory, f".{file_name}.tmp"), paths[series])
+    return True
+
+
+def query(
+    series: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    latest_runs_only: bool = True,
+    store_directory: str = AGGREGATES_DIRECTORY,
+) -> pd.DataFrame:
+    """Reads a series of the store, only touching the partitions, columns and row groups selected.
+
+    Args:
+        series (str): Series name (a key of AGGREGATE_SERIES).
+        columns (list[str] | None, optional): Columns of the series to read (partition columns and the run are always
+            included). Defaults to None (every column).
+        filters (list[tuple] | None, optional): Filters in the "pyarrow.parquet" format, e.g.,
+            [("distance_threshold", "in", [0.2, 0.4]), ("Model Name", "!=", "CLOUD")]. Defaults to None.
+        latest_runs_only (bool, optional): Whether only the latest run of each configuration is kept. Defaults to True.
+        store_directory (str, optional): Root of the store. Defaults to AGGREGATES_DIRECTORY.
+
+    Returns:
+        df (pd.DataFrame): Rows of the series.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(os.path.join(store_directory, series), format="parquet", partitioning=partitioning())
+    if columns is not None:
+        columns = list(dict.fromkeys([*columns, *PARTITION_COLUMNS, RUN_COLUMN]))
+    expression = pq.filters_to_expression(filters) if filters else None
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    if latest_runs_only and len(df) > 0:
+        df[RUN_COLUMN] = df[RUN_COLUMN].astype(str)
+        latest_runs = df.groupby(PARTITION_COLUMNS, observed=True)[RUN_COLUMN].transform("max")
+        df = df[df[RUN_COLUMN] == latest_runs].reset_index(drop=True)
+    return df
+
+
+def configuration_label(distance_threshold: float, migration_recency_threshold: int, scenario: str | None = None) -> str:
+    label = f"Distance Threshold={distance_threshold:02.1f}; Migration Threshold={migration_recency_threshold:02d}"
+    return f"Scenario {scenario}; {label}" if scenario is not None else label
+
+
+def values_by_configuration(
+    series: str,
+    column: str,
+    filters: list[tuple] | None = None,
+    store_directory: str = AGGREGATES_DIRECTORY,
+) -> dict[str, np.ndarray]:
+    """Gets the finite values of a column for each configuration (latest run), e.g., to plot their CDFs.
+
+    Args:
+        series (str): Series name (a key of AGGREGATE_SERIES).
+        column (str): Column of the series.
+        filters (list[tuple] | None, optional): Filters (see "query"). Defaults to None.
+        store_directory (str, optional): Root of the store. Defaults to AGGREGATES_DIRECTORY.
+
+    Returns:
+        values (dict[str, np.ndarray]): Values of the column, by configuration label (see "configuration_label"). The
+            scenario is only part of the label when the store holds more than one.
+    """
+    df = query(series, columns=[column], filters=filters, store_directory=store_directory)
+    show_scenario = df["scenario"].nunique() > 1
+    values = {}
+    for (distance_threshold, migration_recency_threshold, scenario), group in df.groupby(PARTITION_COLUMNS, observed=True):
+        label = configuration_label(distance_threshold, migration_recency_threshold, scenario if show_scenario else None)
+        column_values = group[column].to_numpy(dtype=np.float64)
+        values[label] = column_values[np.isfinite(column_values)]
+    return values
+
+
+def aggregate_runs(
+    logs_directory: str = LOGS_DIRECTORY,
+    store_directory: str = AGGREGATES_DIRECTORY,
+    run_directories: list[str] | None = None,
+    force: bool = False,
+) -> int:
+    """Adds every run (not yet aggregated) to the store.
+
+    Args:
+        logs_directory (str, optional): Root of the logs. Defaults to LOGS_DIRECTORY.
+        store_directory (str, optional): Root of the store. Defaults to AGGREGATES_DIRECTORY.
+        run_directories (list[str] | None, optional): Runs to add. Defaults to None (every run under logs_directory).
+        force (bool, optional): Whether runs already aggregated are extracted again. Defaults to False.
+
+    Returns:
+        aggregated (int): Number of runs whose series were written.
+    """
+    aggregated = 0
+    for run_directory in run_directories if run_directories is not None else discover_runs(logs_directory):
+        if aggregate_run(run_directory, store_directory=store_directory, force=force):
+            print(f"Aggregated {run_directory}")
+            aggregated += 1
+    return aggregated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintains and queries the store of series aggregated across runs.")
+    parser.add_argument("--store-directory", default=AGGREGATES_DIRECTORY)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Adds finished runs to the store")
+    ingest_parser.add_argument(
+        "runs", nargs="*", help="Logs directories of the runs (defaults to every run under --logs-directory)"
+    )
+    ingest_parser.add_argument("--logs-directory", default=LOGS_DIRECTORY)
+    ingest_parser.add_argument("--force", action="store_true", help="Extracts runs that were already aggregated again")
+
+    quantiles_parser = subparsers.add_parser("quantiles", help="Compares the distribution of a column across configurations")
+    quantiles_parser.add_argument("series", choices=list(AGGREGATE_SERIES))
+    quantiles_parser.add_argument("column")
+    quantiles_parser.add_argument("--quantiles", type=float, nargs="+", default=[0.5, 0.9, 0.99])
+    quantiles_parser.add_argument("--distance-thresholds", type=float, nargs="+", default=None)
+    quantiles_parser.add_argument("--recencies", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        aggregated = aggregate_runs(
+            args.logs_directory, args.store_directory, run_directories=args.runs or None, force=args.force
+        )
+        print(f"{aggregated} runs added to {args.store_directory}")
+    else:
+        filters = []
+        if args.distance_thresholds is not None:
+            filters.append(("distance_threshold", "in", args.distance_thresholds))
+        if args.recencies is not None:
+            filters.append(("migration_recency_threshold", "in", args.recencies))
+        values = values_by_configuration(args.series, args.column, filters=filters or None, store_directory=args.store_directory)
+        df = pd.DataFrame(
+            {
+                label: np.quantile(column_values, args.quantiles)
+                for label, column_values in values.items()
+                if len(column_values) > 0
+            },
+            index=[f"p{quantile * 100:g}" for quantile in args.quantiles],
+        ).T
+        print(df.sort_index().to_string())
+
+
+if __name__ == "__main__":
+    main()
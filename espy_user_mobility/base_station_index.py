@@ -0,0 +1,108 @@
+from bisect import insort
+from collections.abc import Iterable
+
+from .observers import observe_attributes
+
+
+class BaseStationIndex:
+    """Hash index of base stations keyed by their hexagonal grid (x, y) coordinates.
+
+    Base stations that share coordinates are kept in creation (ID) order, so lookups return the same base station as
+    EdgeSimPy's linear "find_by" (the first one created).
+    """
+
+    def __init__(self, base_stations: Iterable[object] = ()):
+        """Creates an index over a collection of base stations.
+
+        Args:
+            base_stations (Iterable[object], optional): Base stations to be indexed. Defaults to ().
+        """
+        self.base_stations: dict[tuple, list[object]] = {}
+        self.rebuild(base_stations)
+
+    def __len__(self) -> int:
+        return len(self.base_stations)
+
+    @staticmethod
+    def _key(coordinates) -> tuple:
+        return tuple(coordinates)
+
+    def rebuild(self, base_stations: Iterable[object]):
+        """Replaces the index contents.
+
+        Args:
+            base_stations (Iterable[object]): Base stations to be indexed.
+        """
+        self.base_stations.clear()
+        for base_station in sorted(base_stations, key=lambda base_station: base_station.id):
+            if getattr(base_station, "coordinates", None) is not None:
+                self.base_stations.setdefault(self._key(base_station.coordinates), []).append(base_station)
+
+    def watch(self, base_station_class: type):
+        """Keeps the index up to date as base stations are created or have their coordinates changed.
+
+        Args:
+            base_station_class (type): BaseStation component class.
+        """
+        observe_attributes(base_station_class, ("coordinates",), self._on_coordinates_changed)
+
+    def _on_coordinates_changed(self, base_station: object, attribute_name: str, value: object, previous_value: object):
+        if previous_value is not None:
+            self._remove(self._key(previous_value), base_station)
+        if value is not None:
+            insort(self.base_stations.setdefault(self._key(value), []), base_station, key=lambda base_station: base_station.id)
+
+    def _remove(self, key: tuple, base_station: object):
+        located = self.base_stations.get(key, [])
+        for position, other in enumerate(located):
+            if other is base_station:
+                del located[position]
+                break
+        if len(located) == 0:
+            self.base_stations.pop(key, None)
+
+    def find(self, coordinates) -> object | None:
+        """Finds the base station located at a given pair of coordinates.
+
+        Args:
+            coordinates (tuple): Hexagonal grid coordinates.
+
+        Returns:
+            base_station (object | None): First base station at the coordinates, or None if there is no base station there.
+        """
+        located = self.base_stations.get(self._key(coordinates))
+        return located[0] if located else None
+
+
+# Index shared by scenario building and runtime lookups
+BASE_STATION_INDEX = BaseStationIndex()
+
+
+def install_base_station_index(base_station_class: type) -> BaseStationIndex:
+    """Rebuilds the base station index from the existing instances and routes "find_by('coordinates', ...)" lookups of
+    the BaseStation class (used by scenario building, user placement and handoffs) to it. Lookups by any other attribute,
+    and coordinates without an indexed base station, are answered by EdgeSimPy's method.
+
+    Args:
+        base_station_class (type): BaseStation component class.
+
+    Returns:
+        base_station_index (BaseStationIndex): Installed index.
+    """
+    BASE_STATION_INDEX.rebuild(base_station_class.all())
+    BASE_STATION_INDEX.watch(base_station_class)
+
+    if "_find_by_without_index" not in base_station_class.__dict__:
+        find_by_without_index = base_station_class.find_by
+        base_station_class._find_by_without_index = find_by_without_index
+
+        def find_by(cls, attribute_name: str, attribute_value: object) -> object:
+            if attribute_name == "coordinates":
+                base_station = BASE_STATION_INDEX.find(attribute_value)
+                if base_station is not None:
+                    return base_station
+            return find_by_without_index(attribute_name=attribute_name, attribute_value=attribute_value)
+
+        base_station_class.find_by = classmethod(find_by)
+
+    return BASE_STATION_INDEX
@@ -0,0 +1,146 @@
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+
+from .observers import observe_attributes
+
+CAPACITY_ATTRIBUTES = ("cpu", "memory", "disk", "cpu_demand", "memory_demand", "disk_demand")
+
+
+class CapacityIndex:
+    """Free CPU, memory and disk of a set of servers, updated incrementally whenever any of their capacity or demand
+    attributes change (service provisioning, migrations, "reset_placement", etc.).
+
+    Servers are kept in buckets sorted by free CPU, so "servers with at least X CPU and Y memory" is answered with a
+    binary search over the buckets instead of a scan over the whole fleet.
+    """
+
+    def __init__(self, servers: Iterable[object] = ()):
+        """Creates a capacity index over a collection of servers.
+
+        Args:
+            servers (Iterable[object], optional): Servers to be indexed. Defaults to ().
+        """
+        self.servers: dict[int, object] = {}
+        self.free_resources: dict[int, tuple[float, float, float]] = {}
+        self.cpu_buckets: list[float] = []  # Sorted free CPU values
+        self.bucket_servers: dict[float, set[int]] = {}  # Free CPU value -> IDs of the servers with that free CPU
+        self.release_listeners: list[Callable[[object], None]] = []
+        for server in servers:
+            self.add(server)
+
+    def watch(self, component_class: type):
+        """Keeps the index up to date with the changes applied to the instances of a component class.
+
+        Args:
+            component_class (type): Indexed component class (e.g., EdgeServer).
+        """
+        observe_attributes(component_class, CAPACITY_ATTRIBUTES, self._on_attribute_changed)
+
+    def add_release_listener(self, callback: Callable[[object], None]):
+        """Registers a function called with the server whenever any of its free resources increases.
+
+        Args:
+            callback (Callable[[object], None]): Function called when a server releases resources.
+        """
+        self.release_listeners.append(callback)
+
+    def _on_attribute_changed(self, server: object, attribute_name: str, value: object, previous_value: object):
+        if getattr(server, "id", None) in self.servers:
+            self.update(server)
+
+    def _remove_from_bucket(self, server_id: int):
+        free_cpu = self.free_resources.pop(server_id)[0]
+        bucket = self.bucket_servers[free_cpu]
+        bucket.discard(server_id)
+        if len(bucket) == 0:
+            del self.bucket_servers[free_cpu]
+            del self.cpu_buckets[bisect_left(self.cpu_buckets, free_cpu)]
+
+    def add(self, server: object):
+        """Adds a server to the index.
+
+        Args:
+            server (object): Server to be indexed.
+        """
+        self.servers[server.id] = server
+        self.update(server)
+
+    def update(self, server: object):
+        """Refreshes the free resources of an indexed server.
+
+        Args:
+            server (object): Indexed server whose capacity or demand changed.
+        """
+        # Servers are only partially initialized while EdgeSimPy is still creating them
+        try:
+            free_resources = (
+                server.cpu - server.cpu_demand,
+                server.memory - server.memory_demand,
+                server.disk - server.disk_demand,
+            )
+        except (AttributeError, TypeError):
+            return
+
+        released = False
+        if server.id in self.free_resources:
+            previous_free_resources = self.free_resources[server.id]
+            if previous_free_resources == free_resources:
+                return
+            released = any(current > previous for current, previous in zip(free_resources, previous_free_resources))
+            self._remove_from_bucket(server.id)
+
+        self.free_resources[server.id] = free_resources
+        free_cpu = free_resources[0]
+        if free_cpu not in self.bucket_servers:
+            self.bucket_servers[free_cpu] = set()
+            insort(self.cpu_buckets, free_cpu)
+        self.bucket_servers[free_cpu].add(server.id)
+
+        if released:
+            for callback in self.release_listeners:
+                callback(server)
+
+    def remove(self, server: object):
+        """Removes a server from the index.
+
+        Args:
+            server (object): Server to be removed.
+        """
+        if server.id in self.free_resources:
+            self._remove_from_bucket(server.id)
+        self.servers.pop(server.id, None)
+
+    def servers_with_capacity(self, cpu: float, memory: float) -> list[object]:
+        """Lists the indexed servers that have at least a given amount of free CPU and memory.
+
+        Args:
+            cpu (float): Minimum free CPU.
+            memory (float): Minimum free memory.
+
+        Returns:
+            servers (list[object]): Servers with enough free CPU and memory, sorted by ID.
+        """
+        server_ids = []
+        for free_cpu in self.cpu_buckets[bisect_left(self.cpu_buckets, cpu) :]:
+            for server_id in self.bucket_servers[free_cpu]:
+                if self.free_resources[server_id][1] >= memory:
+                    server_ids.append(server_id)
+        return [self.servers[server_id] for server_id in sorted(server_ids)]
+
+    def has_capacity_to_host(self, server: object, service: object) -> bool:
+        """Checks whether an indexed server has enough free resources to host a service. Mirrors
+        "EdgeServer.has_capacity_to_host", but reads the free CPU and memory from the index.
+
+        Args:
+            server (object): Indexed server.
+            service (object): Service to be hosted.
+
+        Returns:
+            bool: Whether the server can host the service.
+        """
+        free_cpu, free_memory, free_disk = self.free_resources[server.id]
+        return (
+            free_cpu >= service.cpu_demand
+            and free_memory >= service.memory_demand
+            and free_disk >= server._get_disk_demand_delta(service)
+        )
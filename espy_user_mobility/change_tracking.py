@@ -0,0 +1,85 @@
+from .observers import observe_attributes
+
+
+class ServiceChangeTracker:
+    """Keeps track of the services whose placement must be re-evaluated by the resource management algorithm.
+
+    A service becomes dirty when one of its users moves or is handed off to another base station, or when its own
+    hosting state changes (provisioning started/finished, migration completed). Services whose evaluation could not be
+    acted upon are either scheduled for a future step (e.g., while they are inside the migration recency window) or
+    parked until some server releases resources.
+    """
+
+    def __init__(self):
+        self.dirty: dict[int, object] = {}
+        self.parked: dict[int, object] = {}
+        self.wakeups: dict[int, dict[int, object]] = {}
+
+    def watch(self, user_class: type, service_class: type):
+        """Subscribes to the changes that may affect the placement of services.
+
+        Args:
+            user_class (type): User component class.
+            service_class (type): Service component class.
+        """
+        observe_attributes(user_class, ("coordinates", "base_station"), self._on_user_changed)
+        observe_attributes(service_class, ("server", "being_provisioned"), self._on_service_changed)
+
+    def _on_user_changed(self, user: object, attribute_name: str, value: object, previous_value: object):
+        for application in getattr(user, "applications", ()):
+            for service in application.services:
+                self.mark_dirty(service)
+
+    def _on_service_changed(self, service: object, attribute_name: str, value: object, previous_value: object):
+        if hasattr(service, "id"):
+            self.mark_dirty(service)
+
+    def mark_dirty(self, service: object):
+        """Flags a service to be re-evaluated in the next management pass.
+
+        Args:
+            service (object): Service that must be re-evaluated.
+        """
+        self.parked.pop(service.id, None)
+        self.dirty[service.id] = service
+
+    def schedule(self, service: object, step: int):
+        """Flags a service to be re-evaluated at a given step.
+
+        Args:
+            service (object): Service that must be re-evaluated.
+            step (int): Step in which the service will be re-evaluated.
+        """
+        self.wakeups.setdefault(step, {})[service.id] = service
+
+    def park(self, service: object):
+        """Holds a service that could not be (re)allocated until some server releases resources.
+
+        Args:
+            service (object): Service waiting for resources.
+        """
+        self.parked[service.id] = service
+
+    def release_parked(self, server: object | None = None):
+        """Flags every parked service as dirty (e.g., after a server released resources).
+
+        Args:
+            server (object | None, optional): Server that released resources. Defaults to None.
+        """
+        self.dirty.update(self.parked)
+        self.parked.clear()
+
+    def pop_services(self, step: int) -> list[object]:
+        """Gathers the services that must be evaluated in a given step and clears their dirty flags.
+
+        Args:
+            step (int): Current simulation step.
+
+        Returns:
+            services (list[object]): Services to be evaluated, sorted by ID.
+        """
+        for wakeup_step in [wakeup_step for wakeup_step in self.wakeups if wakeup_step <= step]:
+            self.dirty.update(self.wakeups.pop(wakeup_step))
+        services = [self.dirty[service_id] for service_id in sorted(self.dirty)]
+        self.dirty.clear()
+        return services
@@ -0,0 +1,203 @@
+import os
+from collections.abc import Iterable
+
+import numpy as np
+
+TRACE_CAPACITY = 256  # Entries preallocated per trace (and entries per spilled chunk)
+INT16_MIN, INT16_MAX = np.iinfo(np.int16).min, np.iinfo(np.int16).max
+
+
+class TraceSpill:
+    """Append-only file shared by the coordinates traces that spill their old entries to disk."""
+
+    def __init__(self, file_path: str):
+        """Creates (or truncates) the spill file.
+
+        Args:
+            file_path (str): Spill file path.
+        """
+        self.file_path = file_path
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        self.file = open(file_path, "w+b")
+
+    def write(self, values: np.ndarray) -> int:
+        """Appends a chunk of coordinates.
+
+        Args:
+            values (np.ndarray): Coordinates with shape (entries, 2).
+
+        Returns:
+            offset (int): Position of the chunk in the file.
+        """
+        self.file.seek(0, os.SEEK_END)
+        offset = self.file.tell()
+        self.file.write(np.ascontiguousarray(values).tobytes())
+        return offset
+
+    def read(self, offset: int, entries: int, dtype: np.dtype) -> np.ndarray:
+        # Chunks remain readable after the file is closed (e.g., when exporting the users at the end of a run)
+        if not self.file.closed:
+            self.file.flush()
+        return np.fromfile(self.file_path, dtype=dtype, count=entries * 2, offset=offset).reshape(-1, 2)
+
+    def close(self):
+        self.file.close()
+
+
+class CoordinatesTrace:
+    """Coordinates trace of a user stored in a preallocated NumPy buffer instead of a list of tuples.
+
+    Entries are indexed by step, like the list EdgeSimPy keeps in "User.coordinates_trace", and read back as tuples.
+    Hexagonal grid coordinates are stored as int16 (the buffer is converted to float64 if a coordinate does not fit, and
+    the entries appended before the conversion are still read back as integers).
+    By default the buffer grows to hold the whole trace. A trace with "max_length" only keeps its latest entries (ring
+    buffer), and a trace with a "spill" writes each full buffer to the spill file and reads it back when needed.
+    """
+
+    def __init__(
+        self,
+        coordinates: Iterable[tuple] = (),
+        capacity: int = TRACE_CAPACITY,
+        max_length: int | None = None,
+        spill: TraceSpill | None = None,
+    ):
+        """Creates a trace.
+
+        Args:
+            coordinates (Iterable[tuple], optional): Initial entries. Defaults to ().
+            capacity (int, optional): Entries preallocated (entries per chunk when spilling). Defaults to TRACE_CAPACITY.
+            max_length (int | None, optional): Number of latest entries kept. Defaults to None (whole trace).
+            spill (TraceSpill | None, optional): File where full buffers are written. Defaults to None (kept in memory).
+        """
+        if max_length is not None and spill is not None:
+            raise ValueError("A coordinates trace either keeps its latest entries or spills them to disk")
+        self.buffer = np.empty((max_length if max_length is not None else max(capacity, 1), 2), dtype=np.int16)
+        self.max_length = max_length
+        self.spill = spill
+        self.length = 0  # Entries appended (the trace is indexed from 0 to length - 1)
+        self.first = 0  # Index of the first entry held in the buffer
+        self.float_start: int | None = None  # Index of the first entry that did not fit in int16
+        self.chunks: list[tuple[int, int, int, np.dtype]] = []  # Spilled entries (first index, offset, entries, dtype)
+        self.extend(coordinates)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self):
+        for first, offset, entries, dtype in self.chunks:
+            yield from self._tuples(first, self.spill.read(offset, entries, dtype))  # type: ignore
+        yield from self._tuples(self.first, self._resident())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("coordinates trace index out of range")
+        if index >= self.first:
+            position = self._position(index)
+            return self._tuples(index, self.buffer[position : position + 1])[0]
+        for first, offset, entries, dtype in self.chunks:
+            if first <= index < first + entries:
+                chunk = self.spill.read(offset, entries, dtype)  # type: ignore
+                return self._tuples(index, chunk[index - first : index - first + 1])[0]
+        raise IndexError(f"coordinates trace entry {index} was discarded (only the latest {self.max_length} are kept)")
+
+    def _position(self, index: int) -> int:
+        return index % self.max_length if self.max_length is not None else index - self.first
+
+    def _resident(self) -> np.ndarray:
+        if self.max_length is None:
+            return self.buffer[: self.length - self.first]
+        return self.buffer[np.arange(self.first, self.length) % self.max_length]
+
+    def _tuples(self, first_index: int, values: np.ndarray) -> list[tuple]:
+        # Entries of a float64 buffer appended before it was converted are integers
+        if values.dtype.kind != "f":
+            return list(map(tuple, values.tolist()))
+        integers = min(max(self.float_start - first_index, 0), len(values))  # type: ignore
+        return list(map(tuple, values[:integers].astype(np.int64).tolist() + values[integers:].tolist()))
+
+    def _fit(self, values: np.ndarray):
+        # Coordinates that are not int16 convert the buffer (and further entries) to float64
+        if self.buffer.dtype == np.int16 and len(values) > 0:
+            fits = (values >= INT16_MIN) & (values <= INT16_MAX)
+            if values.dtype.kind not in "iub":
+                fits &= values == np.round(values)
+            rows = np.flatnonzero(~fits.all(axis=1))
+            if len(rows) > 0:
+                self.buffer = self.buffer.astype(np.float64)
+                self.float_start = self.length + int(rows[0])
+
+    def append(self, coordinates: tuple):
+        x, y = coordinates
+        if self.buffer.dtype == np.int16 and not (
+            isinstance(x, (int, np.integer))
+            and isinstance(y, (int, np.integer))
+            and INT16_MIN <= min(x, y) <= max(x, y) <= INT16_MAX
+        ):
+            self._fit(np.array([coordinates], dtype=np.float64))
+        self._make_room()
+        self.buffer[self._position(self.length)] = coordinates
+        self._advance(1)
+
+    def extend(self, coordinates: Iterable[tuple] | np.ndarray):
+        values = (coordinates if isinstance(coordinates, np.ndarray) else np.array(list(coordinates))).reshape(-1, 2)
+        self._fit(values)
+        if self.max_length is not None:
+            # Only the entries that remain in the ring buffer are written
+            kept = values[len(values) - min(len(values), self.max_length) :]
+            first_index = self.length + len(values) - len(kept)
+            self.buffer[np.arange(first_index, first_index + len(kept)) % self.max_length] = kept
+            self._advance(len(values))
+            return
+        while len(values) > 0:
+            self._make_room()
+            position = self.length - self.first
+            written = values[: len(self.buffer) - position]
+            self.buffer[position : position + len(written)] = written
+            self._advance(len(written))
+            values = values[len(written) :]
+
+    def _make_room(self):
+        if self.max_length is not None or self.length - self.first < len(self.buffer):
+            return
+        if self.spill is not None:
+            offset = self.spill.write(self.buffer)
+            self.chunks.append((self.first, offset, len(self.buffer), self.buffer.dtype))
+            self.first = self.length
+        else:
+            self.buffer = np.concatenate((self.buffer, np.empty_like(self.buffer)))
+
+    def _advance(self, entries: int):
+        self.length += entries
+        if self.max_length is not None:
+            self.first = max(0, self.length - self.max_length)
+
+    def tolist(self) -> list[list]:
+        """Lists the entries held by the trace (all entries, unless only the latest ones are kept) as [x, y] lists."""
+        return [list(coordinates) for coordinates in self]
+
+
+def install_coordinates_traces(
+    users: Iterable[object],
+    capacity: int = TRACE_CAPACITY,
+    max_length: int | None = None,
+    spill_file: str | None = None,
+) -> TraceSpill | None:
+    """Replaces the coordinates traces (lists of tuples) of the users by CoordinatesTrace buffers.
+
+    Args:
+        users (Iterable[object]): Users of the scenario.
+        capacity (int, optional): Entries preallocated per trace. Defaults to TRACE_CAPACITY.
+        max_length (int | None, optional): Number of latest entries kept per trace. Defaults to None (whole trace).
+        spill_file (str | None, optional): File where the traces spill their entries. Defaults to None (kept in memory).
+
+    Returns:
+        spill (TraceSpill | None): Spill file shared by the traces (if any).
+    """
+    spill = TraceSpill(spill_file) if spill_file is not None else None
+    for user in users:
+        user.coordinates_trace = CoordinatesTrace(user.coordinates_trace, capacity=capacity, max_length=max_length, spill=spill)
+    return spill
@@ -6,6 +6,8 @@ import networkx as nx
 
 from EdgeSimPy import edge_sim_py as espy
 
+from .coordinates_trace import CoordinatesTrace
+
 
 def display_topology(topology: nx.Graph, output_filename: str = "topology"):
     # Customizing visual representation of topology
@@ -86,7 +88,11 @@ def user_to_dict(self: espy.User) -> dict:
         "attributes": {
             "id": self.id,
             "coordinates": self.coordinates,
-            "coordinates_trace": self.coordinates_trace,
+            "coordinates_trace": (
+                self.coordinates_trace.tolist()
+                if isinstance(self.coordinates_trace, CoordinatesTrace)
+                else self.coordinates_trace
+            ),
             "movement_distance": self.movement_distance,
             "chance_of_becoming_interested": self.chance_of_becoming_interested,
             # "delays": copy.deepcopy(self.delays),
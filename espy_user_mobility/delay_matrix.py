@@ -0,0 +1,272 @@
+import os
+import zipfile
+from collections.abc import Iterable
+
+import networkx as nx
+import numpy as np
+
+from EdgeSimPy.edge_sim_py.components.edge_server import EdgeServer
+
+NO_PREDECESSOR = -1
+
+
+class DelayMatrix:
+    """Shortest path delays (and the paths themselves) from every network switch to a set of target switches.
+
+    Rows correspond to target switches (the ones hosting servers) and columns to every switch of the topology.
+    "delays[t, n]" holds the delay of the shortest path between node "n" and target "t", and "next_hops[t, n]" holds the
+    column of the node that follows "n" in that path, so paths are rebuilt by walking the row until the target.
+    """
+
+    def __init__(self, node_ids: np.ndarray, target_ids: np.ndarray, delays: np.ndarray, next_hops: np.ndarray):
+        """Creates a delay matrix from precomputed arrays.
+
+        Args:
+            node_ids (np.ndarray): IDs of the topology's network switches (matrix columns).
+            target_ids (np.ndarray): IDs of the target network switches (matrix rows).
+            delays (np.ndarray): Shortest path delays, with shape (len(target_ids), len(node_ids)).
+            next_hops (np.ndarray): Column of the next hop toward each target, with the same shape as "delays".
+        """
+        self.node_ids = node_ids
+        self.target_ids = target_ids
+        self.delays = delays
+        self.next_hops = next_hops
+        self.node_columns = {int(node_id): column for column, node_id in enumerate(node_ids)}
+        self.target_rows = {int(target_id): row for row, target_id in enumerate(target_ids)}
+        self.nodes: list[object] = []
+
+    @classmethod
+    def compute(cls, topology: nx.Graph, targets: Iterable[object]) -> "DelayMatrix":
+        """Runs Dijkstra (delay used as weight) once from each target switch.
+
+        Args:
+            topology (nx.Graph): Network topology.
+            targets (Iterable[object]): Target network switches (e.g., the switches that host servers).
+
+        Returns:
+            delay_matrix (DelayMatrix): Precomputed delay matrix.
+        """
+        nodes = sorted(topology.nodes(), key=lambda node: node.id)
+        targets = sorted(set(targets), key=lambda node: node.id)
+        node_columns = {node: column for column, node in enumerate(nodes)}
+
+        delays = np.full((len(targets), len(nodes)), np.inf, dtype=np.float64)
+        next_hops = np.full((len(targets), len(nodes)), NO_PREDECESSOR, dtype=np.int32)
+        for row, target in enumerate(targets):
+            # On undirected topologies, the predecessor of a node in the tree rooted at the target is its next hop toward it
+            predecessors, distances = nx.dijkstra_predecessor_and_distance(G=topology, source=target, weight="delay")
+            for node, distance in distances.items():
+                column = node_columns[node]
+                delays[row, column] = distance
+                if len(predecessors[node]) > 0:
+                    next_hops[row, column] = node_columns[predecessors[node][0]]
+
+        delay_matrix = cls(
+            node_ids=np.array([node.id for node in nodes], dtype=np.int64),
+            target_ids=np.array([target.id for target in targets], dtype=np.int64),
+            delays=delays,
+            next_hops=next_hops,
+        )
+        delay_matrix.nodes = nodes
+        return delay_matrix
+
+    def repair_rows(self, topology: nx.Graph, rows: Iterable[int]):
+        """Recomputes the delays and next hops toward some of the targets after the topology changed.
+
+        Args:
+            topology (nx.Graph): Network topology (already updated).
+            rows (Iterable[int]): Rows (targets) that must be recomputed.
+        """
+        rows = list(rows)
+        if len(rows) > 0 and not (self.delays.flags.writeable and self.next_hops.flags.writeable):
+            # Matrices attached from a read-only snapshot are copied (into private memory) on their first repair
+            self.delays = np.array(self.delays)
+            self.next_hops = np.array(self.next_hops)
+
+        for row in rows:
+            target = self.nodes[self.node_columns[int(self.target_ids[row])]]
+            self.delays[row] = np.inf
+            self.next_hops[row] = NO_PREDECESSOR
+            if target not in topology:
+                continue
+            predecessors, distances = nx.dijkstra_predecessor_and_distance(G=topology, source=target, weight="delay")
+            for node, distance in distances.items():
+                column = self.node_columns[node.id]
+                self.delays[row, column] = distance
+                if len(predecessors[node]) > 0:
+                    self.next_hops[row, column] = self.node_columns[predecessors[node][0].id]
+
+    def rows_through_link(self, node: object, neighbor: object) -> list[int]:
+        """Lists the targets whose shortest path tree uses the link between two network switches.
+
+        Args:
+            node (object): One of the network switches connected by the link.
+            neighbor (object): The other network switch connected by the link.
+
+        Returns:
+            rows (list[int]): Affected rows.
+        """
+        column, neighbor_column = self.node_columns[node.id], self.node_columns[neighbor.id]
+        uses_link = (self.next_hops[:, column] == neighbor_column) | (self.next_hops[:, neighbor_column] == column)
+        return np.flatnonzero(uses_link).tolist()
+
+    def rows_improved_by_link(self, node: object, neighbor: object, delay: float) -> list[int]:
+        """Lists the targets whose shortest paths may become shorter through a new (or faster) link.
+
+        A path from any switch "o" toward the target "t" can only improve through the link (a, b) if
+        "delay + d(b, t) < d(a, t)" (or vice versa), as "d(o, a) >= d(o, t) - d(a, t)".
+
+        Args:
+            node (object): One of the network switches connected by the link.
+            neighbor (object): The other network switch connected by the link.
+            delay (float): Link delay.
+
+        Returns:
+            rows (list[int]): Affected rows.
+        """
+        node_delays = self.delays[:, self.node_columns[node.id]]
+        neighbor_delays = self.delays[:, self.node_columns[neighbor.id]]
+        improves = (delay + neighbor_delays < node_delays) | (delay + node_delays < neighbor_delays)
+        return np.flatnonzero(improves).tolist()
+
+    def rows_through_node(self, node: object) -> list[int]:
+        """Lists the targets whose shortest path tree traverses a network switch.
+
+        Args:
+            node (object): Network switch.
+
+        Returns:
+            rows (list[int]): Affected rows.
+        """
+        return np.flatnonzero((self.next_hops == self.node_columns[node.id]).any(axis=1)).tolist()
+
+    def remove_target(self, target_network_switch: object):
+        """Stops serving paths toward a target network switch (e.g., after it was removed from the topology).
+
+        Args:
+            target_network_switch (object): Target network switch.
+        """
+        self.target_rows.pop(target_network_switch.id, None)
+
+    def save(self, file_path: str):
+        """Persists the matrix in the disk (NumPy ".npz" format).
+
+        The matrix is written to a temporary file of the process and then renamed, so runs that compute the same matrix
+        in parallel never read a partially written file.
+
+        Args:
+            file_path (str): Output file path.
+        """
+        directory = os.path.dirname(file_path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        temporary_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temporary_file_path, "wb") as output_file:
+            np.savez(
+                output_file, node_ids=self.node_ids, target_ids=self.target_ids, delays=self.delays, next_hops=self.next_hops
+            )
+        os.replace(temporary_file_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "DelayMatrix":
+        """Loads a matrix persisted with "DelayMatrix.save".
+
+        Args:
+            file_path (str): Input file path.
+
+        Returns:
+            delay_matrix (DelayMatrix): Loaded delay matrix.
+        """
+        with np.load(file_path) as data:
+            return cls(
+                node_ids=data["node_ids"], target_ids=data["target_ids"], delays=data["delays"], next_hops=data["next_hops"]
+            )
+
+    def bind(self, topology: nx.Graph) -> bool:
+        """Links the matrix columns to the network switch objects of a topology.
+
+        Args:
+            topology (nx.Graph): Topology whose switches correspond to the matrix columns.
+
+        Returns:
+            bool: Whether the topology matches the matrix (same set of network switch IDs).
+        """
+        nodes = sorted(topology.nodes(), key=lambda node: node.id)
+        if len(nodes) != len(self.node_ids) or any(node.id != node_id for node, node_id in zip(nodes, self.node_ids)):
+            return False
+        self.nodes = nodes
+        return True
+
+    def has_target(self, target_network_switch: object) -> bool:
+        return target_network_switch.id in self.target_rows
+
+    def delay(self, origin_network_switch: object, target_network_switch: object) -> float:
+        """Gets the shortest path delay between a network switch and a target switch.
+
+        Args:
+            origin_network_switch (object): Origin network switch.
+            target_network_switch (object): Target network switch (must be a matrix row).
+
+        Returns:
+            delay (float): Shortest path delay.
+        """
+        row = self.target_rows[target_network_switch.id]
+        return float(self.delays[row, self.node_columns[origin_network_switch.id]])
+
+    def path(self, origin_network_switch: object, target_network_switch: object) -> list:
+        """Rebuilds the shortest path between a network switch and a target switch.
+
+        Args:
+            origin_network_switch (object): Origin network switch.
+            target_network_switch (object): Target network switch (must be a matrix row).
+
+        Returns:
+            path (list): Network switches from the origin to the target (both included).
+        """
+        row = self.target_rows[target_network_switch.id]
+        column = self.node_columns[origin_network_switch.id]
+        target_column = self.node_columns[target_network_switch.id]
+        if not np.isfinite(self.delays[row, column]):
+            raise nx.NetworkXNoPath(f"Node {target_network_switch} not reachable from {origin_network_switch}")
+
+        path = [self.nodes[column]]
+        while column != target_column:
+            column = int(self.next_hops[row, column])
+            path.append(self.nodes[column])
+        return path
+
+
+def server_network_switches() -> list[object]:
+    """Lists the network switches that host edge/cloud servers (the only targets of placement-related paths).
+
+    Returns:
+        network_switches (list[object]): Network switches connected to servers.
+    """
+    return [server.network_switch for server in EdgeServer.all() if server.network_switch is not None]
+
+
+def load_or_compute_delay_matrix(topology: nx.Graph, file_path: str) -> DelayMatrix:
+    """Attaches a delay matrix to the topology, loading it from the disk when a matching one was persisted before.
+
+    Args:
+        topology (nx.Graph): Network topology.
+        file_path (str): Path where the matrix is persisted.
+
+    Returns:
+        delay_matrix (DelayMatrix): Delay matrix bound to the topology.
+    """
+    delay_matrix = None
+    if os.path.exists(file_path):
+        try:
+            delay_matrix = DelayMatrix.load(file_path)
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile) as error:
+            # E.g., a file truncated by an interrupted run written before saves were atomic
+            print(f"Recomputing the delay matrix, {file_path} could not be read ({error!r})")
+        if delay_matrix is not None and not delay_matrix.bind(topology):
+            delay_matrix = None
+    if delay_matrix is None:
+        delay_matrix = DelayMatrix.compute(topology=topology, targets=server_network_switches())
+        delay_matrix.save(file_path)
+
+    topology.delay_matrix = delay_matrix  # type: ignore
+    return delay_matrix
@@ -0,0 +1,204 @@
+from collections.abc import Callable, Iterable
+from math import sqrt
+
+import numpy as np
+
+from .observers import observe_attributes
+
+# Upper bound of the number of (service user, server) distances held in memory at once
+MAX_PAIRWISE_DISTANCES = 4_000_000
+# (service, server) pairs compared with the reference metric when calibrating the engine
+CALIBRATION_PAIRS = 32
+
+
+class DistanceEngine:
+    """Batched calculation of the normalized distance between services' users and servers.
+
+    User coordinates, the service -> user membership and server coordinates are kept in contiguous NumPy arrays, so the
+    distance from every evaluated service to every server is obtained with a single vectorized call per step. The
+    distance of a (service, server) pair is the mean euclidean distance between the server and the users of the
+    service's application, normalized by the diagonal of the map, or by the scale that reproduces a reference metric (see
+    "calibrate").
+    """
+
+    def __init__(self, services: Iterable[object], users: Iterable[object], servers: Iterable[object], map_coordinates):
+        """Creates the engine arrays.
+
+        Args:
+            services (Iterable[object]): Services whose distances will be calculated.
+            users (Iterable[object]): Users that access the services.
+            servers (Iterable[object]): Candidate servers (matrix columns).
+            map_coordinates (Iterable[tuple]): Coordinates of the map (used to normalize distances).
+        """
+        users = list(users)
+        self.user_rows = {user.id: row for row, user in enumerate(users)}
+        self.user_coordinates = np.array([user.coordinates for user in users], dtype=np.float64).reshape(-1, 2)
+
+        self.servers = list(servers)
+        self.server_columns = {server.id: column for column, server in enumerate(self.servers)}
+        self.server_coordinates = np.array([server.coordinates for server in self.servers], dtype=np.float64).reshape(-1, 2)
+
+        # Users of each service are stored contiguously: service_user_rows[start:end], with (start, end) = service_slices[id]
+        self.service_slices: dict[int, tuple[int, int]] = {}
+        service_user_rows = []
+        for service in services:
+            start = len(service_user_rows)
+            service_user_rows.extend(self.user_rows[user.id] for user in service.application.users)
+            self.service_slices[service.id] = (start, len(service_user_rows))
+        self.service_user_rows = np.array(service_user_rows, dtype=np.int64)
+
+        map_coordinates = np.array(list(map_coordinates), dtype=np.float64).reshape(-1, 2)
+        extent = map_coordinates.max(axis=0) - map_coordinates.min(axis=0) if len(map_coordinates) > 0 else (1.0, 1.0)
+        self.max_distance = sqrt(extent[0] ** 2 + extent[1] ** 2) or 1.0
+        self.scale = 1 / self.max_distance
+
+    def calibrate(self, services: Iterable[object], reference: Callable[[object, object], float]) -> bool:
+        """Scales the distances so that they match a reference metric (e.g., EdgeSimPy's "distance_from_edge_server_to_users").
+
+        The scale is taken from the first pair with a nonzero distance and checked on up to CALIBRATION_PAIRS (service,
+        server) pairs, spread over the services with users and the servers.
+
+        Args:
+            services (Iterable[object]): Services whose distances are compared.
+            reference (Callable[[object, object], float]): Reference distance of a (service, server) pair.
+
+        Returns:
+            calibrated (bool): Whether the reference metric is a scaled mean euclidean distance (the scale is kept as
+                is otherwise).
+        """
+        services = [service for service in services if self.service_slices[service.id][1] > self.service_slices[service.id][0]]
+        if len(services) == 0 or len(self.servers) == 0:
+            return True
+        pairs = max(min(CALIBRATION_PAIRS, len(services) * len(self.servers)), 1)
+        pair_services = [services[index % len(services)] for index in range(pairs)]
+        columns = (np.arange(pairs) * len(self.servers) // pairs + np.arange(pairs) // len(services)) % len(self.servers)
+
+        distances = self.service_server_distances(pair_services, columns=columns[:, None])[:, 0] / self.scale
+        expected = np.array(
+            [reference(service, self.servers[column]) for service, column in zip(pair_services, columns)], dtype=np.float64
+        )
+        nonzero = np.flatnonzero(distances > 0)
+        scale = expected[nonzero[0]] / distances[nonzero[0]] if len(nonzero) > 0 else self.scale
+        if not np.allclose(distances * scale, expected, rtol=1e-9, atol=1e-12):
+            return False
+        self.scale = float(scale)
+        return True
+
+    def watch(self, user_class: type):
+        """Keeps the user coordinates array up to date as users move.
+
+        Args:
+            user_class (type): User component class.
+        """
+        observe_attributes(user_class, ("coordinates",), self._on_user_moved)
+
+    def _on_user_moved(self, user: object, attribute_name: str, value: object, previous_value: object):
+        row = self.user_rows.get(getattr(user, "id", None))  # type: ignore
+        if row is not None:
+            self.user_coordinates[row] = value
+
+    def closest_server(
+        self, service: object, spatial_index: object, k: int, predicate: Callable[[object], bool] | None = None
+    ) -> tuple[object | None, float]:
+        """Finds the server that satisfies a predicate (e.g., has capacity to host the service) closest to the users of a
+        service, evaluating only the servers around the users.
+
+        The mean distance from the users to a server is never shorter than the distance from the users' centroid to the
+        server. The k servers nearest to the centroid are evaluated first, and then only the servers whose distance to the
+        centroid does not exceed the best mean distance found, so the result is the same as ranking every server (ties are
+        broken by column, as in "service_server_distances").
+
+        Args:
+            service (object): Service being placed.
+            spatial_index (object): Spatial index of the servers (see "ServerSpatialIndex").
+            k (int): Servers nearest to the users' centroid evaluated first.
+            predicate (Callable[[object], bool] | None, optional): Filter applied to the servers. Defaults to None.
+
+        Returns:
+            (tuple[object | None, float]): Closest server (if any) and its normalized distance to the users.
+        """
+        start, end = self.service_slices[service.id]
+        if start == end:
+            # Every server is at distance 0 from a service without users
+            server = next((server for server in self.servers if predicate is None or predicate(server)), None)
+            return server, 0.0 if server is not None else float("inf")
+
+        centroid = self.user_coordinates[self.service_user_rows[start:end]].mean(axis=0)
+        candidates = spatial_index.nearest(coordinates=tuple(centroid), k=k, predicate=predicate)
+        if len(candidates) == 0:
+            return None, float("inf")
+        columns = np.array([self.server_columns[server.id] for server in candidates], dtype=np.int64)
+        distances = self.service_server_distances([service], columns=columns[None, :])[0]
+
+        # Fewer than k candidates means that every server that satisfies the predicate was evaluated. The radius includes
+        # the servers tied with the best one (and a margin for rounding errors)
+        radius = distances.min() / self.scale * (1 + 1e-9)
+        farthest = candidates[-1].coordinates
+        if len(candidates) == k and sqrt((farthest[0] - centroid[0]) ** 2 + (farthest[1] - centroid[1]) ** 2) <= radius:
+            evaluated = set(columns.tolist())
+            others = [
+                self.server_columns[server.id]
+                for server in spatial_index.within(tuple(centroid), radius=radius, predicate=predicate)
+                if self.server_columns[server.id] not in evaluated
+            ]
+            if len(others) > 0:
+                others = np.array(others, dtype=np.int64)
+                columns = np.concatenate((columns, others))
+                distances = np.concatenate((distances, self.service_server_distances([service], columns=others[None, :])[0]))
+
+        best = np.lexsort((columns, distances))[0]
+        return self.servers[columns[best]], float(distances[best])
+
+    def service_server_distances(self, services: list[object], columns: np.ndarray | None = None) -> np.ndarray:
+        """Calculates the normalized distance from the users of each service to each server.
+
+        Args:
+            services (list[object]): Services whose distances must be calculated (matrix rows).
+            columns (np.ndarray | None, optional): Columns (positions in "servers") of the servers evaluated for each
+                service, with shape (len(services), servers per service). Defaults to None (every server).
+
+        Returns:
+            distances (np.ndarray): Matrix with shape (len(services), len(servers)), or the shape of "columns".
+        """
+        width = len(self.servers) if columns is None else columns.shape[1]
+        distances = np.zeros((len(services), width), dtype=np.float64)
+        if len(services) == 0 or width == 0:
+            return distances
+
+        slices = np.array([self.service_slices[service.id] for service in services], dtype=np.int64).reshape(-1, 2)
+        counts = slices[:, 1] - slices[:, 0]
+
+        # Processing services in chunks so that the pairwise distance buffer stays within MAX_PAIRWISE_DISTANCES
+        max_pairs = max(MAX_PAIRWISE_DISTANCES // width, 1)
+        chunk_start = 0
+        while chunk_start < len(services):
+            chunk_end = chunk_start + 1
+            pairs = counts[chunk_start]
+            while chunk_end < len(services) and pairs + counts[chunk_end] <= max_pairs:
+                pairs += counts[chunk_end]
+                chunk_end += 1
+
+            rows = np.arange(chunk_start, chunk_end)[counts[chunk_start:chunk_end] > 0]
+            if len(rows) > 0:
+                # Gathering the users of the chunk's services (concatenation of their contiguous slices)
+                offsets = np.repeat(slices[rows, 0] - np.cumsum(counts[rows]) + counts[rows], counts[rows])
+                user_rows = self.service_user_rows[np.arange(offsets.size) + offsets]
+
+                if columns is None:
+                    server_coordinates = self.server_coordinates[None, :, :]
+                else:
+                    server_coordinates = np.repeat(self.server_coordinates[columns[rows]], counts[rows], axis=0)
+                # Each axis is handled separately and in place (a single (users, servers) buffer per axis)
+                user_coordinates = self.user_coordinates[user_rows]
+                user_distances = user_coordinates[:, 0, None] - server_coordinates[:, :, 0]
+                y_deltas = user_coordinates[:, 1, None] - server_coordinates[:, :, 1]
+                np.multiply(user_distances, user_distances, out=user_distances)
+                np.multiply(y_deltas, y_deltas, out=y_deltas)
+                np.add(user_distances, y_deltas, out=user_distances)
+                np.sqrt(user_distances, out=user_distances)
+                segment_starts = np.concatenate(([0], np.cumsum(counts[rows])[:-1]))
+                distances[rows] = np.add.reduceat(user_distances, segment_starts, axis=0) / counts[rows, None]
+
+            chunk_start = chunk_end
+
+        return distances * self.scale
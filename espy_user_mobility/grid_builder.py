@@ -0,0 +1,96 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+from EdgeSimPy import edge_sim_py as espy
+
+from .base_station_index import install_base_station_index
+
+# Offsets (in the doubled-column coordinates of the hexagonal grid) of the neighbors to the right and above a cell. The
+# neighbors to the left and below are the reverse of these pairs, so every link is found exactly once.
+HEXAGONAL_NEIGHBOR_OFFSETS = ((2, 0), (1, 1), (-1, 1))
+
+
+def hexagonal_neighbor_pairs(coordinates: Iterable[tuple]) -> np.ndarray:
+    """Finds the pairs of neighboring cells of a hexagonal grid arithmetically, through a dense (x, y) -> row table.
+
+    Args:
+        coordinates (Iterable[tuple]): Hexagonal grid coordinates of the cells.
+
+    Returns:
+        pairs (np.ndarray): Rows (positions in "coordinates") of each pair of neighbors, with shape (pairs, 2), with the
+            lower row first and sorted by rows.
+    """
+    coordinates = np.array(list(coordinates), dtype=np.int64).reshape(-1, 2)
+    if len(coordinates) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    cells = coordinates - coordinates.min(axis=0)
+    shape = cells.max(axis=0) + 1
+    rows = np.full(shape, -1, dtype=np.int64)
+    rows[cells[:, 0], cells[:, 1]] = np.arange(len(cells))
+
+    pairs = []
+    for x_offset, y_offset in HEXAGONAL_NEIGHBOR_OFFSETS:
+        x, y = cells[:, 0] + x_offset, cells[:, 1] + y_offset
+        inside = np.flatnonzero((x >= 0) & (y >= 0) & (x < shape[0]) & (y < shape[1]))
+        neighbors = rows[x[inside], y[inside]]
+        found = neighbors >= 0
+        pairs.append(np.stack((inside[found], neighbors[found]), axis=1))
+
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def build_base_stations(grid_coordinates: Iterable[tuple], wireless_delay: int) -> list:
+    """Creates a base station and its network switch at each cell of the grid.
+
+    Args:
+        grid_coordinates (Iterable[tuple]): Hexagonal grid coordinates (see "create_grid").
+        wireless_delay (int): Wireless delay of the base stations.
+
+    Returns:
+        base_stations (list): Created base stations.
+    """
+    base_stations = []
+    for coordinates in grid_coordinates:
+        base_station = espy.BaseStation()
+        network_switch = espy.sample_switch()
+        base_station.coordinates = coordinates
+        base_station.wireless_delay = wireless_delay  # type: ignore
+        base_station._connect_to_network_switch(network_switch=network_switch)
+        base_stations.append(base_station)
+
+    # The index is rebuilt once, instead of being updated as each base station gets its coordinates
+    install_base_station_index(espy.BaseStation)
+    return base_stations
+
+
+def build_hexagonal_mesh(network_switches: Iterable[object], delay: int, bandwidth: int) -> espy.Topology:
+    """Creates a topology that links each network switch to its neighbors in the hexagonal grid.
+
+    Args:
+        network_switches (Iterable[object]): Network switches (nodes of the topology).
+        delay (int): Delay of the links.
+        bandwidth (int): Bandwidth of the links.
+
+    Returns:
+        topology (espy.Topology): Network topology.
+    """
+    network_switches = list(network_switches)
+    pairs = hexagonal_neighbor_pairs(network_switch.coordinates for network_switch in network_switches).tolist()
+
+    topology = espy.Topology()
+    topology.add_nodes_from(network_switches)
+
+    # The edges are added in bulk and their data dictionaries are replaced by the links, as in "create_cloud_servers"
+    topology.add_edges_from((network_switches[row], network_switches[neighbor_row]) for row, neighbor_row in pairs)
+    for row, neighbor_row in pairs:
+        network_switch, neighbor = network_switches[row], network_switches[neighbor_row]
+        link = espy.NetworkLink()
+        link.topology = topology
+        link.delay = delay
+        link.bandwidth = bandwidth
+        link.nodes = [network_switch, neighbor]
+        topology._adj[network_switch][neighbor] = link
+        topology._adj[neighbor][network_switch] = link
+    return topology
@@ -1,5 +1,7 @@
 # Importing EdgeSimPy components
 import random
+import sys
+from collections.abc import Iterable
 
 # Importing Python libraries
 import networkx as nx
@@ -7,13 +9,21 @@ import networkx as nx
 from EdgeSimPy.edge_sim_py.components.application import Application
 from EdgeSimPy.edge_sim_py.components.container_layer import ContainerLayer
 from EdgeSimPy.edge_sim_py.components.edge_server import EdgeServer
+from EdgeSimPy.edge_sim_py.components.network_link import NetworkLink
 from EdgeSimPy.edge_sim_py.components.network_switch import NetworkSwitch
 from EdgeSimPy.edge_sim_py.components.service import Service
 from EdgeSimPy.edge_sim_py.components.topology import Topology
 from EdgeSimPy.edge_sim_py.components.user import User
 
+from .observers import publish
+from .path_cache import PathCache
+from .path_invalidation import watch_topology_changes
 
-def uniform(n_items: int, valid_values: list, shuffle_distribution: bool = True) -> list:
+PATH_CACHE_MAX_ENTRIES = 100_000
+PATH_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def uniform(n_items: int, valid_values: list, shuffle_distribution: bool = True, rng: random.Random | None = None) -> list:
     """Creates a list of size "n_items" with values from "valid_values" according to the uniform distribution.
     By default, the method shuffles the created list to avoid unbalanced spread of the distribution.
 
@@ -21,6 +31,7 @@ def uniform(n_items: int, valid_values: list, shuffle_distribution: bool = True)
         n_items (int): Number of items that will be created.
         valid_values (list): List of valid values for the list of values.
         shuffle_distribution (bool, optional): Defines whether the distribution is shuffled or not. Defaults to True.
+        rng (random.Random | None, optional): Random generator (e.g., a stream of "rng"). Defaults to the global one.
 
     Raises:
         Exception: Invalid "valid_values" argument.
@@ -41,15 +52,17 @@ def uniform(n_items: int, valid_values: list, shuffle_distribution: bool = True)
         for _ in range(0, int(distribution[i])):
             uniform_distribution.append(value)
 
+    generator = random if rng is None else rng
+
     # Computing leftover randomly to avoid disturbing the distribution
     leftover = n_items % len(valid_values)
     for i in range(leftover):
-        random_valid_value = random.choice(valid_values)
+        random_valid_value = generator.choice(valid_values)
         uniform_distribution.append(random_valid_value)
 
     # Shuffling distribution values in case 'shuffle_distribution' parameter is True
     if shuffle_distribution:
-        random.shuffle(uniform_distribution)
+        generator.shuffle(uniform_distribution)
 
     return uniform_distribution
 
@@ -101,18 +114,82 @@ def find_shortest_path(origin_network_switch: object, target_network_switch: obj
     topology = origin_network_switch.model.topology
     path = []
 
-    if not hasattr(topology, "delay_shortest_paths"):
-        topology.delay_shortest_paths = {}
+    # Paths toward switches that host servers are rebuilt from the precomputed delay matrix (when available)
+    delay_matrix = getattr(topology, "delay_matrix", None)
+    if delay_matrix is not None and delay_matrix.has_target(target_network_switch):
+        return delay_matrix.path(origin_network_switch=origin_network_switch, target_network_switch=target_network_switch)
+
+    if not hasattr(topology, "path_cache"):
+        topology.path_cache = PathCache(max_entries=PATH_CACHE_MAX_ENTRIES, max_bytes=PATH_CACHE_MAX_BYTES)
+        # Topology changes are only watched once there is a cache to keep consistent
+        if not hasattr(topology, "path_invalidator"):
+            watch_topology_changes(topology=topology, link_class=NetworkLink)
+
+    path = topology.path_cache.get(origin_network_switch=origin_network_switch, target_network_switch=target_network_switch)
+    if path is None:
+        # Same path as "nx.shortest_path", along with its delay (used to invalidate the cached paths)
+        delay, path = nx.bidirectional_dijkstra(
+            G=topology, source=origin_network_switch, target=target_network_switch, weight="delay"
+        )
+        topology.path_cache.put(
+            origin_network_switch=origin_network_switch, target_network_switch=target_network_switch, path=path, delay=delay
+        )
 
-    key = (origin_network_switch, target_network_switch)
+    return path
 
-    if key in topology.delay_shortest_paths.keys():
-        path = topology.delay_shortest_paths[key]
-    else:
-        path = nx.shortest_path(G=topology, source=origin_network_switch, target=target_network_switch, weight="delay")
-        topology.delay_shortest_paths[key] = path
 
-    return path
+def routed_shortest_path(G=None, source=None, target=None, weight=None, method="dijkstra"):
+    """Drop-in replacement of "nx.shortest_path" that answers the shortest path (delay used as weight) lookups between
+    network switches of a topology with "find_shortest_path", and forwards every other call to NetworkX.
+    """
+    if (
+        weight == "delay"
+        and method == "dijkstra"
+        and source is not None
+        and target is not None
+        and getattr(getattr(source, "model", None), "topology", None) is G
+    ):
+        return find_shortest_path(origin_network_switch=source, target_network_switch=target)
+    return nx.shortest_path(G=G, source=source, target=target, weight=weight, method=method)
+
+
+class RoutedNetworkX:
+    """Stands in for the "networkx" module inside EdgeSimPy's component modules, so that their shortest path lookups go
+    through "routed_shortest_path" (every other attribute is the one of NetworkX)."""
+
+    shortest_path = staticmethod(routed_shortest_path)
+
+    def __getattr__(self, name: str):
+        return getattr(nx, name)
+
+
+ROUTED_NETWORKX = RoutedNetworkX()
+
+
+def install_cached_routing(component_classes: Iterable[type]) -> list[str]:
+    """Routes the shortest path lookups of EdgeSimPy's components (e.g., the communication paths that
+    "User.set_communication_path" finds with "nx.shortest_path(..., weight="delay")") through "find_shortest_path", so
+    they are served by the path cache, or by the delay matrix when the topology has one. The path cache returns the same
+    paths as NetworkX, while the delay matrix returns paths with the same delay (among equally short paths, it may
+    choose another one).
+
+    Args:
+        component_classes (Iterable[type]): Component classes whose modules' NetworkX references are replaced.
+
+    Returns:
+        modules (list[str]): Names of the modules whose lookups are routed.
+    """
+    modules = []
+    for component_class in component_classes:
+        module = sys.modules[component_class.__module__]
+        if getattr(module, "nx", None) in (nx, ROUTED_NETWORKX):
+            module.nx = ROUTED_NETWORKX
+        elif getattr(module, "shortest_path", None) in (nx.shortest_path, routed_shortest_path):
+            module.shortest_path = routed_shortest_path
+        else:
+            continue
+        modules.append(module.__name__)
+    return modules
 
 
 def calculate_path_delay(origin_network_switch: object, target_network_switch: object) -> int:
@@ -127,12 +204,74 @@ def calculate_path_delay(origin_network_switch: object, target_network_switch: o
     """
     topology = origin_network_switch.model.topology
 
+    delay_matrix = getattr(topology, "delay_matrix", None)
+    if delay_matrix is not None and delay_matrix.has_target(target_network_switch):
+        return delay_matrix.delay(origin_network_switch=origin_network_switch, target_network_switch=target_network_switch)
+
     path = find_shortest_path(origin_network_switch=origin_network_switch, target_network_switch=target_network_switch)
     delay = topology.calculate_path_delay(path=path)
 
     return delay
 
 
+def connect_network_switches(
+    topology: Topology, network_switch: NetworkSwitch, neighbor: NetworkSwitch, delay: int, bandwidth: int
+) -> NetworkLink:
+    """Creates a network link between two network switches and notifies the "link_added" subscribers.
+
+    Args:
+        topology (Topology): Network topology.
+        network_switch (NetworkSwitch): One of the network switches connected by the link.
+        neighbor (NetworkSwitch): The other network switch connected by the link.
+        delay (int): Link delay.
+        bandwidth (int): Link bandwidth.
+
+    Returns:
+        link (NetworkLink): Created network link.
+    """
+    link = NetworkLink()
+    link.topology = topology
+    link.delay = delay
+    link.bandwidth = bandwidth
+    link.nodes = [network_switch, neighbor]
+    topology.add_edge(network_switch, neighbor)
+    topology._adj[network_switch][neighbor] = link
+    topology._adj[neighbor][network_switch] = link
+
+    publish("link_added", topology=topology, link=link)
+
+    return link
+
+
+def disconnect_network_switches(topology: Topology, network_switch: NetworkSwitch, neighbor: NetworkSwitch):
+    """Removes the network link between two network switches and notifies the "link_removed" subscribers.
+
+    Args:
+        topology (Topology): Network topology.
+        network_switch (NetworkSwitch): One of the network switches connected by the link.
+        neighbor (NetworkSwitch): The other network switch connected by the link.
+    """
+    link = topology[network_switch][neighbor]
+    topology.remove_edge(network_switch, neighbor)
+    NetworkLink.remove(link)
+
+    publish("link_removed", topology=topology, network_switch=network_switch, neighbor=neighbor)
+
+
+def remove_network_switch(topology: Topology, network_switch: NetworkSwitch):
+    """Removes a network switch (and its links) from the topology and notifies the "switch_removed" subscribers.
+
+    Args:
+        topology (Topology): Network topology.
+        network_switch (NetworkSwitch): Network switch that will be removed.
+    """
+    for neighbor in list(topology.neighbors(network_switch)):
+        NetworkLink.remove(topology[network_switch][neighbor])
+    topology.remove_node(network_switch)
+
+    publish("switch_removed", topology=topology, network_switch=network_switch)
+
+
 def sign(value: int):
     """Calculates the sign of a real number using the well-known "sign" function (https://wikipedia.org/wiki/Sign_function).
 
@@ -1,10 +1,16 @@
 #!/bin/env python3
+import hashlib
+import json
+import os
+import random
+
 import numpy as np
 import pandas as pd
-from faker import Faker
 
 from EdgeSimPy.edge_sim_py.components.point_of_interest import DAY_END_IN_MINUTES, DAY_START_IN_MINUTES
 
+from .rng import stream
+
 COORD_LOWER_BOUND, COORD_UPPER_BOUND = 0, 100
 NUMBER_OF_POINT_OF_INTERESTS = 30
 MIN_PEAK_DURATION_POI_MINUTES = 2 * 60
@@ -30,68 +36,136 @@ BOUNDING_BOX_STOP = {"Latitude": -26.376193, "Longitude": -48.945546}  # BOTTOM
 # | -1,-1   -1,+0   +1,-1
 # ----------------------- x
 
-
-def create_edge_servers_df(csv_filepath="./datasets/geo-dataset-724.csv", bounding_box_normalization=True) -> pd.DataFrame:
+# Columns of the OpenCelliD cell tower dumps (which have no header row)
+OPENCELLID_HEADERS = [
+    "Radio",  # The generation of broadband cellular network technology (Eg. LTE, GSM)
+    "MCC",  # Mobile country code. This info is publicly shared by International Telecommunication Union (link)
+    "MNC",  # Mobile network code. This info is publicly shared by International Telecommunication Union (link)
+    "LAC/TAC/NID",  # Location Area Code
+    "CID",  # This is a unique number used to identify each Base transceiver station or sector of BTS
+    "Changeable=0",  # The location is directly obtained from the telecom firm
+    "Longitude",  # Longitude, is a geographic coordinate that specifies the east-west position of a point on the Earth's surface
+    "Latitude",  # Latitude is a geographic coordinate that specifies the north–south position of a point on the Earth's surface.
+    "Range",  # Approximate area within which the cell could be. (In meters)
+    "Samples",  # Number of measures processed to get a particular data point
+    "Changeable=1",  # The location is determined by processing samples
+    "Created",  # When a particular cell was first added to database (UNIX timestamp)
+    "Updated",  # When a particular cell was last seen (UNIX timestamp)
+    "AverageSignal",  # To get the positions of cells, OpenCelliD processes measurements from data contributors. Each measurement includes GPS location of device + Scanned cell identifier (MCC-MNC-LAC-CID) + Other device properties (Signal strength). In this process, signal strength of the device is averaged. Most ‘averageSignal’ values are 0 because OpenCelliD simply didn’t receive signal strength values.
+]
+CELL_TOWERS_CSV = "./datasets/geo-dataset-724.csv"
+CSV_CHUNK_SIZE = 1_000_000  # Rows parsed at a time when streaming cell tower dumps
+CELL_TOWERS_CACHE_DIR = "./datasets/cache"
+FILE_HASHES_FILE = "file_hashes.json"  # Hashes of the cell tower dumps, by path, size and modification time
+
+
+def create_edge_servers_df(
+    csv_filepath=CELL_TOWERS_CSV,
+    bounding_box_normalization=True,
+    chunksize: int = CSV_CHUNK_SIZE,
+    cache_dir: str | None = CELL_TOWERS_CACHE_DIR,
+) -> pd.DataFrame:
     """Returns a dataframe of Latitude and Longitude coordinates of points,
     which will be transformed to Edge Servers, seem as grid and basestations will already be created.
     The coordinates can be mapped 1 to 1 from square grid to hexagonal grid.
+    The normalized coordinates are cached in "cache_dir" (keyed by the CSV contents and the bounding box),
+    so later calls with the same dump skip parsing it.
     """
-    headers = [
-        "Radio",  # The generation of broadband cellular network technology (Eg. LTE, GSM)
-        "MCC",  # Mobile country code. This info is publicly shared by International Telecommunication Union (link)
-        "MNC",  # Mobile network code. This info is publicly shared by International Telecommunication Union (link)
-        "LAC/TAC/NID",  # Location Area Code
-        "CID",  # This is a unique number used to identify each Base transceiver station or sector of BTS
-        "Changeable=0",  # The location is directly obtained from the telecom firm
-        "Longitude",  # Longitude, is a geographic coordinate that specifies the east-west position of a point on the Earth's surface
-        "Latitude",  # Latitude is a geographic coordinate that specifies the north–south position of a point on the Earth's surface.
-        "Range",  # Approximate area within which the cell could be. (In meters)
-        "Samples",  # Number of measures processed to get a particular data point
-        "Changeable=1",  # The location is determined by processing samples
-        "Created",  # When a particular cell was first added to database (UNIX timestamp)
-        "Updated",  # When a particular cell was last seen (UNIX timestamp)
-        "AverageSignal",  # To get the positions of cells, OpenCelliD processes measurements from data contributors. Each measurement includes GPS location of device + Scanned cell identifier (MCC-MNC-LAC-CID) + Other device properties (Signal strength). In this process, signal strength of the device is averaged. Most ‘averageSignal’ values are 0 because OpenCelliD simply didn’t receive signal strength values.
-    ]
-    df = pd.read_csv(csv_filepath, names=headers)
-
-    df = df.loc[df.Longitude <= BOUNDING_BOX_START["Longitude"]]
-    df = df.loc[df.Latitude <= BOUNDING_BOX_START["Latitude"]]
-
-    df = df.loc[df.Longitude >= BOUNDING_BOX_STOP["Longitude"]]
-    df = df.loc[df.Latitude >= BOUNDING_BOX_STOP["Latitude"]]
-
-    df = df.reset_index(drop=True)
-
-    df_norm = df.copy()
-
-    LAT_MIN, LAT_MAX = 0.0, 0.0
-    LON_MIN, LON_MAX = 0.0, 0.0
-    if bounding_box_normalization:
-        LON_MIN, LON_MAX = BOUNDING_BOX_STOP["Longitude"], BOUNDING_BOX_START["Longitude"]
-        LAT_MIN, LAT_MAX = BOUNDING_BOX_STOP["Latitude"], BOUNDING_BOX_START["Latitude"]
-    else:
-        LON_MIN, LON_MAX = df_norm.Longitude.min(), df_norm.Longitude.max()
-        LAT_MIN, LAT_MAX = df_norm.Latitude.min(), df_norm.Latitude.max()
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = cell_towers_cache_path(csv_filepath, bounding_box_normalization, cache_dir)
+        if os.path.exists(cache_file):
+            coordinates = np.load(cache_file)
+            return pd.DataFrame({"Longitude": coordinates[:, 0], "Latitude": coordinates[:, 1]})
+
+    df = normalize_to_hexagonal_grid(
+        read_cell_towers_csv(csv_filepath, chunksize=chunksize), bounding_box_normalization=bounding_box_normalization
+    ).drop_duplicates(subset=["Longitude", "Latitude"], ignore_index=True)
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)  # type: ignore
+        with open(f"{cache_file}.tmp", "wb") as output_file:
+            np.save(output_file, df[["Longitude", "Latitude"]].to_numpy(dtype=np.int64))
+        os.replace(f"{cache_file}.tmp", cache_file)
+
+    return df
+
+
+def read_cell_towers_csv(csv_filepath: str, chunksize: int = CSV_CHUNK_SIZE) -> pd.DataFrame:
+    """Streams an OpenCelliD dump, parsing only the Longitude and Latitude columns and keeping only the points inside
+    the bounding box, so memory usage is proportional to the filtered output rather than to the whole dump."""
+    chunks = pd.read_csv(
+        csv_filepath,
+        names=OPENCELLID_HEADERS,
+        usecols=["Longitude", "Latitude"],
+        dtype={"Longitude": np.float64, "Latitude": np.float64},
+        chunksize=chunksize,
+    )
+    filtered_chunks = [filter_bounding_box(chunk) for chunk in chunks]
+    if len(filtered_chunks) == 0:
+        return pd.DataFrame({"Longitude": np.empty(0, dtype=np.float64), "Latitude": np.empty(0, dtype=np.float64)})
+    return pd.concat(filtered_chunks, ignore_index=True)
+
+
+def cell_towers_cache_path(csv_filepath: str, bounding_box_normalization: bool, cache_dir: str) -> str:
+    """Builds the cache file path of a cell tower dump, keyed by its contents and by the normalization parameters."""
+    parameters = repr(
+        (BOUNDING_BOX_START, BOUNDING_BOX_STOP, COORD_LOWER_BOUND, COORD_UPPER_BOUND, bounding_box_normalization)
+    ).encode()
+    parameters_hash = hashlib.sha256(parameters).hexdigest()[:16]
+    return f"{cache_dir}/cell-towers-{file_sha256(csv_filepath, cache_dir=cache_dir)[:16]}-{parameters_hash}.npy"
+
+
+def _load_file_hashes(cache_dir: str) -> dict:
+    try:
+        with open(os.path.join(cache_dir, FILE_HASHES_FILE), encoding="UTF-8") as input_file:
+            return json.load(input_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def file_sha256(file_path: str, cache_dir: str | None = CELL_TOWERS_CACHE_DIR) -> str:
+    """Hashes a file, reusing the hash recorded in "cache_dir" while the file keeps its size and modification time (so
+    a multi-GB cell tower dump is only read again when it changes).
+
+    Args:
+        file_path (str): File path.
+        cache_dir (str | None, optional): Directory of the recorded hashes. Defaults to CELL_TOWERS_CACHE_DIR (None does
+            not record them).
+
+    Returns:
+        sha256 (str): Hexadecimal SHA-256 of the file contents.
+    """
+    stat = os.stat(file_path)
+    key = os.path.abspath(file_path)
+    hashes = _load_file_hashes(cache_dir) if cache_dir is not None else {}
+    recorded = hashes.get(key)
+    if recorded is not None and (recorded["size"], recorded["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return recorded["sha256"]
 
-    df_norm.Longitude = (df_norm.Longitude - LON_MIN) / (LON_MAX - LON_MIN) * (
-        COORD_UPPER_BOUND - COORD_LOWER_BOUND
-    ) + COORD_LOWER_BOUND
-    df_norm.Longitude = df_norm.Longitude.astype(np.int64)
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as input_file:
+        for block in iter(lambda: input_file.read(1024 * 1024), b""):
+            file_hash.update(block)
 
-    df_norm.Latitude = (df_norm.Latitude - LAT_MIN) / (LAT_MAX - LAT_MIN) * (
-        COORD_UPPER_BOUND - COORD_LOWER_BOUND
-    ) + COORD_LOWER_BOUND
-    df_norm.Latitude = df_norm.Latitude.astype(np.int64)
+    if cache_dir is not None:
+        hashes[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_hash.hexdigest()}
+        os.makedirs(cache_dir, exist_ok=True)
+        hashes_path = os.path.join(cache_dir, FILE_HASHES_FILE)
+        with open(f"{hashes_path}.{os.getpid()}.tmp", "w", encoding="UTF-8") as output_file:
+            json.dump(hashes, output_file, indent=4, sort_keys=True)
+        os.replace(f"{hashes_path}.{os.getpid()}.tmp", hashes_path)
+    return file_hash.hexdigest()
 
-    df_translated = translate_to_hexagonal_grid(df_norm)
-    df_translated = df_translated[["Longitude", "Latitude"]]
-    df_translated = df_translated.drop_duplicates(subset=["Longitude", "Latitude"], ignore_index=True)
 
-    return df_translated
+def recorded_file_sha256(file_path: str, cache_dir: str = CELL_TOWERS_CACHE_DIR) -> str | None:
+    """Gets the last hash recorded for a file by "file_sha256" (e.g., of a cell tower dump that was removed), if any."""
+    recorded = _load_file_hashes(cache_dir).get(os.path.abspath(file_path))
+    return recorded["sha256"] if recorded is not None else None
 
 
-def create_points_of_interest_df(bounding_box_normalization=True) -> pd.DataFrame:
-    fake = Faker()
+def create_points_of_interest_df(bounding_box_normalization=True, rng: random.Random | None = None) -> pd.DataFrame:
+    generator = stream("pois") if rng is None else rng
 
     # Points of interest
     poi = []
@@ -108,12 +182,12 @@ def create_points_of_interest_df(bounding_box_normalization=True) -> pd.DataFram
     # poi.append([-26.252303610588786, -48.852610343093396, 18.0, 23.0, "Shopping_Garten"])
 
     for i in range(NUMBER_OF_POINT_OF_INTERESTS):
-        latitude = fake.random.uniform(BOUNDING_BOX_STOP["Latitude"], BOUNDING_BOX_START["Latitude"])
-        longitude = fake.random.uniform(BOUNDING_BOX_STOP["Longitude"], BOUNDING_BOX_START["Longitude"])
-        peak_start = fake.random.uniform(
+        latitude = generator.uniform(BOUNDING_BOX_STOP["Latitude"], BOUNDING_BOX_START["Latitude"])
+        longitude = generator.uniform(BOUNDING_BOX_STOP["Longitude"], BOUNDING_BOX_START["Longitude"])
+        peak_start = generator.uniform(
             DAY_START_IN_MINUTES, DAY_END_IN_MINUTES - MAX_PEAK_DURATION_POI_MINUTES
         )  # Adjusted to ensure at least N units of time for peak duration
-        peak_end = fake.random.uniform(
+        peak_end = generator.uniform(
             peak_start + MIN_PEAK_DURATION_POI_MINUTES, min(peak_start + MAX_PEAK_DURATION_POI_MINUTES, DAY_END_IN_MINUTES)
         )  # Ensuring peak_end is at least N units after peak_start and within max duration
         name = f"POI_{chr(65 + i // 26)}{chr(65 + i % 26)}"
@@ -129,41 +203,70 @@ def create_points_of_interest_df(bounding_box_normalization=True) -> pd.DataFram
 
     df_poi = pd.DataFrame(data=poi_data)
 
-    LAT_MIN, LAT_MAX = 0.0, 0.0
-    LON_MIN, LON_MAX = 0.0, 0.0
+    return normalize_to_hexagonal_grid(df_poi, bounding_box_normalization=bounding_box_normalization, keep_columns=True)
+
+
+def filter_bounding_box(df: pd.DataFrame) -> pd.DataFrame:
+    """Keeps only the Longitude and Latitude of the points inside the bounding box (BOUNDING_BOX_START/STOP)."""
+    longitudes = df["Longitude"].to_numpy()
+    latitudes = df["Latitude"].to_numpy()
+    inside = (
+        (longitudes <= BOUNDING_BOX_START["Longitude"])
+        & (latitudes <= BOUNDING_BOX_START["Latitude"])
+        & (longitudes >= BOUNDING_BOX_STOP["Longitude"])
+        & (latitudes >= BOUNDING_BOX_STOP["Latitude"])
+    )
+    return pd.DataFrame({"Longitude": longitudes[inside], "Latitude": latitudes[inside]})
+
+
+def normalize_to_hexagonal_grid(
+    df: pd.DataFrame, bounding_box_normalization: bool = True, keep_columns: bool = False
+) -> pd.DataFrame:
+    """Normalizes the Longitude and Latitude of the points to integer grid coordinates within
+    [COORD_LOWER_BOUND, COORD_UPPER_BOUND] and translates them to the hexagonal grid, without row-wise operations.
+
+    Args:
+        df (pd.DataFrame): Dataframe with "Longitude" and "Latitude" columns (updated in place).
+        bounding_box_normalization (bool, optional): Whether the bounding box or the points' extent is used. Defaults to True.
+        keep_columns (bool, optional): Whether the other columns of the dataframe are kept. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Dataframe with the normalized hexagonal grid coordinates.
+    """
+    longitudes = df["Longitude"].to_numpy(dtype=np.float64)
+    latitudes = df["Latitude"].to_numpy(dtype=np.float64)
+
     if bounding_box_normalization:
         LON_MIN, LON_MAX = BOUNDING_BOX_STOP["Longitude"], BOUNDING_BOX_START["Longitude"]
         LAT_MIN, LAT_MAX = BOUNDING_BOX_STOP["Latitude"], BOUNDING_BOX_START["Latitude"]
     else:
-        LAT_MIN, LAT_MAX = df_poi.Latitude.min(), df_poi.Latitude.max()
-        LON_MIN, LON_MAX = df_poi.Longitude.min(), df_poi.Longitude.max()
+        LON_MIN, LON_MAX = longitudes.min(), longitudes.max()
+        LAT_MIN, LAT_MAX = latitudes.min(), latitudes.max()
 
-    df_poi.Longitude = (df_poi.Longitude - LON_MIN) / (LON_MAX - LON_MIN) * (
-        COORD_UPPER_BOUND - COORD_LOWER_BOUND
-    ) + COORD_LOWER_BOUND
-    df_poi.Longitude = df_poi.Longitude.astype(np.int64)
+    x = ((longitudes - LON_MIN) / (LON_MAX - LON_MIN) * (COORD_UPPER_BOUND - COORD_LOWER_BOUND) + COORD_LOWER_BOUND).astype(
+        np.int64
+    )
+    y = ((latitudes - LAT_MIN) / (LAT_MAX - LAT_MIN) * (COORD_UPPER_BOUND - COORD_LOWER_BOUND) + COORD_LOWER_BOUND).astype(
+        np.int64
+    )
 
-    df_poi.Latitude = (df_poi.Latitude - LAT_MIN) / (LAT_MAX - LAT_MIN) * (
-        COORD_UPPER_BOUND - COORD_LOWER_BOUND
-    ) + COORD_LOWER_BOUND
-    df_poi.Latitude = df_poi.Latitude.astype(np.int64)
+    if not keep_columns:
+        return pd.DataFrame({"Longitude": hexagonal_longitudes(x, y), "Latitude": y})
+    df["Longitude"] = hexagonal_longitudes(x, y)
+    df["Latitude"] = y
+    return df
 
-    return translate_to_hexagonal_grid(df_poi)
 
+def hexagonal_longitudes(longitudes: np.ndarray, latitudes: np.ndarray) -> np.ndarray:
+    """Translates square grid longitudes to the hexagonal grid, where odd rows are shifted by one column."""
+    longitudes = longitudes * 2
+    shifted = np.where(longitudes + 1 <= COORD_UPPER_BOUND, longitudes + 1, longitudes - 1)
+    return np.where(latitudes % 2 != 0, shifted, longitudes)
 
-def translate_to_hexagonal_grid(df: pd.DataFrame) -> pd.DataFrame:
-    def add_one_to_odd_latitude(row):
-        if row["Latitude"] % 2 != 0:
-            if row["Longitude"] + 1 <= COORD_UPPER_BOUND:
-                return row["Longitude"] + 1
-            else:
-                return row["Longitude"] - 1
-        else:
-            return row["Longitude"]
 
+def translate_to_hexagonal_grid(df: pd.DataFrame) -> pd.DataFrame:
     if "Longitude" in df.columns and "Latitude" in df.columns:
-        df["Longitude"] = df["Longitude"] * 2
-        df["Longitude"] = df.apply(add_one_to_odd_latitude, axis=1)
+        df["Longitude"] = hexagonal_longitudes(df["Longitude"].to_numpy(), df["Latitude"].to_numpy())
         return df
     else:
         raise Exception("Dataframe does not contain both 'Latitude' and 'Longitude' columns")
@@ -182,7 +285,7 @@ def test_gen_plots():
     from .scenario_build import create_base_stations, create_grid
     from .servers import PROVIDER_SPECS
 
-    df_edgeservers = create_edge_servers_df("./datasets/geo-dataset-724.csv")
+    df_edgeservers = create_edge_servers_df(CELL_TOWERS_CSV)
     number_of_edge_servers = 0
     for provider in PROVIDER_SPECS:
         number_of_edge_servers += sum([spec["number_of_objects"] for spec in provider.get("edge_server_specs", [])])
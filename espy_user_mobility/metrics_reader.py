@@ -0,0 +1,198 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from .metrics_writer import FILE_EXTENSIONS, USER_DELAYS_COMPONENT
+
+LOGS_DIRECTORY = "logs"
+RUN_COMPONENTS = ["EdgeServer", "Service", "User", USER_DELAYS_COMPONENT, "PointOfInterest"]
+
+# Columns read by "read_run"
+EDGE_SERVER_COLUMNS = ["Time Step", "Instance ID", "Model Name", "Resources Score"]
+SERVICE_COLUMNS = ["Time Step", "Instance ID", "Total Distance From Users"]
+POINT_OF_INTEREST_COLUMNS = ["Time Step", "Coordinates", "Is in peak"]
+
+# Text representations found in logs written before delays and coordinates had their own numeric columns
+DELAY_PATTERN = r"'?(?P<application>\d+)'?:\s*(?P<delay>[^,}]+)"
+COORDINATES_PATTERN = r"(?P<x>-?[\d.]+),\s*(?P<y>-?[\d.]+)"
+
+
+def read_metrics(file_path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Reads the metrics of a component written by the simulator, in any of the logs formats.
+
+    Args:
+        file_path (str): CSV file, or directory of Parquet/Arrow part files (e.g., "logs/.../User.parquet").
+        columns (list[str] | None, optional): Columns to read. Defaults to None (every column).
+
+    Returns:
+        df (pd.DataFrame): Metrics of the component.
+    """
+    if file_path.endswith(".csv"):
+        return pd.read_csv(file_path, usecols=columns, low_memory=False)
+    read = pd.read_parquet if file_path.endswith(".parquet") else pd.read_feather
+    return pd.concat([read(part, columns=columns) for part in metrics_parts(file_path)], ignore_index=True)
+
+
+def metrics_parts(file_path: str) -> list[str]:
+    """Lists the files that hold the metrics of a component (the CSV file itself, or every part file)."""
+    if not os.path.isdir(file_path):
+        return [file_path]
+    return sorted(os.path.join(file_path, name) for name in os.listdir(file_path) if not name.startswith("."))
+
+
+def metrics_path(logs_directory: str, component_name: str) -> str | None:
+    """Finds the metrics of a component in a logs directory (e.g., "User.csv" or "User.parquet").
+
+    Args:
+        logs_directory (str): Logs directory of a run.
+        component_name (str): Name of the component class (e.g., "User").
+
+    Returns:
+        file_path (str | None): Path of the metrics, or None if the component has no metrics.
+    """
+    for extension in ("csv", *FILE_EXTENSIONS.values()):
+        file_path = os.path.join(logs_directory, f"{component_name}.{extension}")
+        if os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def read_component(logs_directory: str, component_name: str, columns: list[str] | None = None) -> pd.DataFrame:
+    file_path = metrics_path(logs_directory, component_name)
+    if file_path is None:
+        raise FileNotFoundError(f"No metrics of {component_name} in {logs_directory}")
+    return read_metrics(file_path, columns=columns)
+
+
+def split_coordinates(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the "Coordinates X" and "Coordinates Y" columns to metrics that only have the text "Coordinates" column.
+
+    Args:
+        df (pd.DataFrame): Metrics of a component (e.g., users or points of interest).
+
+    Returns:
+        df (pd.DataFrame): Metrics with numeric coordinates.
+    """
+    if "Coordinates X" in df.columns or "Coordinates" not in df.columns:
+        return df
+    coordinates = df["Coordinates"].astype(str).str.extract(COORDINATES_PATTERN).astype(float)
+    return df.drop(columns="Coordinates").assign(**{"Coordinates X": coordinates["x"], "Coordinates Y": coordinates["y"]})
+
+
+def delays_from_text(df_user: pd.DataFrame) -> pd.DataFrame:
+    """Builds the long-format delays table out of the text "Delays" column of user metrics.
+
+    Args:
+        df_user (pd.DataFrame): User metrics with the "Delays" column (e.g., "{'1': 3.0, '2': inf}").
+
+    Returns:
+        df_user_delay (pd.DataFrame): Delays ("Time Step", "Instance ID", "Application ID" and "Delay").
+    """
+    matches = df_user["Delays"].astype(str).str.extractall(DELAY_PATTERN)
+    rows = matches.index.get_level_values(0)
+    return pd.DataFrame(
+        {
+            "Time Step": df_user["Time Step"].to_numpy()[rows],
+            "Instance ID": df_user["Instance ID"].to_numpy()[rows],
+            "Application ID": matches["application"].astype(np.int64).to_numpy(),
+            "Delay": pd.to_numeric(matches["delay"].str.strip(), errors="coerce").to_numpy(),  # "inf" is parsed as infinity
+        }
+    )
+
+
+def read_users(logs_directory: str) -> pd.DataFrame:
+    """Reads the user metrics of a run, with numeric "Coordinates X" and "Coordinates Y" columns.
+
+    Args:
+        logs_directory (str): Logs directory of a run.
+
+    Returns:
+        df_user (pd.DataFrame): User metrics.
+    """
+    return split_coordinates(read_component(logs_directory, "User"))
+
+
+def read_user_delays(logs_directory: str) -> pd.DataFrame:
+    """Reads the delays of every user toward each of its applications, one row per step, user and application.
+
+    Args:
+        logs_directory (str): Logs directory of a run.
+
+    Returns:
+        df_user_delay (pd.DataFrame): Delays ("Time Step", "Instance ID", "Application ID" and "Delay").
+    """
+    if metrics_path(logs_directory, USER_DELAYS_COMPONENT) is not None:
+        return read_component(logs_directory, USER_DELAYS_COMPONENT)
+    return delays_from_text(read_component(logs_directory, "User"))
+
+
+def mean_user_delays(df_user_delay: pd.DataFrame) -> pd.Series:
+    """Averages the delays of each user over its applications.
+
+    Args:
+        df_user_delay (pd.DataFrame): Delays (see "read_user_delays").
+
+    Returns:
+        mean_delays (pd.Series): Mean delay indexed by "Time Step" and "Instance ID" (infinite if any delay is).
+    """
+    return df_user_delay.groupby(["Time Step", "Instance ID"])["Delay"].mean()
+
+
+def discover_runs(logs_directory: str = LOGS_DIRECTORY) -> list[str]:
+    """Finds the logs directories of simulation runs (directories with user metrics, in any logs format).
+
+    Directories whose path contains "ignore" are skipped.
+
+    Args:
+        logs_directory (str, optional): Root of the logs. Defaults to LOGS_DIRECTORY.
+
+    Returns:
+        run_directories (list[str]): Logs directories of the runs, sorted.
+    """
+    run_directories = []
+    for directory, subdirectories, _ in os.walk(logs_directory):
+        if "ignore" in directory:
+            subdirectories.clear()
+        elif metrics_path(directory, "User") is not None:
+            run_directories.append(directory)
+            subdirectories.clear()  # Part file directories (e.g., "User.parquet") are not runs
+    return sorted(run_directories)
+
+
+def run_inputs(run_directory: str) -> list[str]:
+    paths = [metrics_path(run_directory, component_name) for component_name in RUN_COMPONENTS]
+    return [path for path in paths if path is not None]
+
+
+def is_up_to_date(outputs: list[str], inputs: list[str]) -> bool:
+    """Checks whether every output exists and is newer than every input (metrics files or part files)."""
+    if not all(os.path.exists(output) for output in outputs):
+        return False
+    newest_input = max((os.path.getmtime(part) for path in inputs for part in metrics_parts(path)), default=0.0)
+    return min((os.path.getmtime(output) for output in outputs), default=0.0) >= newest_input
+
+
+def read_run(run_directory: str) -> dict[str, pd.DataFrame]:
+    """Reads the metrics analyzed by the figures and aggregates of a run, reading each file once.
+
+    Args:
+        run_directory (str): Logs directory of the run.
+
+    Returns:
+        run (dict[str, pd.DataFrame]): Metrics of edge servers, services, users, user delays and points of interest.
+    """
+    run = {
+        "edge_servers": read_component(run_directory, "EdgeServer", columns=EDGE_SERVER_COLUMNS),
+        "services": read_component(run_directory, "Service", columns=SERVICE_COLUMNS),
+        "users": read_users(run_directory),
+    }
+    if metrics_path(run_directory, USER_DELAYS_COMPONENT) is not None:
+        run["user_delays"] = read_component(run_directory, USER_DELAYS_COMPONENT)
+    else:
+        run["user_delays"] = delays_from_text(run["users"])  # Logs written before delays had their own table
+    if metrics_path(run_directory, "PointOfInterest") is not None:
+        run["points_of_interest"] = split_coordinates(
+            read_component(run_directory, "PointOfInterest", columns=POINT_OF_INTEREST_COLUMNS)
+        )
+    return run
@@ -0,0 +1,350 @@
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is an optional dependency (the "columnar" extra)
+    pa = None
+
+LOGS_FORMATS = ("csv", "parquet", "arrow")
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+METRICS_BATCH_ROWS = 1_000_000  # Rows buffered per component before a part file is written
+COLUMN_INITIAL_ROWS = 1024  # Rows first allocated per column (buffers double as they fill up)
+USER_DELAYS_COMPONENT = "UserDelay"  # Long-format table of user delays (one row per user, application and step)
+
+# Column kinds, from the narrowest to the widest (values that do not fit a column's kind widen it)
+BOOL, INT, FLOAT, STRING = 0, 1, 2, 3
+KIND_DTYPES = {BOOL: np.bool_, INT: np.int64, FLOAT: np.float64, STRING: object}
+# Text of the values of each kind once their column holds strings (the same as the CSV logs)
+KIND_TEXT = {BOOL: lambda value: str(bool(value)), INT: lambda value: str(int(value)), FLOAT: lambda value: str(float(value))}
+
+
+def _arrow_type(kind: int | None) -> "pa.DataType":
+    if kind is None:
+        return pa.null()  # Column without any value so far
+    if kind == STRING:
+        return pa.dictionary(pa.int32(), pa.string())
+    return {BOOL: pa.bool_(), INT: pa.int64(), FLOAT: pa.float64()}[kind]
+
+
+def _convert_array(array: "pa.Array", kind: int | None) -> "pa.Array":
+    """Converts an Arrow array (a column of an earlier part file) to the type of a column kind."""
+    if array.type == _arrow_type(kind):
+        return array
+    if kind == STRING:
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        if pa.types.is_boolean(array.type) or pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+            text = KIND_TEXT[BOOL if pa.types.is_boolean(array.type) else INT if pa.types.is_integer(array.type) else FLOAT]
+            array = pa.array([None if value is None else text(value) for value in array.to_pylist()], type=pa.string())
+        return array.cast(pa.string()).dictionary_encode()
+    return array.cast(_arrow_type(kind))
+
+
+def _kind_of(value) -> int:
+    if isinstance(value, (bool, np.bool_)):
+        return BOOL
+    if isinstance(value, (int, np.integer)):
+        return INT
+    if isinstance(value, (float, np.floating)):
+        return FLOAT
+    return STRING
+
+
+class ColumnBuffer:
+    """Typed buffer of a metric column that grows geometrically (missing values are tracked by a mask).
+
+    The kind of each appended value is kept, so a column widened to strings holds the text of the original values (e.g.,
+    "True" for a boolean stored in a float column).
+    """
+
+    def __init__(self, capacity: int = COLUMN_INITIAL_ROWS, missing_rows: int = 0):
+        """Creates a column buffer.
+
+        Args:
+            capacity (int, optional): Number of rows first allocated. Defaults to COLUMN_INITIAL_ROWS.
+            missing_rows (int, optional): Rows already buffered (by other columns) before the column first appeared.
+                Defaults to 0.
+        """
+        capacity = max(capacity, missing_rows + 1)
+        self.kind = BOOL
+        self.values = np.zeros(capacity, dtype=KIND_DTYPES[BOOL])
+        self.mask = np.ones(capacity, dtype=np.bool_)
+        self.kinds = np.zeros(capacity, dtype=np.int8)
+        self.size = missing_rows
+
+    @property
+    def empty(self) -> bool:
+        """Whether every buffered row is missing."""
+        return bool(self.mask[: self.size].all())
+
+    def _reserve(self, size: int):
+        if size <= len(self.values):
+            return
+        capacity = max(size, 2 * len(self.values))
+        values = np.zeros(capacity, dtype=self.values.dtype)
+        values[: self.size] = self.values[: self.size]
+        mask = np.ones(capacity, dtype=np.bool_)
+        mask[: self.size] = self.mask[: self.size]
+        kinds = np.zeros(capacity, dtype=np.int8)
+        kinds[: self.size] = self.kinds[: self.size]
+        self.values, self.mask, self.kinds = values, mask, kinds
+
+    def _widen(self, kind: int):
+        if kind == self.kind:
+            return
+        if kind == STRING:
+            # Each value is converted from its own kind, not from the kind of the column
+            values = np.empty(len(self.values), dtype=object)
+            buffered = zip(self.values[: self.size].tolist(), self.mask[: self.size], self.kinds[: self.size])
+            values[: self.size] = [
+                None if missing else value if value_kind == STRING else KIND_TEXT[value_kind](value)
+                for value, missing, value_kind in buffered
+            ]
+        else:
+            values = self.values.astype(KIND_DTYPES[kind])
+        self.kind, self.values = kind, values
+
+    def append(self, value):
+        self._reserve(self.size + 1)
+        if value is not None:
+            kind = _kind_of(value)
+            if kind > self.kind:
+                self._widen(kind)
+            # Non-scalar values (e.g., communication paths) are stored with the same text representation as the CSV logs
+            if self.kind == STRING and not isinstance(value, str):
+                value = KIND_TEXT[kind](value) if kind != STRING else str(value)
+            self.values[self.size] = value
+            self.mask[self.size] = False
+            self.kinds[self.size] = kind
+        self.size += 1
+
+    def pad(self, size: int):
+        self._reserve(size)
+        self.size = size
+
+    def to_arrow(self, kind: int | None = None) -> "pa.Array":
+        """Converts the buffered rows to an Arrow array.
+
+        Args:
+            kind (int | None, optional): Kind of the array, at least as wide as the column's kind unless every row is
+                missing. Defaults to None (the column's kind, or the null type if every row is missing).
+
+        Returns:
+            array (pa.Array): Buffered rows.
+        """
+        if kind is None and self.empty:
+            return pa.nulls(self.size)
+        if kind is not None:
+            if self.empty:
+                return pa.nulls(self.size, type=_arrow_type(kind))
+            self._widen(max(kind, self.kind))
+        values, mask = self.values[: self.size], self.mask[: self.size]
+        if self.kind == STRING:
+            return pa.array(values, type=pa.string(), mask=mask).dictionary_encode()
+        return pa.array(values, type=_arrow_type(self.kind), mask=mask if mask.any() else None)
+
+
+class ColumnarMetricsWriter:
+    """Buffers the metrics collected by the simulator in typed columns and writes them in batches as Parquet or Arrow
+    IPC (Feather v2) part files: "<logs directory>/<component>.<format>/part-00000.<format>", ...
+
+    The part files of a component share one schema. Once written, a column keeps its type in later parts (a column
+    without values is written with the type of the earlier parts). A part that adds a column, or needs a wider type,
+    rewrites the earlier parts to the new schema, which only happens while the columns of a component settle.
+    """
+
+    def __init__(self, logs_directory: str, logs_format: str = "parquet", batch_rows: int = METRICS_BATCH_ROWS):
+        """Creates a metrics writer.
+
+        Args:
+            logs_directory (str): Directory where metrics are written.
+            logs_format (str, optional): "parquet" or "arrow". Defaults to "parquet".
+            batch_rows (int, optional): Rows buffered per component before they are written. Defaults to METRICS_BATCH_ROWS.
+        """
+        if pa is None:
+            raise ImportError('Columnar metrics require pyarrow (install the "columnar" extra)')
+        if logs_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported columnar logs format: {logs_format}")
+        self.logs_directory = logs_directory
+        self.logs_format = logs_format
+        self.batch_rows = batch_rows
+        self.columns: dict[str, dict[str, ColumnBuffer]] = {}
+        self.rows: dict[str, int] = {}
+        self.parts: dict[str, int] = {}
+        self.schemas: dict[str, dict[str, int | None]] = {}  # Kind of each column of the written parts (None: no values)
+
+    def add_records(self, component_name: str, records: list[dict]):
+        """Appends the records (one dictionary per component) collected in a step.
+
+        Args:
+            component_name (str): Name of the component class (e.g., "User").
+            records (list[dict]): Metric records.
+        """
+        columns = self.columns.setdefault(component_name, {})
+        for record in records:
+            rows = self.rows.get(component_name, 0)
+            if rows == self.batch_rows:
+                self.flush(component_name)
+                columns, rows = self.columns[component_name], 0
+
+            for name, value in record.items():
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = ColumnBuffer(capacity=min(COLUMN_INITIAL_ROWS, self.batch_rows), missing_rows=rows)
+                column.append(value)
+            rows += 1
+            for column in columns.values():
+                if column.size < rows:
+                    column.pad(rows)  # Column missing from this record
+            self.rows[component_name] = rows
+
+    def flush(self, component_name: str | None = None):
+        """Writes the buffered rows of a component (or of every component) to a new part file.
+
+        Args:
+            component_name (str | None, optional): Name of the component class. Defaults to None (every component).
+        """
+        for name in [component_name] if component_name is not None else list(self.columns):
+            rows = self.rows.get(name, 0)
+            if rows == 0:
+                continue
+            columns = self.columns[name]
+            schema = self.schemas.get(name, {})
+            updated_schema = dict(schema)
+            for column_name, column in columns.items():
+                kind = None if column.empty else column.kind
+                previous_kind = updated_schema.get(column_name)
+                if previous_kind is None or (kind is not None and kind > previous_kind):
+                    updated_schema[column_name] = kind
+
+            part = self.parts.get(name, 0)
+            if part > 0 and updated_schema != schema:
+                self._rewrite_parts(name, updated_schema)
+            self.schemas[name] = updated_schema
+
+            arrays = {}
+            for column_name, kind in updated_schema.items():
+                column = columns.get(column_name)
+                arrays[column_name] = column.to_arrow(kind) if column is not None else pa.nulls(rows, type=_arrow_type(kind))
+            self._write_table(name, part, pa.table(arrays))
+
+            self.parts[name] = part + 1
+            self.columns[name] = {}
+            self.rows[name] = 0
+
+    def _part_path(self, name: str, part: int) -> str:
+        extension = FILE_EXTENSIONS[self.logs_format]
+        return os.path.join(self.logs_directory, f"{name}.{extension}", f"part-{part:05d}.{extension}")
+
+    def _write_table(self, name: str, part: int, table: "pa.Table"):
+        file_path = self._part_path(name, part)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if self.logs_format == "parquet":
+            pq.write_table(table, file_path)
+        else:
+            feather.write_feather(table, file_path)
+
+    def _rewrite_parts(self, name: str, schema: dict[str, int | None]):
+        for part in range(self.parts.get(name, 0)):
+            file_path = self._part_path(name, part)
+            table = pq.read_table(file_path) if self.logs_format == "parquet" else feather.read_table(file_path)
+            arrays = {
+                column_name: (
+                    _convert_array(table.column(column_name).combine_chunks(), kind)
+                    if column_name in table.column_names
+                    else pa.nulls(table.num_rows, type=_arrow_type(kind))
+                )
+                for column_name, kind in schema.items()
+            }
+            self._write_table(name, part, pa.table(arrays))
+
+
+def split_user_metrics(records: list[dict]) -> list[dict]:
+    """Replaces the nested fields of user metric records by numeric columns.
+
+    "Coordinates" becomes "Coordinates X" and "Coordinates Y", and the "Delays" dictionary (application ID -> delay) is
+    moved to long-format records (time step, user ID, application ID and delay, with infinite delays preserved).
+
+    Args:
+        records (list[dict]): User metric records, updated in place.
+
+    Returns:
+        delay_records (list[dict]): One record per user and application.
+    """
+    delay_records = []
+    for record in records:
+        coordinates = record.pop("Coordinates", None)
+        if coordinates is not None:
+            record["Coordinates X"], record["Coordinates Y"] = coordinates
+        delays = record.pop("Delays", None) or {}
+        for application_id, delay in delays.items():
+            delay_records.append(
+                {
+                    "Time Step": record.get("Time Step"),
+                    "Instance ID": record.get("Instance ID"),
+                    "Application ID": int(application_id),
+                    "Delay": float("nan") if delay is None else float(delay),
+                }
+            )
+    return delay_records
+
+
+def install_user_metrics(simulator: object):
+    """Logs user delays as the USER_DELAYS_COMPONENT table and user coordinates as numeric columns (see
+    "split_user_metrics"), so they can be analyzed without parsing text.
+
+    Args:
+        simulator (object): EdgeSimPy simulator (already initialized).
+    """
+    monitor = simulator.monitor
+
+    def user_metrics_monitor(*args, **kwargs):
+        # Only the records appended by this step are split
+        first_record = len(simulator.agent_metrics.get("User", []))
+        result = monitor(*args, **kwargs)
+        delay_records = split_user_metrics(simulator.agent_metrics.get("User", [])[first_record:])
+        simulator.agent_metrics.setdefault(USER_DELAYS_COMPONENT, []).extend(delay_records)
+        return result
+
+    simulator.monitor = user_metrics_monitor
+
+
+def install_columnar_metrics(simulator: object, logs_format: str = "parquet", batch_rows: int = METRICS_BATCH_ROWS):
+    """Replaces the simulator's metric dumps with columnar files.
+
+    The records appended by "Simulator.monitor" are moved into typed buffers right after each step (so they do not pile up
+    as dictionaries), and "Simulator.dump_data_to_disk" writes the buffered rows instead of CSV files.
+
+    Args:
+        simulator (object): EdgeSimPy simulator (already initialized).
+        logs_format (str, optional): "parquet" or "arrow". Defaults to "parquet".
+        batch_rows (int, optional): Rows buffered per component before they are written. Defaults to METRICS_BATCH_ROWS.
+
+    Returns:
+        writer (ColumnarMetricsWriter): Writer that receives the simulator metrics.
+    """
+    writer = ColumnarMetricsWriter(logs_directory=simulator.logs_directory, logs_format=logs_format, batch_rows=batch_rows)
+    monitor = simulator.monitor
+
+    def drain_agent_metrics():
+        for component_name, records in simulator.agent_metrics.items():
+            if len(records) > 0:
+                writer.add_records(component_name, records)
+                records.clear()
+
+    def columnar_monitor(*args, **kwargs):
+        result = monitor(*args, **kwargs)
+        drain_agent_metrics()
+        return result
+
+    def columnar_dump_data_to_disk(clean_data_after_dumping: bool = True):
+        drain_agent_metrics()
+        writer.flush()
+
+    simulator.monitor = columnar_monitor
+    simulator.dump_data_to_disk = columnar_dump_data_to_disk
+    return writer
@@ -0,0 +1,175 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+from . import rng
+from .coordinates_trace import CoordinatesTrace
+from .peak_timeline import NO_POINT_OF_INTEREST, PeakTimeline
+
+MOBILITY_BATCH_STEPS = 60  # Steps of every user's trajectory computed per batch
+NO_TARGET = NO_POINT_OF_INTEREST
+
+
+class MobilityEngine:
+    """Batched point of interest mobility model of every user, an opt-in alternative to EdgeSimPy's per-user
+    "point_of_interest_mobility" model (not an equivalent of it).
+
+    Positions, speeds, interest state and target points of interest are kept in NumPy arrays and advanced for all users
+    at once. Each step, users that are not interested in a point of interest become interested with their
+    "chance_of_becoming_interested" (percentage) in one of the points of interest in peak (see PeakTimeline), move up to
+    "movement_distance" toward it, and stay there until its peak ends. Positions are snapped to the base stations of
+    the hexagonal grid. Trajectories are computed MOBILITY_BATCH_STEPS steps at a time and appended to the users'
+    coordinates traces.
+
+    The model behaves differently from the per-user one: interest draws come from the "poi_mobility" stream instead of
+    the global generators (in a different order), and the rules above reimplement the per-user model's rather than
+    calling it. Only the traces decided by the chances alone (0 or 100) are the same as the per-user model's.
+    """
+
+    def __init__(
+        self,
+        users: Iterable[object],
+        points_of_interest: Iterable[object],
+        base_station_coordinates: Iterable[tuple],
+        batch_steps: int = MOBILITY_BATCH_STEPS,
+        minutes_per_step: int = 1,
+    ):
+        """Creates the engine arrays.
+
+        Args:
+            users (Iterable[object]): Users moved by the engine.
+            points_of_interest (Iterable[object]): Points of interest (coordinates and peak window in minutes of the day).
+            base_station_coordinates (Iterable[tuple]): Hexagonal grid coordinates of the base stations users snap to.
+            batch_steps (int, optional): Steps computed per batch. Defaults to MOBILITY_BATCH_STEPS.
+            minutes_per_step (int, optional): Simulated minutes per step. Defaults to 1.
+        """
+        self.users = list(users)
+        self.user_rows = {user.id: row for row, user in enumerate(self.users)}
+        self.batch_steps = batch_steps
+        self.generator = rng.numpy_stream("poi_mobility")
+
+        # Users resume from the last position of their traces (the steps already in the traces are not recomputed)
+        self.positions = np.array([user.coordinates_trace[-1] for user in self.users], dtype=np.float64).reshape(-1, 2)
+        self.cells = self.positions.astype(np.int64)
+        self.speeds = np.array([user.movement_distance for user in self.users], dtype=np.float64)
+        self.interest_chances = np.array([user.chance_of_becoming_interested for user in self.users], dtype=np.float64) / 100
+        self.targets = np.full(len(self.users), NO_TARGET, dtype=np.int64)
+
+        # Targets are rows of the peak timeline, which keeps the points of interest in peak ready to be sampled
+        self.peak_timeline = PeakTimeline(points_of_interest, minutes_per_step=minutes_per_step)
+        self.poi_coordinates = np.array(
+            [poi.coordinates for poi in self.peak_timeline.points_of_interest], dtype=np.float64
+        ).reshape(-1, 2)
+
+        # Dense (x, y) grid marking the cells that have a base station
+        base_station_coordinates = np.array(list(base_station_coordinates), dtype=np.int64).reshape(-1, 2)
+        base_station_coordinates = base_station_coordinates[(base_station_coordinates >= 0).all(axis=1)]
+        shape = base_station_coordinates.max(axis=0) + 1 if len(base_station_coordinates) > 0 else (0, 0)
+        self.has_base_station = np.zeros(shape, dtype=np.bool_)
+        self.has_base_station[base_station_coordinates[:, 0], base_station_coordinates[:, 1]] = True
+
+        # Trajectories of the current batch, with shape (steps, users, 2), starting at step "batch_start"
+        self.batch_start = min((len(user.coordinates_trace) for user in self.users), default=0)
+        self.trajectories = np.empty((0, len(self.users), 2), dtype=np.int64)
+
+    def snap(self, positions: np.ndarray) -> np.ndarray:
+        """Snaps positions to the nearest cell of the hexagonal grid (odd rows have odd x coordinates), keeping the
+        current cell of the users whose nearest cell has no base station.
+        """
+        y = np.rint(positions[:, 1]).astype(np.int64)
+        parity = y & 1
+        x = np.rint((positions[:, 0] - parity) / 2).astype(np.int64) * 2 + parity
+        inside = (x >= 0) & (y >= 0) & (x < self.has_base_station.shape[0]) & (y < self.has_base_station.shape[1])
+        valid = inside.copy()
+        valid[inside] = self.has_base_station[x[inside], y[inside]]
+        return np.where(valid[:, None], np.stack((x, y), axis=1), self.cells)
+
+    def advance(self, step: int):
+        """Moves every user by one step.
+
+        Args:
+            step (int): Simulation step being computed.
+        """
+        # Users lose interest once the peak of their point of interest ends
+        if self.peak_timeline.advance(step):
+            interested = np.flatnonzero(self.targets != NO_TARGET)
+            self.targets[interested[~self.peak_timeline.active[self.targets[interested]]]] = NO_TARGET
+
+        # Idle users become interested in one of the points of interest in peak
+        idle = np.flatnonzero(self.targets == NO_TARGET)
+        if len(self.peak_timeline.active_rows) > 0 and len(idle) > 0:
+            chosen = idle[self.generator.random(len(idle)) < self.interest_chances[idle]]
+            self.targets[chosen] = self.peak_timeline.sample(self.generator, size=len(chosen))
+
+        # Interested users move toward their points of interest
+        moving = np.flatnonzero(self.targets != NO_TARGET)
+        if len(moving) > 0:
+            offsets = self.poi_coordinates[self.targets[moving]] - self.positions[moving]
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+            fractions = np.minimum(1.0, self.speeds[moving] / np.maximum(distances, 1e-12))
+            self.positions[moving] += offsets * fractions[:, None]
+        self.cells = self.snap(self.positions)
+
+    def compute_batch(self, first_step: int):
+        """Computes the trajectories of every user for the next batch of steps.
+
+        Args:
+            first_step (int): First step of the batch.
+        """
+        trajectories = np.empty((self.batch_steps, len(self.users), 2), dtype=np.int64)
+        for offset in range(self.batch_steps):
+            self.advance(first_step + offset)
+            trajectories[offset] = self.cells
+        self.batch_start, self.trajectories = first_step, trajectories
+
+    def point_of_interest_mobility(self, user: object):
+        """Mobility model assigned to the users of the engine: extends the coordinates trace of a user with the rest of
+        the current batch (computing the next batch for every user when the current one is exhausted).
+
+        Args:
+            user (object): User whose coordinates trace is exhausted.
+        """
+        trace_length = len(user.coordinates_trace)
+        while trace_length >= self.batch_start + len(self.trajectories):
+            self.compute_batch(first_step=self.batch_start + len(self.trajectories))
+        first_row = max(trace_length - self.batch_start, 0)
+        trajectory = self.trajectories[first_row:, self.user_rows[user.id]]
+        if isinstance(user.coordinates_trace, CoordinatesTrace):
+            # Compact traces copy the batch as is (no tuple per step)
+            user.coordinates_trace.extend(trajectory)
+        else:
+            user.coordinates_trace.extend(map(tuple, trajectory.tolist()))
+
+
+def install_mobility_engine(
+    users: Iterable[object],
+    points_of_interest: Iterable[object],
+    base_stations: Iterable[object],
+    batch_steps: int = MOBILITY_BATCH_STEPS,
+    minutes_per_step: int = 1,
+) -> MobilityEngine:
+    """Moves the users whose mobility model is "point_of_interest_mobility" with a batched MobilityEngine.
+
+    Args:
+        users (Iterable[object]): Users of the scenario.
+        points_of_interest (Iterable[object]): Points of interest of the scenario.
+        base_stations (Iterable[object]): Base stations users snap to.
+        batch_steps (int, optional): Steps computed per batch. Defaults to MOBILITY_BATCH_STEPS.
+        minutes_per_step (int, optional): Simulated minutes per step. Defaults to 1.
+
+    Returns:
+        mobility_engine (MobilityEngine): Installed engine.
+    """
+    users = [
+        user for user in users if getattr(getattr(user, "mobility_model", None), "__name__", None) == "point_of_interest_mobility"
+    ]
+    engine = MobilityEngine(
+        users=users,
+        points_of_interest=points_of_interest,
+        base_station_coordinates=[base_station.coordinates for base_station in base_stations],
+        batch_steps=batch_steps,
+        minutes_per_step=minutes_per_step,
+    )
+    for user in users:
+        user.mobility_model = engine.point_of_interest_mobility
+    return engine
@@ -0,0 +1,119 @@
+from collections.abc import Callable, Iterable
+
+# Callbacks registered for each observed component class, indexed by attribute name
+_OBSERVERS: dict[type, dict[str, list[Callable]]] = {}
+
+# Original "__setattr__" methods of the observed component classes
+_ORIGINAL_SETATTR: dict[type, Callable] = {}
+
+# Callbacks registered for each observed dict component class (e.g., NetworkLink), indexed by key
+_ITEM_OBSERVERS: dict[type, dict[str, list[Callable]]] = {}
+
+# Original "__setitem__" methods of the observed dict component classes
+_ORIGINAL_SETITEM: dict[type, Callable] = {}
+
+# Callbacks subscribed to each named event (e.g., "link_added")
+_SUBSCRIBERS: dict[str, list[Callable]] = {}
+
+
+def observe_attributes(component_class: type, attribute_names: Iterable[str], callback: Callable):
+    """Calls "callback(obj, attribute_name, value, previous_value)" every time one of the given attributes of an instance of
+    "component_class" (or of its subclasses) is assigned. EdgeSimPy components are plain Python objects, so this is
+    done by wrapping the class's "__setattr__" method the first time the class is observed.
+
+    Args:
+        component_class (type): Component class whose instances will be observed (e.g., EdgeServer).
+        attribute_names (Iterable[str]): Names of the observed attributes.
+        callback (Callable): Function called after the attribute is updated.
+    """
+    observers = _OBSERVERS.get(component_class)
+    if observers is None:
+        observers = {}
+        _OBSERVERS[component_class] = observers
+        original_setattr = component_class.__setattr__
+        _ORIGINAL_SETATTR[component_class] = original_setattr
+
+        def __setattr__(self, name, value):
+            callbacks = observers.get(name)
+            if not callbacks:
+                original_setattr(self, name, value)
+                return
+            previous_value = getattr(self, name, None)
+            original_setattr(self, name, value)
+            for observer_callback in callbacks:
+                observer_callback(self, name, value, previous_value)
+
+        component_class.__setattr__ = __setattr__
+
+    for attribute_name in attribute_names:
+        callbacks = observers.setdefault(attribute_name, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+
+def observe_items(component_class: type, keys: Iterable[str], callback: Callable):
+    """Calls "callback(obj, key, value, previous_value)" every time one of the given items of an instance of
+    "component_class" is assigned. Some EdgeSimPy components are dicts (e.g., NetworkLink, whose items are the edge data
+    read by NetworkX), and writing their items bypasses "__setattr__", so their "__setitem__" method is wrapped instead.
+
+    Args:
+        component_class (type): Dict component class whose instances will be observed (e.g., NetworkLink).
+        keys (Iterable[str]): Observed keys.
+        callback (Callable): Function called after the item is updated.
+    """
+    observers = _ITEM_OBSERVERS.get(component_class)
+    if observers is None:
+        observers = {}
+        _ITEM_OBSERVERS[component_class] = observers
+        original_setitem = component_class.__setitem__
+        _ORIGINAL_SETITEM[component_class] = original_setitem
+
+        def __setitem__(self, key, value):
+            callbacks = observers.get(key)
+            if not callbacks:
+                original_setitem(self, key, value)
+                return
+            previous_value = self.get(key)
+            original_setitem(self, key, value)
+            for observer_callback in callbacks:
+                observer_callback(self, key, value, previous_value)
+
+        component_class.__setitem__ = __setitem__
+
+    for key in keys:
+        callbacks = observers.setdefault(key, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+
+def subscribe(event_name: str, callback: Callable):
+    """Calls "callback(**payload)" every time an event is published.
+
+    Args:
+        event_name (str): Name of the event (e.g., "link_added").
+        callback (Callable): Function called with the event payload as keyword arguments.
+    """
+    _SUBSCRIBERS.setdefault(event_name, []).append(callback)
+
+
+def publish(event_name: str, **payload):
+    """Notifies the subscribers of an event.
+
+    Args:
+        event_name (str): Name of the event (e.g., "link_added").
+    """
+    for callback in _SUBSCRIBERS.get(event_name, ()):
+        callback(**payload)
+
+
+def clear_observers():
+    """Removes every registered callback and restores the original "__setattr__" and "__setitem__" of the observed classes."""
+    for component_class, original_setattr in _ORIGINAL_SETATTR.items():
+        component_class.__setattr__ = original_setattr
+    for component_class, original_setitem in _ORIGINAL_SETITEM.items():
+        component_class.__setitem__ = original_setitem
+    _OBSERVERS.clear()
+    _ORIGINAL_SETATTR.clear()
+    _ITEM_OBSERVERS.clear()
+    _ORIGINAL_SETITEM.clear()
+    _SUBSCRIBERS.clear()
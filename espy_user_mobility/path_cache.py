@@ -0,0 +1,230 @@
+import sys
+from array import array
+from collections import OrderedDict
+from math import inf
+
+# Approximate memory used by each cache entry besides its path array (key tuple, ordered dict node and references)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class PathCache:
+    """Bounded LRU cache of shortest paths between network switches.
+
+    Paths are stored as "array('I')" of network switch IDs instead of lists of NetworkSwitch objects, and the least
+    recently used entries are evicted once the cache exceeds its entry or memory budget. The cache also indexes which
+    entries traverse each network switch and keeps the delay of each path, so topology changes only invalidate the
+    affected paths.
+    """
+
+    def __init__(self, max_entries: int | None = 100_000, max_bytes: int | None = 256 * 1024 * 1024):
+        """Creates an empty path cache.
+
+        Args:
+            max_entries (int | None, optional): Maximum number of cached paths (None disables the limit). Defaults to 100_000.
+            max_bytes (int | None, optional): Approximate memory budget in bytes (None disables the limit). Defaults to 256 MiB.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[tuple[int, int], array] = OrderedDict()
+        self.delays: dict[tuple[int, int], float] = {}  # Delay of the cached paths (when known)
+        self.nodes: dict[int, object] = {}
+        self.node_entries: dict[int, set[tuple[int, int]]] = {}  # Network switch ID -> keys of the paths traversing it
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        return key in self.entries
+
+    @staticmethod
+    def _entry_size(path: array) -> int:
+        return sys.getsizeof(path) + ENTRY_OVERHEAD_BYTES
+
+    def get(self, origin_network_switch: object, target_network_switch: object) -> list | None:
+        """Gets a cached path, marking it as the most recently used one.
+
+        Args:
+            origin_network_switch (object): Origin network switch.
+            target_network_switch (object): Target network switch.
+
+        Returns:
+            path (list | None): Cached path (list of network switches), or None if the path is not cached.
+        """
+        key = (origin_network_switch.id, target_network_switch.id)
+        path = self.entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return [self.nodes[node_id] for node_id in path]
+
+    def put(self, origin_network_switch: object, target_network_switch: object, path: list, delay: float | None = None):
+        """Stores a path, evicting the least recently used entries if the cache exceeds its budget.
+
+        Args:
+            origin_network_switch (object): Origin network switch.
+            target_network_switch (object): Target network switch.
+            path (list): Path (list of network switches) between the origin and target network switches.
+            delay (float | None, optional): Delay of the path (unknown delays make "invalidate_shortcut" drop the path).
+                Defaults to None.
+        """
+        key = (origin_network_switch.id, target_network_switch.id)
+        self.remove(key)
+
+        for node in path:
+            self.nodes[node.id] = node
+        compact_path = array("I", [node.id for node in path])
+        self.entries[key] = compact_path
+        if delay is not None:
+            self.delays[key] = delay
+        self.size_bytes += self._entry_size(compact_path)
+        for node_id in compact_path:
+            self.node_entries.setdefault(node_id, set()).add(key)
+
+        while len(self.entries) > 1 and (
+            (self.max_entries is not None and len(self.entries) > self.max_entries)
+            or (self.max_bytes is not None and self.size_bytes > self.max_bytes)
+        ):
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def remove(self, key: tuple[int, int]) -> bool:
+        """Removes a cached path.
+
+        Args:
+            key (tuple[int, int]): IDs of the origin and target network switches.
+
+        Returns:
+            bool: Whether the path was cached.
+        """
+        path = self.entries.pop(key, None)
+        if path is None:
+            return False
+        self.delays.pop(key, None)
+        self.size_bytes -= self._entry_size(path)
+        for node_id in path:
+            keys = self.node_entries.get(node_id)
+            if keys is not None:
+                keys.discard(key)
+                if len(keys) == 0:
+                    del self.node_entries[node_id]
+        return True
+
+    def invalidate_node(self, node_id: int) -> int:
+        """Drops the cached paths that traverse a network switch.
+
+        Args:
+            node_id (int): ID of the network switch.
+
+        Returns:
+            invalidated (int): Number of dropped paths.
+        """
+        keys = list(self.node_entries.get(node_id, ()))
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def invalidate_link(self, node_id: int, neighbor_id: int) -> int:
+        """Drops the cached paths that traverse the link between two network switches.
+
+        Args:
+            node_id (int): ID of one of the network switches connected by the link.
+            neighbor_id (int): ID of the other network switch connected by the link.
+
+        Returns:
+            invalidated (int): Number of dropped paths.
+        """
+        keys = self.keys_through_link(node_id=node_id, neighbor_id=neighbor_id)
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def keys_through_link(self, node_id: int, neighbor_id: int) -> list[tuple[int, int]]:
+        """Lists the cached paths that traverse the link between two network switches.
+
+        Args:
+            node_id (int): ID of one of the network switches connected by the link.
+            neighbor_id (int): ID of the other network switch connected by the link.
+
+        Returns:
+            keys (list[tuple[int, int]]): IDs of the origin and target network switches of the paths.
+        """
+        keys = []
+        for key in self.node_entries.get(node_id, ()):
+            path = self.entries[key]
+            for i in range(len(path) - 1):
+                if (path[i] == node_id and path[i + 1] == neighbor_id) or (path[i] == neighbor_id and path[i + 1] == node_id):
+                    keys.append(key)
+                    break
+        return keys
+
+    def invalidate_shortcut(
+        self, node_id: int, neighbor_id: int, delay: float, node_delays: dict[int, float], neighbor_delays: dict[int, float]
+    ) -> int:
+        """Drops the cached paths that a new (or faster) link between two network switches may replace. The path from "o"
+        to "t" is affected if "d(o, a) + delay + d(b, t)" (or vice versa) is not longer than its delay: a shorter path
+        exists, or an equally short one that a new lookup may choose instead. Paths that traverse the link are kept, as no
+        other path becomes faster by more than they do.
+
+        Args:
+            node_id (int): ID of one of the network switches connected by the link (a).
+            neighbor_id (int): ID of the other network switch connected by the link (b).
+            delay (float): Link delay.
+            node_delays (dict[int, float]): Delay from "a" to each network switch (missing switches are farther than any
+                cached path).
+            neighbor_delays (dict[int, float]): Delay from "b" to each network switch.
+
+        Returns:
+            invalidated (int): Number of dropped paths.
+        """
+        through_link = set(self.keys_through_link(node_id=node_id, neighbor_id=neighbor_id))
+        keys = []
+        for key in self.entries:
+            if key in through_link:
+                continue
+            path_delay = self.delays.get(key)
+            origin_id, target_id = key
+            shortcut = min(
+                node_delays.get(origin_id, inf) + delay + neighbor_delays.get(target_id, inf),
+                neighbor_delays.get(origin_id, inf) + delay + node_delays.get(target_id, inf),
+            )
+            if path_delay is None or shortcut <= path_delay:
+                keys.append(key)
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def max_delay(self) -> float | None:
+        """Gets the delay of the longest cached path (None if some delay is unknown)."""
+        if len(self.delays) < len(self.entries):
+            return None
+        return max(self.delays.values(), default=0.0)
+
+    def clear(self):
+        """Drops every cached path (statistics are kept)."""
+        self.entries.clear()
+        self.delays.clear()
+        self.node_entries.clear()
+        self.size_bytes = 0
+
+    def statistics(self) -> dict:
+        """Summarizes the cache usage.
+
+        Returns:
+            statistics (dict): Number of entries, approximate size, hits, misses, evictions and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups > 0 else 0.0,
+        }
@@ -0,0 +1,141 @@
+import networkx as nx
+
+from .delay_matrix import DelayMatrix
+from .observers import observe_attributes, observe_items, subscribe
+
+# Link data that affects the cached paths. Delays are the shortest path weights, and bandwidth changes drop the cached
+# paths through the link, so that they are found again with the current link data
+LINK_ATTRIBUTES = ("delay", "bandwidth")
+
+
+class PathInvalidator:
+    """Keeps the topology's path cache and delay matrix consistent with link and network switch changes.
+
+    Only the affected entries are touched: slower or removed links drop the cached paths that traverse them and repair
+    the delay matrix rows whose shortest path trees use them, while faster or new links only repair the rows and drop the
+    cached paths that may become shorter through them.
+    """
+
+    def __init__(self, topology: nx.Graph):
+        """Creates an invalidator for a topology.
+
+        Args:
+            topology (nx.Graph): Network topology whose caches are kept consistent.
+        """
+        self.topology = topology
+        self.link_values: dict[tuple[int, str], object] = {}  # (link object ID, attribute) -> last handled value
+
+    def watch(self, link_class: type):
+        """Subscribes to link delay and bandwidth changes and to the topology change events published by the helper methods.
+
+        NetworkLink is a dict whose items are the edge data read by NetworkX, so both item writes (link["delay"] = ...)
+        and attribute writes (link.delay = ...) are observed.
+
+        Args:
+            link_class (type): NetworkLink component class.
+        """
+        observe_attributes(link_class, LINK_ATTRIBUTES, self._on_link_changed)
+        if issubclass(link_class, dict):
+            observe_items(link_class, LINK_ATTRIBUTES, self._on_link_changed)
+        subscribe("link_added", self.on_link_added)
+        subscribe("link_removed", self.on_link_removed)
+        subscribe("switch_removed", self.on_switch_removed)
+
+    @property
+    def path_cache(self):
+        return getattr(self.topology, "path_cache", None)
+
+    @property
+    def delay_matrix(self) -> DelayMatrix | None:
+        return getattr(self.topology, "delay_matrix", None)
+
+    def _on_link_changed(self, link: object, attribute_name: str, value: float, previous_value: float | None):
+        # Attribute writes of dict links also write the item, so the same change may be notified twice
+        previous_value = self.link_values.get((id(link), attribute_name), previous_value)
+        self.link_values[(id(link), attribute_name)] = value
+
+        # Links are only part of the topology once both of their network switches are set
+        if getattr(link, "topology", None) is not self.topology or previous_value is None or value == previous_value:
+            return
+        nodes = getattr(link, "nodes", [])
+        if len(nodes) != 2 or not self.topology.has_edge(nodes[0], nodes[1]):
+            return
+
+        if attribute_name == "bandwidth":
+            if self.path_cache is not None:
+                self.path_cache.invalidate_link(node_id=nodes[0].id, neighbor_id=nodes[1].id)
+        elif value > previous_value:
+            self._on_link_slower(node=nodes[0], neighbor=nodes[1])
+        else:
+            self._on_link_faster(node=nodes[0], neighbor=nodes[1], delay=value)
+
+    def _on_link_slower(self, node: object, neighbor: object):
+        if self.path_cache is not None:
+            self.path_cache.invalidate_link(node_id=node.id, neighbor_id=neighbor.id)
+        if self.delay_matrix is not None:
+            self.delay_matrix.repair_rows(
+                topology=self.topology, rows=self.delay_matrix.rows_through_link(node=node, neighbor=neighbor)
+            )
+
+    def _on_link_faster(self, node: object, neighbor: object, delay: float):
+        delay_matrix = self.delay_matrix
+        if delay_matrix is not None:
+            if node.id not in delay_matrix.node_columns or neighbor.id not in delay_matrix.node_columns:
+                # The link connects a network switch that did not exist when the matrix was computed
+                targets = [delay_matrix.nodes[delay_matrix.node_columns[target_id]] for target_id in delay_matrix.target_rows]
+                self.topology.delay_matrix = DelayMatrix.compute(topology=self.topology, targets=targets)  # type: ignore
+            else:
+                rows = delay_matrix.rows_improved_by_link(node=node, neighbor=neighbor, delay=delay)
+                delay_matrix.repair_rows(topology=self.topology, rows=rows)
+
+        # The cached paths (toward targets outside the matrix) are checked against the delays from both ends of the link,
+        # which only need to be known up to the longest cached path
+        path_cache = self.path_cache
+        if path_cache is not None and len(path_cache) > 0:
+            cutoff = path_cache.max_delay()
+            node_delays, neighbor_delays = (
+                {
+                    network_switch.id: path_delay
+                    for network_switch, path_delay in nx.single_source_dijkstra_path_length(
+                        self.topology, source, cutoff=cutoff, weight="delay"
+                    ).items()
+                }
+                for source in (node, neighbor)
+            )
+            path_cache.invalidate_shortcut(
+                node_id=node.id, neighbor_id=neighbor.id, delay=delay, node_delays=node_delays, neighbor_delays=neighbor_delays
+            )
+
+    def on_link_added(self, topology: nx.Graph, link: object):
+        if topology is self.topology:
+            self._on_link_faster(node=link.nodes[0], neighbor=link.nodes[1], delay=link.delay)
+
+    def on_link_removed(self, topology: nx.Graph, network_switch: object, neighbor: object):
+        if topology is self.topology:
+            self._on_link_slower(node=network_switch, neighbor=neighbor)
+
+    def on_switch_removed(self, topology: nx.Graph, network_switch: object):
+        if topology is not self.topology:
+            return
+        if self.path_cache is not None:
+            self.path_cache.invalidate_node(node_id=network_switch.id)
+        delay_matrix = self.delay_matrix
+        if delay_matrix is not None and network_switch.id in delay_matrix.node_columns:
+            delay_matrix.remove_target(target_network_switch=network_switch)
+            delay_matrix.repair_rows(topology=self.topology, rows=delay_matrix.rows_through_node(node=network_switch))
+
+
+def watch_topology_changes(topology: nx.Graph, link_class: type) -> PathInvalidator:
+    """Attaches a path invalidator to a topology.
+
+    Args:
+        topology (nx.Graph): Network topology.
+        link_class (type): NetworkLink component class.
+
+    Returns:
+        path_invalidator (PathInvalidator): Invalidator attached to the topology.
+    """
+    path_invalidator = PathInvalidator(topology=topology)
+    path_invalidator.watch(link_class=link_class)
+    topology.path_invalidator = path_invalidator  # type: ignore
+    return path_invalidator
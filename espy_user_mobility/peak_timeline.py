@@ -0,0 +1,141 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+from EdgeSimPy.edge_sim_py.components.point_of_interest import DAY_END_IN_MINUTES, DAY_START_IN_MINUTES
+
+NO_POINT_OF_INTEREST = -1
+PEAK_METRIC = "Is in peak"  # Metric of the points of interest logged by EdgeSimPy
+
+
+class PeakTimeline:
+    """Peak state of the points of interest, updated from a sorted timeline of peak start and end events.
+
+    Peaks are repeated every simulated day (from DAY_START_IN_MINUTES to DAY_END_IN_MINUTES), so the events of a day are
+    sorted once and replayed as steps go by. The state of a point of interest only changes on the steps that cross one
+    of its events, and the active points of interest (with the cumulative weights used to sample them) are only rebuilt
+    on those steps.
+    """
+
+    def __init__(self, points_of_interest: Iterable[object], weights: Iterable[float] | None = None, minutes_per_step: int = 1):
+        """Creates the timeline.
+
+        Args:
+            points_of_interest (Iterable[object]): Points of interest (peak window in minutes of the day).
+            weights (Iterable[float] | None, optional): Weight of each point of interest when sampled. Defaults to None
+                (same weight for every point of interest).
+            minutes_per_step (int, optional): Simulated minutes per step. Defaults to 1.
+        """
+        self.points_of_interest = list(points_of_interest)
+        self.rows = {poi.id: row for row, poi in enumerate(self.points_of_interest)}
+        self.minutes_per_step = minutes_per_step
+        self.weights = np.ones(len(self.points_of_interest)) if weights is None else np.array(list(weights), dtype=np.float64)
+
+        # Events of a day sorted by minute, with the end of a peak processed before a start on the same minute
+        starts = np.array([poi.peak_start for poi in self.points_of_interest], dtype=np.float64)
+        ends = np.array([poi.peak_end for poi in self.points_of_interest], dtype=np.float64)
+        minutes = np.concatenate((starts, ends))
+        activations = np.concatenate((np.ones(len(starts), dtype=np.bool_), np.zeros(len(ends), dtype=np.bool_)))
+        order = np.lexsort((activations, minutes))
+        self.event_minutes = minutes[order]
+        self.event_rows = np.tile(np.arange(len(self.points_of_interest)), 2)[order]
+        self.event_activations = activations[order]
+
+        self.reset()
+
+    def reset(self):
+        self.active = np.zeros(len(self.points_of_interest), dtype=np.bool_)
+        self.active_rows = np.empty(0, dtype=np.int64)
+        self.cumulative_weights = np.empty(0, dtype=np.float64)
+        self.step, self.day, self.next_event = -1, 0, 0
+
+    def advance(self, step: int) -> bool:
+        """Applies the events up to a step.
+
+        Args:
+            step (int): Simulation step (steps before the current one replay the timeline from the beginning).
+
+        Returns:
+            changed (bool): Whether any point of interest changed its peak state.
+        """
+        if step < self.step:
+            self.reset()
+        self.step = step
+        day, minutes = divmod(step * self.minutes_per_step, DAY_END_IN_MINUTES - DAY_START_IN_MINUTES)
+        minutes += DAY_START_IN_MINUTES
+
+        changed = False
+        if day != self.day:
+            # Peaks do not cross days, so a new day starts with no point of interest in peak
+            changed = bool(self.active.any())
+            self.active[:] = False
+            self.day, self.next_event = day, 0
+
+        last_event = np.searchsorted(self.event_minutes, minutes, side="right")
+        if last_event > self.next_event:
+            events = slice(self.next_event, last_event)
+            self.active[self.event_rows[events]] = self.event_activations[events]
+            self.next_event = last_event
+            changed = True
+
+        if changed:
+            self.active_rows = np.flatnonzero(self.active)
+            self.cumulative_weights = np.cumsum(self.weights[self.active_rows])
+        return changed
+
+    def is_active(self, point_of_interest: object) -> bool:
+        return bool(self.active[self.rows[point_of_interest.id]])
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        """Draws points of interest in peak, proportionally to their weights.
+
+        Args:
+            generator (np.random.Generator): Random generator.
+            size (int): Number of draws.
+
+        Returns:
+            rows (np.ndarray): Rows (positions in "points_of_interest") drawn, or NO_POINT_OF_INTEREST if no point of
+                interest is in peak.
+        """
+        if len(self.active_rows) == 0 or self.cumulative_weights[-1] <= 0:
+            return np.full(size, NO_POINT_OF_INTEREST, dtype=np.int64)
+        draws = generator.random(size) * self.cumulative_weights[-1]
+        return self.active_rows[np.searchsorted(self.cumulative_weights, draws, side="right")]
+
+
+def install_peak_timeline(simulator: object, point_of_interest_class: type, minutes_per_step: int = 1) -> PeakTimeline:
+    """Logs the "Is in peak" metric of the points of interest from a PeakTimeline, advanced once per step before the
+    simulator collects the metrics, instead of checking each point of interest's peak window.
+
+    Args:
+        simulator (object): EdgeSimPy simulator (already initialized).
+        point_of_interest_class (type): PointOfInterest component class.
+        minutes_per_step (int, optional): Simulated minutes per step. Defaults to 1.
+
+    Returns:
+        peak_timeline (PeakTimeline): Timeline of the existing points of interest.
+    """
+    timeline = PeakTimeline(point_of_interest_class.all(), minutes_per_step=minutes_per_step)
+    point_of_interest_class._peak_timeline = timeline
+    monitor = simulator.monitor
+
+    def peak_timeline_monitor(*args, **kwargs):
+        timeline.advance(simulator.schedule.steps)
+        return monitor(*args, **kwargs)
+
+    simulator.monitor = peak_timeline_monitor
+
+    # Runs in the same process install their own timeline, read by the collect method patched by the first one
+    if "_collect_without_timeline" not in point_of_interest_class.__dict__:
+        collect_without_timeline = point_of_interest_class.collect
+        point_of_interest_class._collect_without_timeline = collect_without_timeline
+
+        def collect(self) -> dict:
+            # The other metrics (and the order of the columns) are the ones logged by EdgeSimPy
+            metrics = collect_without_timeline(self)
+            metrics[PEAK_METRIC] = type(self)._peak_timeline.is_active(self)
+            return metrics
+
+        point_of_interest_class.collect = collect
+
+    return timeline
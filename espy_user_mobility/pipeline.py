@@ -0,0 +1,332 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import random
+import resource
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+
+from EdgeSimPy import edge_sim_py as espy
+
+from . import rng
+from .base_station_index import install_base_station_index
+from .scenario_build import (
+    create_base_stations,
+    create_cloud_servers,
+    create_edge_servers,
+    create_grid,
+    create_points_of_interest,
+    create_providers,
+    create_regitries,
+    create_topology,
+)
+
+STAGE_CHECKPOINT_DIRECTORY = "datasets/cache/stages"
+STAGE_CHECKPOINTS_KEPT = 2  # Checkpoints kept per stage (the most recently used ones), each holding every component
+
+
+class Stage:
+    """Step of the scenario generation pipeline.
+
+    A stage reads and updates a shared context (e.g., "grid", "topology") and creates EdgeSimPy components. Its key
+    chains the key of the previous stage with the scenario parameters it depends on, so changing a parameter only
+    invalidates the stage that uses it and the ones after it.
+    """
+
+    def __init__(self, name: str, function: Callable[[dict], None], parameters: tuple[str, ...] = ()):
+        """Creates a stage.
+
+        Args:
+            name (str): Stage name.
+            function (Callable[[dict], None]): Function that runs the stage over the pipeline context.
+            parameters (tuple[str, ...], optional): Scenario parameters used by the stage, as "group.name" paths of
+                "scenario_cache.scenario_parameters". Defaults to ().
+        """
+        self.name = name
+        self.function = function
+        self.parameters = parameters
+
+    def key(self, previous_key: str, parameters: dict) -> str:
+        values = {path: _parameter(parameters, path) for path in self.parameters}
+        content = json.dumps([previous_key, self.name, values], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def _parameter(parameters: dict, path: str):
+    value = parameters
+    for name in path.split("."):
+        value = value[name]
+    return value
+
+
+def _grid_stage(context: dict):
+    context["grid"] = create_grid()
+
+
+def _base_stations_stage(context: dict):
+    create_base_stations(context["grid"])
+
+
+def _topology_stage(context: dict):
+    context["topology"] = create_topology()
+
+
+def _cloud_stage(context: dict):
+    create_cloud_servers(context["topology"], context["grid"])  # Appends the cloud coordinates to the grid
+
+
+def _edge_stage(context: dict):
+    context["df_edge_servers"] = create_edge_servers()
+
+
+def _registries_stage(context: dict):
+    create_regitries()
+
+
+def _providers_stage(context: dict):
+    create_providers(context["grid"])
+
+
+def _pois_stage(context: dict):
+    context["df_pois"] = create_points_of_interest()
+
+
+PIPELINE_STAGES = [
+    Stage("grid", _grid_stage, parameters=("seed", "map_build.coordinate_bounds")),
+    Stage("base_stations", _base_stations_stage),
+    Stage("topology", _topology_stage, parameters=("scenario_build.edge_link", "scenario_build.bulk_grid_build")),
+    Stage(
+        "cloud",
+        _cloud_stage,
+        parameters=(
+            "scenario_build.number_of_cloud_base_stations",
+            "scenario_build.cloud_grid_offset",
+            "scenario_build.cloud_link",
+            "servers.servers_per_spec",
+            "servers.provider_specs",
+        ),
+    ),
+    Stage(
+        "edge",
+        _edge_stage,
+        parameters=(
+            "map_build.bounding_box",
+            "map_build.cell_towers_sha256",
+            "servers.servers_per_spec",
+            "servers.provider_specs",
+        ),
+    ),
+    Stage(
+        "registries",
+        _registries_stage,
+        parameters=("servers.container_image_specifications", "servers.container_registry_specifications"),
+    ),
+    Stage(
+        "providers",
+        _providers_stage,
+        parameters=(
+            "scenario_build.application_specifications",
+            "scenario_build.delay_sla_values",
+            "scenario_build.service_demand_values",
+            "scenario_build.users",
+            "scenario_build.user_speed",
+            "scenario_build.user_chance_of_becoming_interested",
+        ),
+    ),
+    Stage(
+        "pois",
+        _pois_stage,
+        parameters=(
+            "map_build.number_of_points_of_interest",
+            "map_build.peak_duration_minutes",
+            "map_build.bounding_box",
+        ),
+    ),
+]
+
+
+def component_classes(base_class: type = espy.ComponentManager) -> list[type]:
+    """Lists every EdgeSimPy component class (subclasses of ComponentManager, recursively)."""
+    classes = []
+    for component_class in base_class.__subclasses__():
+        classes.append(component_class)
+        classes.extend(component_classes(component_class))
+    return classes
+
+
+def save_checkpoint(file_path: str, context: dict):
+    """Persists the pipeline context along with every EdgeSimPy component and the state of the random generators
+    (global generators and "rng" streams).
+
+    Args:
+        file_path (str): Checkpoint file path.
+        context (dict): Pipeline context.
+    """
+    state = {
+        "components": {
+            component_class.__qualname__: (component_class._instances, component_class._object_count)
+            for component_class in component_classes()
+            if "_instances" in component_class.__dict__
+        },
+        "context": context,
+        "random_state": random.getstate(),
+        "numpy_random_state": np.random.get_state(),
+        "rng_state": rng.get_state(),
+    }
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    try:
+        with open(f"{file_path}.tmp", "wb") as output_file:
+            pickle.dump(state, output_file, protocol=pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        os.remove(f"{file_path}.tmp")
+        raise
+    os.replace(f"{file_path}.tmp", file_path)
+
+
+def prune_checkpoints(file_path: str, kept: int = STAGE_CHECKPOINTS_KEPT):
+    """Removes the least recently used checkpoints of the stage of a checkpoint (checkpoints of the same stage for
+    other parameters), keeping "kept" of them (including the given one).
+
+    Args:
+        file_path (str): Checkpoint that was just used (written or restored).
+        kept (int, optional): Checkpoints kept for the stage. Defaults to STAGE_CHECKPOINTS_KEPT.
+    """
+    # Checkpoints are named "<index>-<stage>-<key>.pkl", and using a checkpoint updates its modification time
+    os.utime(file_path)
+    directory, file_name = os.path.split(file_path)
+    prefix = file_name.rsplit("-", 1)[0]
+    checkpoints = sorted(glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(prefix)}-*.pkl")), key=os.path.getmtime)
+    for checkpoint in checkpoints[: max(len(checkpoints) - kept, 0)]:
+        if checkpoint != file_path:
+            os.remove(checkpoint)
+
+
+def load_checkpoint(file_path: str) -> dict:
+    """Restores the EdgeSimPy components and random generators persisted by "save_checkpoint".
+
+    Args:
+        file_path (str): Checkpoint file path.
+
+    Returns:
+        context (dict): Pipeline context.
+    """
+    with open(file_path, "rb") as input_file:
+        state = pickle.load(input_file)
+
+    for component_class in component_classes():
+        if "_instances" in component_class.__dict__:
+            instances, object_count = state["components"].get(component_class.__qualname__, ([], 0))
+            component_class._instances = instances
+            component_class._object_count = object_count
+    random.setstate(state["random_state"])
+    np.random.set_state(state["numpy_random_state"])
+    rng.set_state(state["rng_state"])
+
+    # Base stations are looked up by coordinates through an index that must point to the restored objects
+    install_base_station_index(espy.BaseStation)
+    return state["context"]
+
+
+def resident_memory_mb() -> float:
+    """Gets the resident set size of the current process (VmRSS), in MiB.
+
+    When "/proc" is not available, the peak resident set size since the process started (getrusage) is returned instead.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is in KiB on Linux
+
+
+def run_pipeline(
+    parameters: dict,
+    stages: list[Stage] = PIPELINE_STAGES,
+    checkpoint_directory: str | None = STAGE_CHECKPOINT_DIRECTORY,
+    trace_memory: bool = False,
+) -> tuple[dict, list[dict]]:
+    """Runs the scenario generation stages, resuming from the last stage whose checkpoint matches the parameters.
+
+    Args:
+        parameters (dict): Scenario parameters (see "scenario_cache.scenario_parameters").
+        stages (list[Stage], optional): Pipeline stages. Defaults to PIPELINE_STAGES.
+        checkpoint_directory (str | None, optional): Where checkpoints are stored (None disables them).
+            Defaults to STAGE_CHECKPOINT_DIRECTORY.
+        trace_memory (bool, optional): Whether the Python memory allocated by each stage is also traced (tracemalloc,
+            which slows the stages down severalfold). The change of the resident set size of each stage is always
+            reported. Defaults to False.
+
+    Returns:
+        (tuple[dict, list[dict]]): Pipeline context and the report (name, key, status, time and memory) of each stage.
+    """
+    keys, previous_key = [], ""
+    for stage in stages:
+        previous_key = stage.key(previous_key, parameters)
+        keys.append(previous_key)
+
+    def checkpoint_path(index: int) -> str:
+        return os.path.join(checkpoint_directory, f"{index:02d}-{stages[index].name}-{keys[index]}.pkl")  # type: ignore
+
+    # Resuming from the latest checkpoint available
+    context, first_stage = {}, 0
+    if checkpoint_directory is not None:
+        for index in reversed(range(len(stages))):
+            if os.path.exists(checkpoint_path(index)):
+                context = load_checkpoint(checkpoint_path(index))
+                prune_checkpoints(checkpoint_path(index))
+                first_stage = index + 1
+                break
+
+    reports = [{"stage": stages[index].name, "key": keys[index], "status": "restored"} for index in range(first_stage)]
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    try:
+        for index in range(first_stage, len(stages)):
+            stage = stages[index]
+            if trace_memory:
+                tracemalloc.reset_peak()
+                memory_before = tracemalloc.get_traced_memory()[0]
+            rss_before = resident_memory_mb()
+            start_time = time.perf_counter()
+
+            stage.function(context)
+
+            report = {
+                "stage": stage.name,
+                "key": keys[index],
+                "status": "built",
+                "seconds": time.perf_counter() - start_time,
+                "rss_delta_mb": resident_memory_mb() - rss_before,
+            }
+            if trace_memory:
+                memory_after, memory_peak = tracemalloc.get_traced_memory()
+                report["allocated_mb"] = (memory_after - memory_before) / 2**20
+                report["peak_mb"] = (memory_peak - memory_before) / 2**20
+
+            if checkpoint_directory is not None:
+                save_checkpoint(checkpoint_path(index), context)
+                prune_checkpoints(checkpoint_path(index))
+            reports.append(report)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    for report in reports:
+        if report["status"] == "restored":
+            print(f"Stage {report['stage']:<13} restored from checkpoint {report['key']}")
+        else:
+            memory = f", RSS {report['rss_delta_mb']:+.1f} MiB"
+            if trace_memory:
+                memory += f", {report['allocated_mb']:.1f} MiB allocated ({report['peak_mb']:.1f} MiB peak)"
+            print(f"Stage {report['stage']:<13} built in {report['seconds']:.2f} seconds{memory}")
+    return context, reports
@@ -0,0 +1,421 @@
+import argparse
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+import matplotlib.animation as animation
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from cycler import cycler
+
+from EdgeSimPy.edge_sim_py.components.point_of_interest import DAY_END_IN_MINUTES, DAY_START_IN_MINUTES
+
+from . import aggregate_store
+from .metrics_reader import LOGS_DIRECTORY, discover_runs, is_up_to_date, mean_user_delays, metrics_path, read_run, run_inputs
+
+PLOTS_DIRECTORY = "plots"  # Figures of a run are written to the same relative path as its logs
+CDF_PLOTS_DIRECTORY = "plots/cdf"
+ANIMATION_FILE = "user_coordinates.mov"
+
+DAY_CYCLE_IN_MINUTES = DAY_END_IN_MINUTES - DAY_START_IN_MINUTES
+
+SHOW_TITLES = False
+FIGURE_SIZE = (12, 8)
+COORDINATE_COLUMNS = ["Coordinates X", "Coordinates Y"]
+COLORS = [
+    "tab:blue",
+    "tab:red",
+    "tab:green",
+    "tab:purple",
+    "tab:pink",
+    "tab:brown",
+    "tab:orange",
+    "tab:gray",
+    "tab:olive",
+    "tab:cyan",
+]
+POINTS_OF_INTEREST_CYCLER = cycler(linestyle=["-", "--", ":", "-."]) * cycler(color=COLORS)
+CDF_CYCLER = cycler(color=COLORS[1:4] + COLORS[:1] + COLORS[4:]) * cycler(linestyle=["-", "--", ":"])
+
+
+def _edge_only(edge_servers: pd.DataFrame) -> pd.DataFrame:
+    return edge_servers[edge_servers["Model Name"] != "CLOUD"]
+
+
+def _cloud_only(edge_servers: pd.DataFrame) -> pd.DataFrame:
+    return edge_servers[edge_servers["Model Name"] == "CLOUD"]
+
+
+def _mean_resource_score(edge_servers: pd.DataFrame) -> pd.Series:
+    return edge_servers.groupby("Time Step")["Resources Score"].mean()
+
+
+def _mean_distance_from_users(services: pd.DataFrame) -> pd.Series:
+    return services.groupby("Time Step")["Total Distance From Users"].mean()
+
+
+def _time_series_figure(series: pd.Series, ylabel: str, title: str) -> plt.Figure:
+    figure, ax = plt.subplots(figsize=FIGURE_SIZE, layout="constrained")
+    ax.plot(series.index, series.values)
+    ax.set_xlabel("Time Step")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title) if SHOW_TITLES else None
+    ax.grid(True)
+    return figure
+
+
+def plot_mean_resource_score_edge_cloud(run: dict) -> plt.Figure:
+    return _time_series_figure(
+        _mean_resource_score(run["edge_servers"]), "Mean Resource Score", "Mean Resource Score (Edge and Cloud) over Time Steps"
+    )
+
+
+def plot_mean_resource_score_edge_only(run: dict) -> plt.Figure:
+    return _time_series_figure(
+        _mean_resource_score(_edge_only(run["edge_servers"])),
+        "Mean Resource Score",
+        "Mean Resource Score (Edge only) over Time Steps",
+    )
+
+
+def plot_mean_resource_score_cloud_only(run: dict) -> plt.Figure:
+    return _time_series_figure(
+        _mean_resource_score(_cloud_only(run["edge_servers"])),
+        "Mean Resource Score",
+        "Mean Resource Score (Cloud only) over Time Steps",
+    )
+
+
+def plot_mean_resource_score_by_model(run: dict) -> plt.Figure:
+    mean_resource_score_model = run["edge_servers"].groupby(["Time Step", "Model Name"])["Resources Score"].mean().unstack()
+
+    figure, ax = plt.subplots(figsize=FIGURE_SIZE, layout="constrained")
+    for model in mean_resource_score_model.columns:
+        ax.plot(mean_resource_score_model.index, mean_resource_score_model[model], label=model)
+    ax.set_xlabel("Time Step")
+    ax.set_ylabel("Mean Resource Score")
+    ax.set_title("Mean Resource Score over Time Steps by Model Name") if SHOW_TITLES else None
+    ax.legend(title="Model Name")
+    ax.grid(True)
+    return figure
+
+
+def plot_mean_distance_from_users(run: dict) -> plt.Figure:
+    return _time_series_figure(
+        _mean_distance_from_users(run["services"]),
+        "Mean Normalized Distance from Services to Users",
+        "Mean Normalized Distance from Services to Users over Time Steps",
+    )
+
+
+def plot_mean_distance_from_users_and_resource_score(run: dict) -> plt.Figure:
+    mean_distance_from_users = _mean_distance_from_users(run["services"])
+    mean_resource_score_edge_only = _mean_resource_score(_edge_only(run["edge_servers"]))
+
+    figure, ax1 = plt.subplots(figsize=FIGURE_SIZE, layout="constrained")
+    ax1.plot(
+        mean_distance_from_users.index, mean_distance_from_users.values, "b-", label="Normalized Distance from Services to Users"
+    )
+    ax1.set_xlabel("Time Step")
+    ax1.set_ylabel("Mean Normalized Distance from Services to Users", color="b")
+    ax1.tick_params(axis="y", labelcolor="b")
+    ax1.grid(True)
+    ax1.legend(loc="upper left")
+
+    ax2 = ax1.twinx()
+    ax2.plot(
+        mean_resource_score_edge_only.index, mean_resource_score_edge_only.values, "r--", label="Mean Resource Score (Edge only)"
+    )
+    ax2.set_ylabel("Mean Resource Score (Edge only)", color="r")
+    ax2.tick_params(axis="y", labelcolor="r")
+    ax2.legend(loc="upper right")
+    ax1.set_title("Mean Total Distance From Users & Mean Resource Score over Time Steps") if SHOW_TITLES else None
+    return figure
+
+
+def plot_mean_delay(run: dict) -> plt.Figure:
+    # Mean delay of each user over its apps, then over users
+    mean_delay = mean_user_delays(run["user_delays"]).groupby("Time Step").mean()
+    return _time_series_figure(mean_delay, "Mean Delay from Users to Apps", "Mean Delay for all Apps over Time Steps")
+
+
+def plot_users_interested_in_points_of_interest(run: dict) -> plt.Figure:
+    poi_counts = run["users"].groupby(["Time Step", "Point of Interest"]).size().unstack(fill_value=0)
+
+    figure, ax = plt.subplots(figsize=FIGURE_SIZE, layout="constrained")
+    ax.set_prop_cycle(POINTS_OF_INTEREST_CYCLER)
+    for poi in poi_counts.columns:
+        ax.plot(poi_counts.index, poi_counts[poi], label=poi)
+    ax.set_xlabel("Time Step")
+    ax.set_ylabel("Number of Users")
+    ax.set_title("Number of Users Interested in Each Point of Interest Over Time Steps") if SHOW_TITLES else None
+    figure.legend(title="Point of Interest", loc="outside lower center", ncols=10)
+    ax.grid(True)
+    return figure
+
+
+# Figures of each run, by file name
+RUN_FIGURES: dict[str, Callable[[dict], plt.Figure]] = {
+    "mean_resource_score_edge_cloud.png": plot_mean_resource_score_edge_cloud,
+    "mean_resource_score_edge_only.png": plot_mean_resource_score_edge_only,
+    "mean_resource_score_cloud_only.png": plot_mean_resource_score_cloud_only,
+    "mean_resource_score_by_model.png": plot_mean_resource_score_by_model,
+    "mean_normalized_distance_from_service_to_users.png": plot_mean_distance_from_users,
+    "mean_total_distance_from_users_and_mean_resource_score_edge_only.png": plot_mean_distance_from_users_and_resource_score,
+    "mean_delay_all_apps.png": plot_mean_delay,
+    "number_of_users_interested_in_each_poi.png": plot_users_interested_in_points_of_interest,
+}
+
+# Figures comparing runs, by file name: x-axis label and the aggregated series, column and filters whose CDFs are plotted
+CDF_FIGURES: dict[str, tuple[str, str, str, list[tuple] | None]] = {
+    "cdfs_of_normalized_distance_from_services_to_users.png": (
+        "Normalized Distance from Services to Users",
+        "service_distance",
+        "Total Distance From Users",
+        None,
+    ),
+    "cdfs_of_resource_score_(edge_only).png": (
+        "Resource Score (Edge only)",
+        "edge_server_resources",
+        "Resources Score",
+        [("Model Name", "!=", "CLOUD")],
+    ),
+    "cdfs_of_resource_score_(cloud_only).png": (
+        "Resource Score (Cloud only)",
+        "edge_server_resources",
+        "Resources Score",
+        [("Model Name", "==", "CLOUD")],
+    ),
+    "cdfs_of_delay_from_users_to_apps.png": ("Delay from Users to Apps", "user_delay", "Delay", None),
+}
+
+
+def step_to_datetime(step: int) -> str:
+    """Converts a step to a datetime string."""
+    time_of_day_in_minutes = step % DAY_CYCLE_IN_MINUTES + DAY_START_IN_MINUTES
+    hours = time_of_day_in_minutes // 60
+    minutes = time_of_day_in_minutes % 60
+    return (
+        f"Step {step:05d} "
+        + f"Time: {hours:02d}:{minutes % 60:02d} "
+        + f"Day: {time_of_day_in_minutes // DAY_CYCLE_IN_MINUTES + 1} "
+    )
+
+
+def save_coordinates_animation(run: dict, file_path: str):
+    """Renders the coordinates of users and points of interest over the steps of a run (requires ffmpeg).
+
+    Args:
+        run (dict): Metrics of the run (see "metrics_reader.read_run").
+        file_path (str): Video file path.
+    """
+
+    def coordinates_by_step(df: pd.DataFrame) -> dict[int, np.ndarray]:
+        return {step: coordinates.to_numpy() for step, coordinates in df.groupby("Time Step")[COORDINATE_COLUMNS]}
+
+    points_of_interest = run["points_of_interest"]
+    in_peak = points_of_interest["Is in peak"] == True  # noqa: E712
+    user_coordinates = coordinates_by_step(run["users"])
+    inactive_poi_coordinates = coordinates_by_step(points_of_interest[~in_peak])
+    active_poi_coordinates = coordinates_by_step(points_of_interest[in_peak])
+    no_coordinates = np.array([[-1, -1]])
+
+    figure, ax = plt.subplots(figsize=(12, 12), layout="constrained")
+    scatter_user = ax.scatter([], [], c="blue", s=5, label="User")
+    scatter_poi_inactive = ax.scatter([], [], c="red", s=15, label="Point of Interest (Inactive)")
+    scatter_poi_active = ax.scatter([], [], c="green", s=15, label="Point of Interest (Active)")
+    ax.set_xlim(0, 200)
+    ax.set_ylim(0, 100)
+
+    def update(frame):
+        scatter_user.set_offsets(user_coordinates[frame])
+        scatter_poi_inactive.set_offsets(inactive_poi_coordinates.get(frame, no_coordinates))
+        scatter_poi_active.set_offsets(active_poi_coordinates.get(frame, no_coordinates))
+        ax.set_title(step_to_datetime(frame))
+        return (scatter_user, scatter_poi_inactive, scatter_poi_active)
+
+    coordinates_animation = animation.FuncAnimation(figure, update, frames=list(user_coordinates), blit=True)
+    coordinates_animation.save(file_path, writer="ffmpeg", fps=30)
+    plt.close(figure)
+
+
+def plot_run(
+    run_directory: str,
+    plots_directory: str,
+    render_animation: bool = True,
+    store_directory: str | None = aggregate_store.AGGREGATES_DIRECTORY,
+    force: bool = False,
+) -> dict:
+    """Renders the figures of a run (inside a worker process), unless they are newer than the run metrics, and adds
+    the run to the aggregate store.
+
+    Args:
+        run_directory (str): Logs directory of the run.
+        plots_directory (str): Directory where the figures of the run are written.
+        render_animation (bool, optional): Whether the coordinates animation is rendered. Defaults to True.
+        store_directory (str | None, optional): Root of the aggregate store (None skips it). Defaults to AGGREGATES_DIRECTORY.
+        force (bool, optional): Whether up-to-date figures and aggregates are produced again. Defaults to False.
+
+    Returns:
+        report (dict): Run directory, status, number of figures, whether the run was aggregated and elapsed time.
+    """
+    start_time = time.perf_counter()
+    inputs = run_inputs(run_directory)
+    outputs = [os.path.join(plots_directory, file_name) for file_name in RUN_FIGURES]
+    render_animation = render_animation and metrics_path(run_directory, "PointOfInterest") is not None
+    if render_animation:
+        outputs.append(os.path.join(plots_directory, ANIMATION_FILE))
+    up_to_date = not force and is_up_to_date(outputs, inputs)
+
+    report = {"run_directory": run_directory, "status": "skipped", "figures": 0, "aggregated": False}
+    run = None
+    if not up_to_date:
+        run = read_run(run_directory)
+        os.makedirs(plots_directory, exist_ok=True)
+        for file_name, plot_figure in RUN_FIGURES.items():
+            figure = plot_figure(run)
+            figure.savefig(os.path.join(plots_directory, file_name))
+            plt.close(figure)
+        if render_animation:
+            save_coordinates_animation(run, os.path.join(plots_directory, ANIMATION_FILE))
+        report["status"], report["figures"] = "rendered", len(outputs)
+    if store_directory is not None:
+        # The metrics already read for the figures are reused, so that each run is read once
+        report["aggregated"] = aggregate_store.aggregate_run(run_directory, store_directory=store_directory, run=run, force=force)
+    report["seconds"] = time.perf_counter() - start_time
+    return report
+
+
+def plot_cdfs(data: dict[str, np.ndarray], xlabel: str, file_path: str, ylabel: str = "Probability of occurrence"):
+    """Plots the empirical CDF of a metric in each configuration.
+
+    Args:
+        data (dict[str, np.ndarray]): Values of the metric, by configuration label.
+        xlabel (str): Name of the metric.
+        file_path (str): Figure file path.
+        ylabel (str, optional): Y-axis label. Defaults to "Probability of occurrence".
+    """
+    with plt.rc_context({"font.size": 14}):
+        figure, ax = plt.subplots(figsize=(12, 10), layout="constrained")
+        ax.set_prop_cycle(CDF_CYCLER)
+        for name, values in sorted(data.items()):
+            ax.ecdf(values, label=name)
+        ax.set_title(f"CDFs of {xlabel}") if SHOW_TITLES else None
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.legend()
+        ax.grid(True)
+        figure.savefig(file_path)
+        plt.close(figure)
+
+
+def plot_all(
+    logs_directory: str = LOGS_DIRECTORY,
+    plots_directory: str = PLOTS_DIRECTORY,
+    cdf_plots_directory: str | None = CDF_PLOTS_DIRECTORY,
+    store_directory: str = aggregate_store.AGGREGATES_DIRECTORY,
+    run_directories: list[str] | None = None,
+    max_workers: int | None = None,
+    render_animation: bool = True,
+    force: bool = False,
+) -> list[dict]:
+    """Renders the figures of every run in a process pool, then the CDFs that compare the runs (queried from the
+    aggregate store, which the workers keep up to date).
+
+    Args:
+        logs_directory (str, optional): Root of the logs. Defaults to LOGS_DIRECTORY.
+        plots_directory (str, optional): Root of the figures of each run. Defaults to PLOTS_DIRECTORY.
+        cdf_plots_directory (str | None, optional): Directory of the CDFs (None skips them). Defaults to CDF_PLOTS_DIRECTORY.
+        store_directory (str, optional): Root of the aggregate store. Defaults to AGGREGATES_DIRECTORY.
+        run_directories (list[str] | None, optional): Runs to plot. Defaults to None (every run under logs_directory).
+        max_workers (int | None, optional): Upper bound of worker processes. Defaults to None (one per CPU).
+        render_animation (bool, optional): Whether coordinate animations are rendered. Defaults to True.
+        force (bool, optional): Whether up-to-date figures are rendered again. Defaults to False.
+
+    Returns:
+        reports (list[dict]): Report of each run (see "plot_run").
+    """
+    if run_directories is None:
+        run_directories = discover_runs(logs_directory)
+    if len(run_directories) == 0:
+        print(f"No runs found in {logs_directory}")
+        return []
+
+    if cdf_plots_directory is not None and not aggregate_store.AVAILABLE:
+        print('CDFs require pyarrow (install the "columnar" extra), skipping them')
+        cdf_plots_directory = None
+
+    workers = max(min(os.cpu_count() or 1, len(run_directories), max_workers or len(run_directories)), 1)
+    print(f"Plotting {len(run_directories)} runs with {workers} workers")
+
+    reports = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=matplotlib.use, initargs=("Agg",)) as executor:
+        futures = [
+            executor.submit(
+                plot_run,
+                run_directory,
+                os.path.join(plots_directory, os.path.relpath(run_directory, logs_directory)),
+                render_animation,
+                store_directory if cdf_plots_directory is not None else None,
+                force,
+            )
+            for run_directory in run_directories
+        ]
+        for future in as_completed(futures):
+            report = future.result()
+            aggregated = ", aggregated" if report["aggregated"] else ""
+            seconds = f"{report['seconds']:.1f} seconds"
+            print(f"{report['run_directory']}: {report['status']} {report['figures']} figures{aggregated} in {seconds}")
+            reports.append(report)
+
+    if cdf_plots_directory is None:
+        return sorted(reports, key=lambda report: report["run_directory"])
+    cdf_outputs = [os.path.join(cdf_plots_directory, file_name) for file_name in CDF_FIGURES]
+    if force or any(report["aggregated"] for report in reports) or not all(os.path.exists(output) for output in cdf_outputs):
+        os.makedirs(cdf_plots_directory, exist_ok=True)
+        for file_path, (xlabel, series, column, filters) in zip(cdf_outputs, CDF_FIGURES.values()):
+            data = aggregate_store.values_by_configuration(series, column, filters=filters, store_directory=store_directory)
+            plot_cdfs(data, xlabel=xlabel, file_path=file_path)
+        print(f"CDFs written to {cdf_plots_directory}")
+    else:
+        print(f"CDFs in {cdf_plots_directory} are up to date")
+
+    return sorted(reports, key=lambda report: report["run_directory"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renders the figures of simulation runs (and the CDFs across runs).")
+    parser.add_argument("runs", nargs="*", help="Logs directories of the runs (defaults to every run under --logs-directory)")
+    parser.add_argument("--logs-directory", default=LOGS_DIRECTORY)
+    parser.add_argument("--plots-directory", default=PLOTS_DIRECTORY)
+    parser.add_argument("--cdf-plots-directory", default=CDF_PLOTS_DIRECTORY)
+    parser.add_argument("--store-directory", default=aggregate_store.AGGREGATES_DIRECTORY)
+    parser.add_argument("--no-cdfs", action="store_true", help="Skips the CDFs across runs")
+    parser.add_argument("--no-animation", action="store_true", help="Skips the coordinates animation of each run")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="Renders figures that are newer than their metrics again")
+    args = parser.parse_args()
+
+    matplotlib.use("Agg")
+    render_animation = not args.no_animation
+    if render_animation and not animation.writers.is_available("ffmpeg"):
+        print("ffmpeg is not available, skipping coordinate animations")
+        render_animation = False
+
+    plot_all(
+        logs_directory=args.logs_directory,
+        plots_directory=args.plots_directory,
+        cdf_plots_directory=None if args.no_cdfs else args.cdf_plots_directory,
+        store_directory=args.store_directory,
+        run_directories=args.runs or None,
+        max_workers=args.max_workers,
+        render_animation=render_animation,
+        force=args.force,
+    )
+
+
+if __name__ == "__main__":
+    main()
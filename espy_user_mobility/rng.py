@@ -0,0 +1,88 @@
+import random
+import zlib
+
+import numpy as np
+
+# Root seed of every stream (None draws fresh entropy from the operating system)
+_SEED: int | None = None
+
+# Streams handed out since the last "seed" call, indexed by name
+_STREAMS: dict[str, random.Random] = {}
+_NUMPY_STREAMS: dict[str, np.random.Generator] = {}
+
+
+def seed(root_seed: int | None):
+    """Sets the root seed and discards the streams created so far.
+
+    Args:
+        root_seed (int | None): Root seed (None makes streams non-reproducible).
+    """
+    global _SEED
+    _SEED = root_seed
+    _STREAMS.clear()
+    _NUMPY_STREAMS.clear()
+
+
+def seed_sequence(name: str) -> np.random.SeedSequence:
+    """Derives the seed sequence of a named stream, which is independent of the other streams and of the order in
+    which streams are requested.
+
+    Args:
+        name (str): Stream name (e.g., "placement").
+
+    Returns:
+        seed_sequence (np.random.SeedSequence): Seed sequence of the stream.
+    """
+    return np.random.SeedSequence(entropy=_SEED, spawn_key=(zlib.crc32(name.encode()),))
+
+
+def stream(name: str) -> random.Random:
+    """Gets the Python random generator of a named stream (created on first use).
+
+    Args:
+        name (str): Stream name (e.g., "placement").
+
+    Returns:
+        generator (random.Random): Random generator of the stream.
+    """
+    if name not in _STREAMS:
+        _STREAMS[name] = random.Random(seed_sequence(name).generate_state(8).tobytes())
+    return _STREAMS[name]
+
+
+def numpy_stream(name: str) -> np.random.Generator:
+    """Gets the NumPy random generator of a named stream (created on first use).
+
+    Args:
+        name (str): Stream name (e.g., "edge_servers").
+
+    Returns:
+        generator (np.random.Generator): Random generator of the stream.
+    """
+    if name not in _NUMPY_STREAMS:
+        _NUMPY_STREAMS[name] = np.random.default_rng(seed_sequence(name).spawn(1)[0])
+    return _NUMPY_STREAMS[name]
+
+
+def seed_global_generators(name: str):
+    """Seeds the global "random" and "numpy.random" generators from a named stream. EdgeSimPy draws from the global
+    generators (e.g., in its mobility models and access patterns), so this makes that code reproducible too.
+
+    Args:
+        name (str): Stream name (e.g., "mobility").
+    """
+    state = seed_sequence(name).generate_state(8)
+    random.seed(state.tobytes())
+    np.random.seed(state)
+
+
+def get_state() -> dict:
+    """Gets the state of the streams (e.g., to be checkpointed along with the components they generated)."""
+    return {"seed": _SEED, "streams": dict(_STREAMS), "numpy_streams": dict(_NUMPY_STREAMS)}
+
+
+def set_state(state: dict):
+    """Restores the state of the streams saved by "get_state"."""
+    seed(state["seed"])
+    _STREAMS.update(state["streams"])
+    _NUMPY_STREAMS.update(state["numpy_streams"])
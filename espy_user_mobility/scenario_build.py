@@ -1,13 +1,16 @@
-import random
 from math import sqrt
 
 import pandas as pd
 
 from EdgeSimPy import edge_sim_py as espy
 
+from .base_station_index import install_base_station_index
 from .custom_serialization import application_to_dict, edge_server_to_dict, service_to_dict, user_to_dict
-from .helper_methods import uniform
+from .grid_builder import build_base_stations, build_hexagonal_mesh
+from .helper_methods import connect_network_switches, uniform
 from .map_build import COORD_UPPER_BOUND, create_edge_servers_df, create_points_of_interest_df, to_tuple_list
+from .rng import numpy_stream, stream
+from .scenario_format import save_scenario
 from .servers import CONTAINER_REGISTRIES, PROVIDER_SPECS, SERVERS_PER_SPEC_CLOUD_PROVIDERS
 
 APPLICATION_SPECIFICATIONS = [
@@ -17,11 +20,8 @@ APPLICATION_SPECIFICATIONS = [
     {"number_of_objects": 2, "number_of_services": 8},
 ]
 
-DELAY_SLAS = uniform(
-    n_items=sum([app_spec["number_of_objects"] for app_spec in APPLICATION_SPECIFICATIONS]) * 2,
-    valid_values=[3, 6],
-    shuffle_distribution=True,
-)
+DELAY_SLA_VALUES = [3, 6]
+NUMBER_OF_DELAY_SLAS = sum([app_spec["number_of_objects"] for app_spec in APPLICATION_SPECIFICATIONS]) * 2
 
 SERVICE_DEMAND_VALUES = [
     {"cpu": 2, "memory": 2 * 1024},
@@ -35,12 +35,6 @@ NUMBER_OF_SERVICES = sum(
     [app_spec["number_of_objects"] * app_spec["number_of_services"] for app_spec in APPLICATION_SPECIFICATIONS]
 ) * len(PROVIDER_SPECS)
 
-SERVICE_DEMANDS = uniform(
-    n_items=NUMBER_OF_SERVICES,
-    valid_values=SERVICE_DEMAND_VALUES,
-    shuffle_distribution=True,
-)
-
 USERS_MIN, USERS_MAX = 10, 30
 USER_SPEED_MIN, USER_SPEED_MAX = 0.3, 1.0
 USER_CHANGE_OF_BECOMING_INTERESTED = 10
@@ -50,6 +44,7 @@ CLOUD_LINK_DELAY = 10
 CLOUD_LINK_BANDWIDTH = 100
 EDGE_LINK_DELAY = 1
 EDGE_LINK_BANDWIDTH = 10
+BULK_GRID_BUILD = True  # Builds the edge grid in batch (hexagonal neighbors computed arithmetically, see grid_builder)
 
 
 def create_grid(x_size: int | None = None, y_size: int | None = None) -> list[tuple[int, int]]:
@@ -62,6 +57,10 @@ def create_grid(x_size: int | None = None, y_size: int | None = None) -> list[tu
 
 def create_base_stations(grid_coordinates: list[tuple[int, int]]):
     print("Creating Edge Base Stations")
+    if BULK_GRID_BUILD:
+        build_base_stations(grid_coordinates, wireless_delay=1)
+        return
+    install_base_station_index(espy.BaseStation)
     for coordinates in grid_coordinates:
         base_station = espy.BaseStation()
         base_station.coordinates = coordinates
@@ -72,6 +71,8 @@ def create_base_stations(grid_coordinates: list[tuple[int, int]]):
 
 def create_topology() -> espy.Topology:
     print("Creating Edge Topology")
+    if BULK_GRID_BUILD:
+        return build_hexagonal_mesh(espy.NetworkSwitch.all(), delay=EDGE_LINK_DELAY, bandwidth=EDGE_LINK_BANDWIDTH)
     return espy.partially_connected_hexagonal_mesh(
         network_nodes=espy.NetworkSwitch.all(),
         link_specifications=[{"delay": EDGE_LINK_DELAY, "bandwidth": EDGE_LINK_BANDWIDTH}],
@@ -107,24 +108,22 @@ def create_cloud_servers(edge_topology: espy.Topology, edge_grid: list[tuple[int
     edge_topology.add_nodes_from(cloud_switches)
     for cloud_switch in cloud_switches:
         if not edge_topology.has_edge(cloud_switch, edge_connection_to_cloud):
-            link = espy.NetworkLink()
-            link.topology = edge_topology
-            link.delay = CLOUD_LINK_DELAY
-            link.bandwidth = CLOUD_LINK_BANDWIDTH
-            link.nodes = [cloud_switch, edge_connection_to_cloud]
-            edge_topology.add_edge(cloud_switch, edge_connection_to_cloud)
-            edge_topology._adj[cloud_switch][edge_connection_to_cloud] = link
-            edge_topology._adj[edge_connection_to_cloud][cloud_switch] = link
+            connect_network_switches(
+                topology=edge_topology,
+                network_switch=cloud_switch,
+                neighbor=edge_connection_to_cloud,
+                delay=CLOUD_LINK_DELAY,
+                bandwidth=CLOUD_LINK_BANDWIDTH,
+            )
         for sec_cloud_switch in cloud_switches:
             if cloud_switch != sec_cloud_switch and not edge_topology.has_edge(cloud_switch, sec_cloud_switch):
-                link = espy.NetworkLink()
-                link.topology = edge_topology
-                link.delay = CLOUD_LINK_DELAY
-                link.bandwidth = CLOUD_LINK_BANDWIDTH
-                link.nodes = [cloud_switch, sec_cloud_switch]
-                edge_topology.add_edge(cloud_switch, sec_cloud_switch)
-                edge_topology._adj[cloud_switch][sec_cloud_switch] = link
-                edge_topology._adj[sec_cloud_switch][cloud_switch] = link
+                connect_network_switches(
+                    topology=edge_topology,
+                    network_switch=cloud_switch,
+                    neighbor=sec_cloud_switch,
+                    delay=CLOUD_LINK_DELAY,
+                    bandwidth=CLOUD_LINK_BANDWIDTH,
+                )
 
     print("Creating Cloud Servers")
     for provider_spec in PROVIDER_SPECS:
@@ -149,7 +148,8 @@ def create_edge_servers() -> pd.DataFrame:
         number_of_edge_servers += sum([spec["number_of_objects"] for spec in provider.get("edge_server_specs", [])])
 
     edge_servers_df = create_edge_servers_df()
-    edge_servers_df = edge_servers_df.sample(n=number_of_edge_servers).reset_index(drop=True)
+    edge_servers_df = edge_servers_df.sample(n=number_of_edge_servers, random_state=numpy_stream("edge_servers"))
+    edge_servers_df = edge_servers_df.reset_index(drop=True)
     edge_server_coordinates = to_tuple_list(edge_servers_df)
 
     for provider_spec in PROVIDER_SPECS:
@@ -184,6 +184,13 @@ def create_regitries():
 
 def create_providers(grid_coordinates: list[tuple[int, int]]):
     print("Creating Providers")
+    applications_rng, placement_rng, user_speed_rng = stream("applications"), stream("placement"), stream("user_speed")
+    delay_slas = uniform(
+        n_items=NUMBER_OF_DELAY_SLAS, valid_values=DELAY_SLA_VALUES, shuffle_distribution=True, rng=applications_rng
+    )
+    service_demands = uniform(
+        n_items=NUMBER_OF_SERVICES, valid_values=SERVICE_DEMAND_VALUES, shuffle_distribution=True, rng=applications_rng
+    )
 
     for _ in range(len(PROVIDER_SPECS)):
         for app_spec in APPLICATION_SPECIFICATIONS:
@@ -191,20 +198,20 @@ def create_providers(grid_coordinates: list[tuple[int, int]]):
                 app = espy.Application()
                 app.provisioned = False  # type: ignore
 
-                for _ in range(random.randint(USERS_MIN, USERS_MAX)):
+                for _ in range(applications_rng.randint(USERS_MIN, USERS_MAX)):
                     # Creating the user that access the application
                     user = espy.User()
 
                     user.communication_paths[str(app.id)] = None
                     user.delays[str(app.id)] = None
-                    user.delay_slas[str(app.id)] = DELAY_SLAS[(user.id - 1) % len(DELAY_SLAS)]
+                    user.delay_slas[str(app.id)] = delay_slas[(user.id - 1) % len(delay_slas)]
 
                     # Defining user's coordinates and connecting him to a base station
                     user.mobility_model = espy.point_of_interest_mobility
                     user.chance_of_becoming_interested = USER_CHANGE_OF_BECOMING_INTERESTED
-                    user.movement_distance = random.random() * (USER_SPEED_MAX - USER_SPEED_MIN) + USER_SPEED_MIN
+                    user.movement_distance = user_speed_rng.random() * (USER_SPEED_MAX - USER_SPEED_MIN) + USER_SPEED_MIN
                     user._set_initial_position(
-                        coordinates=espy.User.random_user_placement(grid_coordinates),
+                        coordinates=placement_rng.choice(grid_coordinates),  # Random grid coordinates
                         number_of_replicates=2,
                     )
 
@@ -223,7 +230,10 @@ def create_providers(grid_coordinates: list[tuple[int, int]]):
 
                 # Defining service privacy requirement values
                 service_privacy_requirements = uniform(
-                    n_items=app_spec["number_of_services"], valid_values=[0, 1, 2], shuffle_distribution=False
+                    n_items=app_spec["number_of_services"],
+                    valid_values=[0, 1, 2],
+                    shuffle_distribution=False,
+                    rng=applications_rng,
                 )
                 service_privacy_requirements = sorted(service_privacy_requirements)
 
@@ -241,8 +251,8 @@ def create_providers(grid_coordinates: list[tuple[int, int]]):
                         state=0,
                     )
                     service.privacy_requirement = service_privacy_requirements[service_index]  # type: ignore
-                    service.cpu_demand = SERVICE_DEMANDS[service.id - 1]["cpu"]
-                    service.memory_demand = SERVICE_DEMANDS[service.id - 1]["memory"]
+                    service.cpu_demand = service_demands[service.id - 1]["cpu"]
+                    service.memory_demand = service_demands[service.id - 1]["memory"]
 
                     # Connecting the application to its new service
                     app.connect_to_service(service)
@@ -260,12 +270,11 @@ def create_points_of_interest() -> pd.DataFrame:
     return df_poi
 
 
-def export_scenario():
+def export_scenario(file_path: str = "datasets/generated_dataset.json"):
     # Exporting scenario
     espy.Application._to_dict = application_to_dict
     espy.User._to_dict = user_to_dict
     espy.EdgeServer._to_dict = edge_server_to_dict
     espy.Service._to_dict = service_to_dict
-    espy.ComponentManager.export_scenario(
-        save_to_file=True, file_name="generated_dataset"
-    )  # file_name is prepended with "datasets/"
+    scenario = espy.ComponentManager.export_scenario(save_to_file=False)
+    save_scenario(scenario, file_path)  # The format (JSON or msgpack) is selected by the file extension
@@ -0,0 +1,161 @@
+import hashlib
+import inspect
+import json
+import os
+
+from . import map_build, scenario_build, servers
+
+SCENARIO_CACHE_DIRECTORY = "datasets/cache"
+SCENARIO_PARAMETERS_FILE = "parameters.json"  # Written last, marks a complete cache entry
+
+
+def _canonical(value):
+    # Functions (e.g., the server specs of PROVIDER_SPECS) are identified by their source code
+    if callable(value):
+        return {"function": value.__qualname__, "source": hashlib.sha256(inspect.getsource(value).encode()).hexdigest()}
+    raise TypeError(f"Scenario parameter of type {type(value).__name__} cannot be fingerprinted")
+
+
+def cell_towers_sha256() -> str | None:
+    """Hashes the cell tower dump (see "map_build.file_sha256"). Without the dump, the last hash recorded for it is used,
+    or None if there is none (see "find_cached_fingerprint").
+    """
+    if os.path.exists(map_build.CELL_TOWERS_CSV):
+        return map_build.file_sha256(map_build.CELL_TOWERS_CSV)
+    return map_build.recorded_file_sha256(map_build.CELL_TOWERS_CSV)
+
+
+def scenario_parameters(seed: int | None = None) -> dict:
+    """Gathers every parameter that affects the generated scenario.
+
+    Args:
+        seed (int | None, optional): Seed of the scenario generation. Defaults to None.
+
+    Returns:
+        parameters (dict): JSON-friendly scenario parameters.
+    """
+    parameters = {
+        "seed": seed,
+        "map_build": {
+            "coordinate_bounds": [map_build.COORD_LOWER_BOUND, map_build.COORD_UPPER_BOUND],
+            "number_of_points_of_interest": map_build.NUMBER_OF_POINT_OF_INTERESTS,
+            "peak_duration_minutes": [map_build.MIN_PEAK_DURATION_POI_MINUTES, map_build.MAX_PEAK_DURATION_POI_MINUTES],
+            "bounding_box": [map_build.BOUNDING_BOX_START, map_build.BOUNDING_BOX_STOP],
+            "cell_towers_sha256": cell_towers_sha256(),
+        },
+        "scenario_build": {
+            "application_specifications": scenario_build.APPLICATION_SPECIFICATIONS,
+            "delay_sla_values": scenario_build.DELAY_SLA_VALUES,
+            "service_demand_values": scenario_build.SERVICE_DEMAND_VALUES,
+            "users": [scenario_build.USERS_MIN, scenario_build.USERS_MAX],
+            "user_speed": [scenario_build.USER_SPEED_MIN, scenario_build.USER_SPEED_MAX],
+            "user_chance_of_becoming_interested": scenario_build.USER_CHANGE_OF_BECOMING_INTERESTED,
+            "number_of_cloud_base_stations": scenario_build.NUMBER_OF_CLOUD_BASE_STATIONS,
+            "cloud_grid_offset": scenario_build.CLOUD_GRID_OFFSET,
+            "cloud_link": [scenario_build.CLOUD_LINK_DELAY, scenario_build.CLOUD_LINK_BANDWIDTH],
+            "edge_link": [scenario_build.EDGE_LINK_DELAY, scenario_build.EDGE_LINK_BANDWIDTH],
+            "bulk_grid_build": scenario_build.BULK_GRID_BUILD,
+        },
+        "servers": {
+            "servers_per_spec": [servers.SERVERS_PER_SPEC_EDGE_PROVIDERS, servers.SERVERS_PER_SPEC_CLOUD_PROVIDERS],
+            "container_image_specifications": servers.CONTAINER_IMAGE_SPECIFICATIONS,
+            "container_registry_specifications": servers.CONTAINER_REGISTRY_SPECIFICATIONS,
+            "provider_specs": servers.PROVIDER_SPECS,
+        },
+    }
+    # Round trip through JSON so that functions are replaced by their fingerprints
+    return json.loads(json.dumps(parameters, sort_keys=True, default=_canonical))
+
+
+def scenario_fingerprint(parameters: dict) -> str:
+    """Hashes the scenario parameters (see "scenario_parameters").
+
+    Args:
+        parameters (dict): Scenario parameters.
+
+    Returns:
+        fingerprint (str): Hexadecimal fingerprint.
+    """
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:16]
+
+
+def find_cached_fingerprint(parameters: dict) -> str | None:
+    """Finds a cached scenario generated with the given parameters, whatever the cell tower dump it was generated from
+    (used when neither the dump nor its hash is available).
+
+    Args:
+        parameters (dict): Scenario parameters (see "scenario_parameters").
+
+    Returns:
+        fingerprint (str | None): Fingerprint of the most recently cached matching scenario, if any.
+    """
+
+    def without_cell_towers(scenario_parameters: dict) -> dict:
+        return {**scenario_parameters, "map_build": {**scenario_parameters["map_build"], "cell_towers_sha256": None}}
+
+    expected = without_cell_towers(parameters)
+    matches = []
+    if os.path.isdir(SCENARIO_CACHE_DIRECTORY):
+        for fingerprint in os.listdir(SCENARIO_CACHE_DIRECTORY):
+            parameters_path = os.path.join(scenario_directory(fingerprint), SCENARIO_PARAMETERS_FILE)
+            try:
+                with open(parameters_path, encoding="UTF-8") as input_file:
+                    cached_parameters = json.load(input_file)
+            except (OSError, ValueError):
+                continue
+            if without_cell_towers(cached_parameters) == expected:
+                matches.append((os.path.getmtime(parameters_path), fingerprint))
+    return max(matches)[1] if len(matches) > 0 else None
+
+
+def scenario_directory(fingerprint: str) -> str:
+    """Gets the content-addressed directory where a scenario and its derived artifacts are stored."""
+    return os.path.join(SCENARIO_CACHE_DIRECTORY, fingerprint)
+
+
+def is_cached(fingerprint: str) -> bool:
+    return os.path.exists(os.path.join(scenario_directory(fingerprint), SCENARIO_PARAMETERS_FILE))
+
+
+def mark_cached(fingerprint: str, parameters: dict):
+    """Records the parameters of a scenario once all of its artifacts were written to its directory."""
+    with open(os.path.join(scenario_directory(fingerprint), SCENARIO_PARAMETERS_FILE), "w", encoding="UTF-8") as output_file:
+        json.dump(parameters, output_file, indent=4, sort_keys=True)
+
+
+def link_cached_file(fingerprint: str, file_name: str, link_path: str):
+    """Points a well-known path (e.g., "datasets/generated_dataset.msgpack") to a file of a cached scenario.
+
+    Only symbolic links are replaced or removed. A regular file at the path (e.g., generated before the cache existed)
+    is never deleted: linking raises an error, and a regular file at the path of a file the scenario does not have is
+    kept with a warning.
+
+    Args:
+        fingerprint (str): Scenario fingerprint.
+        file_name (str): File path, relative to the scenario directory.
+        link_path (str): Path of the (symbolic) link.
+
+    Raises:
+        FileExistsError: A regular file is at the link path.
+    """
+    target = os.path.join(scenario_directory(fingerprint), file_name)
+    is_regular_file = os.path.lexists(link_path) and not os.path.islink(link_path)
+    if not os.path.exists(target):
+        # Links to a file of another scenario would be used as this scenario's file
+        if is_regular_file:
+            print(f"Warning: '{link_path}' is not a file of scenario {fingerprint} (it was kept, remove it if it is stale)")
+        elif os.path.lexists(link_path):
+            os.remove(link_path)
+        return
+    if is_regular_file:
+        raise FileExistsError(
+            f"'{link_path}' is a regular file, move it away so that it can point to '{target}' (scenario {fingerprint})"
+        )
+    link_directory = os.path.dirname(link_path)
+    if link_directory != "":
+        os.makedirs(link_directory, exist_ok=True)
+    temporary_link = f"{link_path}.{os.getpid()}.tmp"
+    if os.path.islink(temporary_link):
+        os.remove(temporary_link)
+    os.symlink(os.path.relpath(target, link_directory or "."), temporary_link)
+    os.replace(temporary_link, link_path)
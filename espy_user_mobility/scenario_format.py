@@ -0,0 +1,133 @@
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import msgpack
+
+SCENARIO_FORMAT = "espy-msgpack"
+SCENARIO_FORMAT_VERSION = 1
+MSGPACK_EXTENSIONS = (".msgpack", ".mpk")
+
+# msgpack extension type of relationships ({"class": ..., "id": ...}), packed as (class code, id)
+REFERENCE_EXT_TYPE = 1
+REFERENCE_STRUCT = struct.Struct("<HQ")
+
+
+def _json_key(key) -> str:
+    # Mirrors how "json.dump" converts non-string keys, so both formats load into the same dictionary
+    if isinstance(key, str):
+        return key
+    if key is True or key is False:
+        return "true" if key else "false"
+    if key is None:
+        return "null"
+    return str(key)
+
+
+def _encode(value, class_codes: dict[str, int]):
+    if isinstance(value, dict):
+        if len(value) == 2 and "class" in value and "id" in value:
+            class_name, component_id = value["class"], value["id"]
+            if isinstance(class_name, str) and type(component_id) is int and 0 <= component_id < 2**64:
+                class_code = class_codes.setdefault(class_name, len(class_codes))
+                return msgpack.ExtType(REFERENCE_EXT_TYPE, REFERENCE_STRUCT.pack(class_code, component_id))
+        return {_json_key(key): _encode(item, class_codes) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item, class_codes) for item in value]
+    return value
+
+
+def save_scenario(scenario: dict, file_path: str):
+    """Persists a scenario (as returned by "ComponentManager.export_scenario") in the disk.
+
+    Files with a msgpack extension (".msgpack" or ".mpk") hold two msgpack objects: a header with the class table and
+    the scenario itself, whose relationships are packed as extension types holding (class code, id) instead of
+    {"class": ..., "id": ...} dictionaries. Any other extension is written as JSON.
+
+    Args:
+        scenario (dict): Scenario dictionary, keyed by component class name.
+        file_path (str): Output file path.
+    """
+    directory = os.path.dirname(file_path)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+
+    if not file_path.endswith(MSGPACK_EXTENSIONS):
+        with open(file_path, "w", encoding="UTF-8") as output_file:
+            json.dump(scenario, output_file, indent=4)
+        return
+
+    class_codes = {class_name: code for code, class_name in enumerate(scenario)}
+    body = {_json_key(class_name): _encode(components, class_codes) for class_name, components in scenario.items()}
+    header = {"format": SCENARIO_FORMAT, "version": SCENARIO_FORMAT_VERSION, "classes": list(class_codes)}
+    with open(file_path, "wb") as output_file:
+        output_file.write(msgpack.packb(header, use_bin_type=True))
+        output_file.write(msgpack.packb(body, use_bin_type=True))
+
+
+def load_scenario(file_path: str) -> dict:
+    """Loads a scenario persisted with "save_scenario" (the format is selected by the file extension).
+
+    Args:
+        file_path (str): Input file path.
+
+    Returns:
+        scenario (dict): Scenario dictionary, which can be given to "Simulator.initialize".
+    """
+    if not file_path.endswith(MSGPACK_EXTENSIONS):
+        with open(file_path, "r", encoding="UTF-8") as input_file:
+            return json.load(input_file)
+
+    # Class table of the file, filled once the header is read (the header itself holds no references)
+    classes: list[str] = []
+
+    def ext_hook(code: int, data: bytes):
+        if code != REFERENCE_EXT_TYPE:
+            return msgpack.ExtType(code, data)
+        class_code, component_id = REFERENCE_STRUCT.unpack(data)
+        return {"class": classes[class_code], "id": component_id}
+
+    with open(file_path, "rb") as input_file:
+        unpacker = msgpack.Unpacker(input_file, raw=False, strict_map_key=False, max_buffer_size=0, ext_hook=ext_hook)
+        header = unpacker.unpack()
+        if header.get("format") != SCENARIO_FORMAT or header.get("version") != SCENARIO_FORMAT_VERSION:
+            raise ValueError(f"Unsupported scenario format in {file_path}: {header.get('format')} {header.get('version')}")
+        classes.extend(header["classes"])
+        return unpacker.unpack()
+
+
+def benchmark(json_file_path: str, repeat: int = 3) -> dict:
+    """Compares the file size and load time of a JSON scenario with its msgpack version.
+
+    Args:
+        json_file_path (str): JSON scenario file.
+        repeat (int, optional): Number of loads of each file (the fastest one is reported). Defaults to 3.
+
+    Returns:
+        results (dict): File size (bytes) and load time (seconds) of each format.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        msgpack_file_path = os.path.join(directory, "scenario.msgpack")
+        scenario = load_scenario(json_file_path)
+        save_scenario(scenario, msgpack_file_path)
+        if load_scenario(msgpack_file_path) != scenario:
+            raise ValueError("The msgpack scenario does not match the JSON one")
+
+        for name, file_path in (("json", json_file_path), ("msgpack", msgpack_file_path)):
+            load_times = []
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                load_scenario(file_path)
+                load_times.append(time.perf_counter() - start_time)
+            results[name] = {"size_bytes": os.path.getsize(file_path), "load_seconds": min(load_times)}
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark(sys.argv[1] if len(sys.argv) > 1 else "datasets/generated_dataset.json")
+    for name, result in results.items():
+        print(f"{name:>8}: {result['size_bytes'] / 2**20:8.2f} MiB, loaded in {result['load_seconds']:.3f} seconds")
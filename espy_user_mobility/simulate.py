@@ -2,102 +2,326 @@ import os
 import sys
 import time
 
+import numpy as np
 from mesa import Model
 
 import EdgeSimPy.edge_sim_py as espy
 
-from .map_build import plot_grid, plot_points_of_interest
-from .scenario_build import (
-    create_base_stations,
-    create_cloud_servers,
-    create_edge_servers,
-    create_grid,
-    create_points_of_interest,
-    create_providers,
-    create_regitries,
-    create_topology,
-    export_scenario,
+from . import aggregate_store, rng
+from .base_station_index import install_base_station_index
+from .capacity_index import CapacityIndex
+from .change_tracking import ServiceChangeTracker
+from .coordinates_trace import TRACE_CAPACITY, install_coordinates_traces
+from .delay_matrix import DelayMatrix, load_or_compute_delay_matrix, server_network_switches
+from .distance_engine import DistanceEngine
+from .helper_methods import install_cached_routing
+from .map_build import CELL_TOWERS_CSV, plot_grid, plot_points_of_interest
+from .metrics_writer import install_columnar_metrics, install_user_metrics
+from .mobility_engine import install_mobility_engine
+from .observers import clear_observers
+from .path_invalidation import watch_topology_changes
+from .peak_timeline import install_peak_timeline
+from .pipeline import run_pipeline
+from .scenario_build import export_scenario
+from .scenario_cache import (
+    find_cached_fingerprint,
+    is_cached,
+    link_cached_file,
+    mark_cached,
+    scenario_directory,
+    scenario_fingerprint,
+    scenario_parameters,
 )
+from .scenario_format import load_scenario
+from .snapshot import TopologySnapshot, attach_snapshot, open_snapshot, restore_network_links, without_network_links
+from .spatial_index import ServerSpatialIndex, service_users_centroid
 
 DISTANCE_THRESHOLD = 0.8
 MIGRATION_RECENCY_THRESHOLD = 8
 STEPS_LIMIT = 1080 * 2
+# Servers nearest to the users' centroid (with capacity) evaluated first per service, None evaluates the whole fleet. With
+# the distance engine the search then extends to every server that may be closer, so the placement is the same as
+# ranking the whole fleet. Ranked with EdgeSimPy's method, only these servers are evaluated (an approximation)
+CANDIDATE_SERVERS = 8
+CHANGE_TRACKING = True  # Only re-evaluates services affected by user movement or hosting changes
+VECTORIZED_DISTANCES = True  # Ranks servers with the distance engine instead of one EdgeSimPy call per (service, server)
+# Finds the communication paths of users through the path cache (the same paths as NetworkX) instead of one
+# nx.shortest_path call per path (see "helper_methods.install_cached_routing")
+CACHED_ROUTING = True
+# Precomputes shortest path delays toward every switch that hosts a server, and rebuilds the routed paths toward them
+# from the matrix. Paths have the same delay, but among equally short paths another one may be chosen
+PRECOMPUTE_DELAY_MATRIX = False
+DATASET_FILE = "datasets/generated_dataset.json"  # ".msgpack" files are also supported (see "scenario_format")
+DELAY_MATRIX_FILE = "datasets/generated_dataset.delays.npz"
+# Stores the topology (adjacency, links, base stations, servers and the delay matrix, if precomputed) in a memory-mapped
+# file shared by runs, which rebuild the network links from it instead of parsing them from the dataset
+TOPOLOGY_SNAPSHOT = False
+TOPOLOGY_SNAPSHOT_FILE = "datasets/generated_dataset.snapshot"
+SCENARIO_FILES = [DATASET_FILE, DELAY_MATRIX_FILE, TOPOLOGY_SNAPSHOT_FILE]  # Linked to the files of the cached scenario
+SCENARIO_SEED = 0  # Root seed of the scenario generation streams (part of the scenario fingerprint)
+SIMULATION_SEED = 0  # Root seed of the mobility and access pattern draws of each run
+LOGS_FORMAT = "csv"  # One of LOGS_FORMATS: "csv" (EdgeSimPy's own output), "parquet" or "arrow" (requires pyarrow)
+COMPACT_COORDINATES_TRACES = True  # Stores user coordinates traces in int16 NumPy buffers instead of lists of tuples
+TRACE_MAX_LENGTH = None  # Latest entries kept per coordinates trace (None keeps the whole trace)
+SPILL_COORDINATES_TRACES = False  # Writes full coordinates trace buffers to "<logs directory>/coordinates_traces.bin"
+# Moves point of interest users with the MobilityEngine model instead of EdgeSimPy's "point_of_interest_mobility". It is a
+# different model (its interest draws come from its own generator), so runs differ from the ones with the per-user model
+BATCHED_MOBILITY = False
+PEAK_TIMELINE_METRICS = False  # Logs the "Is in peak" state of the points of interest from a precomputed timeline
+TRACE_PIPELINE_MEMORY = False  # Also traces the Python memory allocated by each generation stage (tracemalloc, slow)
+AGGREGATE_RUNS = True  # Adds the series analyzed across runs (e.g., CDFs) to the aggregate store (requires pyarrow)
+
+
+def get_server_spatial_index() -> ServerSpatialIndex:
+    topology = espy.Topology.first()
+    if not hasattr(topology, "server_spatial_index"):
+        topology.server_spatial_index = ServerSpatialIndex(servers=espy.EdgeServer.all())  # type: ignore
+    return topology.server_spatial_index  # type: ignore
+
+
+def get_capacity_index() -> CapacityIndex:
+    topology = espy.Topology.first()
+    if not hasattr(topology, "capacity_index"):
+        topology.capacity_index = CapacityIndex(servers=espy.EdgeServer.all())  # type: ignore
+        topology.capacity_index.watch(espy.EdgeServer)  # type: ignore
+    return topology.capacity_index  # type: ignore
+
+
+def get_distance_engine() -> DistanceEngine | None:
+    """Creates the distance engine of the scenario, calibrated to EdgeSimPy's "distance_from_edge_server_to_users".
+
+    Returns:
+        distance_engine (DistanceEngine | None): Engine, or None if its distances do not reproduce EdgeSimPy's (servers
+            are then ranked with EdgeSimPy's method).
+    """
+    topology = espy.Topology.first()
+    if not hasattr(topology, "distance_engine"):
+        engine = DistanceEngine(
+            services=espy.Service.all(),
+            users=espy.User.all(),
+            servers=espy.EdgeServer.all(),
+            map_coordinates=[base_station.coordinates for base_station in espy.BaseStation.all()],
+        )
+        if engine.calibrate(espy.Service.all(), lambda service, server: service.distance_from_edge_server_to_users(server)):
+            engine.watch(espy.User)
+        else:
+            print("Distance engine does not match EdgeSimPy's distances, ranking servers with EdgeSimPy's method")
+            engine = None
+        topology.distance_engine = engine  # type: ignore
+    return topology.distance_engine  # type: ignore
+
+
+def get_change_tracker() -> ServiceChangeTracker:
+    topology = espy.Topology.first()
+    if not hasattr(topology, "change_tracker"):
+        tracker = ServiceChangeTracker()
+        tracker.watch(user_class=espy.User, service_class=espy.Service)
+        get_capacity_index().add_release_listener(tracker.release_parked)
+        for service in espy.Service.all():
+            tracker.mark_dirty(service)
+        topology.change_tracker = tracker  # type: ignore
+    return topology.change_tracker  # type: ignore
+
+
+def services_to_evaluate() -> list[espy.Service]:
+    if not CHANGE_TRACKING:
+        return espy.Service.all()
+    return get_change_tracker().pop_services(step=espy.Topology.first().model.schedule.steps)  # type: ignore
+
+
+def candidate_servers(service: espy.Service) -> list[espy.EdgeServer]:
+    capacity_index = get_capacity_index()
+    if CANDIDATE_SERVERS is None:
+        return [
+            server
+            for server in capacity_index.servers_with_capacity(cpu=service.cpu_demand, memory=service.memory_demand)
+            if capacity_index.has_capacity_to_host(server=server, service=service)
+        ]
+    return get_server_spatial_index().nearest(
+        coordinates=service_users_centroid(service),
+        k=CANDIDATE_SERVERS,
+        predicate=lambda server: capacity_index.has_capacity_to_host(server=server, service=service),
+    )
+
+
+def best_candidate_server(
+    service: espy.Service, distances: np.ndarray | None, engine: DistanceEngine | None = None
+) -> tuple[espy.EdgeServer | None, float]:
+    """Finds the server with capacity to host a service that is closest to the service's users.
+
+    Args:
+        service (espy.Service): Service being placed.
+        distances (np.ndarray | None): Row of the distance matrix for the service (only calculated when CANDIDATE_SERVERS
+            is None).
+        engine (DistanceEngine | None, optional): Distance engine (None ranks with EdgeSimPy's method). Defaults to None.
+
+    Returns:
+        (tuple[espy.EdgeServer | None, float]): Closest server with capacity (if any) and its distance to the users.
+    """
+    capacity_index = get_capacity_index()
+    if engine is not None and CANDIDATE_SERVERS is not None:
+        return engine.closest_server(
+            service,
+            spatial_index=get_server_spatial_index(),
+            k=CANDIDATE_SERVERS,
+            predicate=lambda server: capacity_index.has_capacity_to_host(server=server, service=service),
+        )
+    if distances is not None and engine is not None:
+        for column in np.argsort(distances, kind="stable"):
+            server = engine.servers[column]
+            if capacity_index.has_capacity_to_host(server=server, service=service):
+                return server, float(distances[column])
+        return None, float("inf")
+
+    edge_servers: list[espy.EdgeServer] = candidate_servers(service)
+    if len(edge_servers) == 0:
+        return None, float("inf")
+    distance, server = min(
+        ((service.distance_from_edge_server_to_users(server), server) for server in edge_servers), key=lambda item: item[0]
+    )
+    return server, distance
 
 
 def resource_management_algorithm(parameters):
+    tracker = get_change_tracker() if CHANGE_TRACKING else None
+    engine = get_distance_engine() if VECTORIZED_DISTANCES else None
+    step = espy.Topology.first().model.schedule.steps  # type: ignore
+
+    # Gathering the services that need a placement decision in this step, in evaluation order. Their gates only depend on
+    # their own state, which the decisions taken for the services before them do not change
+    services: list[espy.Service] = []
     service: espy.Service
-    for service in espy.Service.all():
+    for service in services_to_evaluate():
         # Initial allocation
-        edge_servers: list[espy.EdgeServer] = espy.EdgeServer.all()
-        edge_servers = [server for server in edge_servers if server.has_capacity_to_host(service)]
-        edge_servers.sort(reverse=False, key=lambda server: service.distance_from_edge_server_to_users(server))
         if service.server is None and not service.being_provisioned:
-            for edge_server in edge_servers:
-                if edge_server.has_capacity_to_host(service=service):
-                    service.provision(target_server=edge_server)
-                    break
+            services.append(service)
         # Reallocation
-        elif (
-            service.server is not None
-            and not service.was_recently_migrated(MIGRATION_RECENCY_THRESHOLD)
-            and service.total_dist_from_users > DISTANCE_THRESHOLD
-        ):
-            for edge_server in edge_servers:
-                if (
-                    edge_server.has_capacity_to_host(service=service)
-                    and service.distance_from_edge_server_to_users(edge_server) < service.total_dist_from_users
-                ):
-                    service.provision(target_server=edge_server)
-                    break
+        elif service.server is not None and service.total_dist_from_users > DISTANCE_THRESHOLD:
+            if not service.was_recently_migrated(MIGRATION_RECENCY_THRESHOLD):
+                services.append(service)
+            elif tracker is not None:
+                tracker.schedule(service, step=step + MIGRATION_RECENCY_THRESHOLD)
+
+    # Calculating the distance from every evaluated service to every server in a single batch (unless only the servers
+    # around each service's users are evaluated). Users do not move within the step, so the rows hold while the services
+    # are placed one at a time below
+    distance_matrix = None
+    if engine is not None and CANDIDATE_SERVERS is None:
+        distance_matrix = engine.service_server_distances(services)
+
+    for row, service in enumerate(services):
+        distances = distance_matrix[row] if distance_matrix is not None else None
+        edge_server, distance = best_candidate_server(service=service, distances=distances, engine=engine)
+
+        # Candidates were already filtered by capacity, and nothing changes until the service is provisioned
+        if service.server is None:
+            if edge_server is not None:
+                service.provision(target_server=edge_server)
+            elif tracker is not None:
+                tracker.park(service)
+            continue
+
+        # The current server is never closer than itself (its engine distance may differ from EdgeSimPy's by rounding)
+        if edge_server is not None and edge_server is not service.server and distance < service.total_dist_from_users:
+            service.provision(target_server=edge_server)
+        elif tracker is not None:
+            tracker.park(service)
 
 
 def stopping_criterion(model: Model):
     return model.schedule.steps >= STEPS_LIMIT  # type: ignore
 
 
-def generate_dataset():
-    if not os.path.exists("datasets/generated_dataset.json"):
-        print("Generating dataset")
+def generate_dataset(trace_memory: bool = TRACE_PIPELINE_MEMORY) -> str:
+    """Generates the scenario (unless a scenario with the same parameters was already generated) and points the dataset
+    paths (DATASET_FILE, TOPOLOGY_SNAPSHOT_FILE, ...) to its files.
+
+    Args:
+        trace_memory (bool, optional): Whether the memory allocated by each generation stage is traced (see
+            "pipeline.run_pipeline"). Defaults to TRACE_PIPELINE_MEMORY.
+
+    Returns:
+        fingerprint (str): Fingerprint of the scenario parameters.
+    """
+    parameters = scenario_parameters(seed=SCENARIO_SEED)
+    fingerprint = scenario_fingerprint(parameters)
+    if parameters["map_build"]["cell_towers_sha256"] is None:
+        # Without the cell tower dump (nor its recorded hash), only an already cached scenario can be used
+        fingerprint = find_cached_fingerprint(parameters)
+        if fingerprint is None:
+            raise FileNotFoundError(f"The cell tower dump ({CELL_TOWERS_CSV}) is required to generate the scenario")
+    directory = scenario_directory(fingerprint)
+
+    if not is_cached(fingerprint):
+        print(f"Generating dataset {fingerprint}")
         start_time = time.time()
-        grid = create_grid()
-        create_base_stations(grid)
-        topology = create_topology()
-        create_cloud_servers(topology, grid)
-        df_edge_servers = create_edge_servers()
-        create_regitries()
-        create_providers(grid)
-        df_pois = create_points_of_interest()
+        rng.seed(SCENARIO_SEED)
+        rng.seed_global_generators("scenario")  # EdgeSimPy's component builders draw from the global generators
+        context, _ = run_pipeline(parameters, trace_memory=trace_memory)
+        topology, df_edge_servers, df_pois = context["topology"], context["df_edge_servers"], context["df_pois"]
         base_stations = espy.BaseStation.all()
         bs_coords = [b.coordinates for b in base_stations]
-        os.makedirs("datasets/images", exist_ok=True)
         plot_grid(bs_coords, df_edge_servers, df_pois, save_path="datasets/images/grid.png")
         plot_points_of_interest(df_pois, save_path="datasets/images/pois.png")
-        export_scenario()
+        export_scenario(file_path=cached_path(directory, DATASET_FILE))
+        delay_matrix = None
+        if PRECOMPUTE_DELAY_MATRIX:
+            print("Precomputing delay matrix")
+            delay_matrix = DelayMatrix.compute(topology=topology, targets=server_network_switches())
+        if TOPOLOGY_SNAPSHOT:
+            snapshot = TopologySnapshot.build(
+                topology=topology, base_stations=base_stations, servers=espy.EdgeServer.all(), delay_matrix=delay_matrix
+            )
+            snapshot.save(cached_path(directory, TOPOLOGY_SNAPSHOT_FILE))
+        elif delay_matrix is not None:
+            delay_matrix.save(cached_path(directory, DELAY_MATRIX_FILE))
+        mark_cached(fingerprint, parameters)
         print(f"Dataset generated in {time.time() - start_time} seconds")
     else:
-        print("Using existing dataset")
+        print(f"Using cached dataset {fingerprint}")
 
+    for file_path in SCENARIO_FILES:
+        link_cached_file(fingerprint, file_name=os.path.relpath(file_path, "datasets"), link_path=file_path)
+    return fingerprint
 
-def main():
-    if len(sys.argv) == 4:
-        try:
-            global DISTANCE_THRESHOLD, MIGRATION_RECENCY_THRESHOLD, STEPS_LIMIT
-            DISTANCE_THRESHOLD = float(sys.argv[1])
-            MIGRATION_RECENCY_THRESHOLD = int(sys.argv[2])
-            STEPS_LIMIT = int(sys.argv[3])
-        except ValueError:
-            print("Usage: python3 script.py <distance_threshold> <migration_recency_threshold> <steps_limit>")
-            print("Example: python3 main.py 0.8 16 1080")
-            sys.exit(1)
 
-    generate_dataset()
+def cached_path(directory: str, file_path: str) -> str:
+    # The cache directory of a scenario mirrors the layout of "datasets/"
+    return os.path.join(directory, os.path.relpath(file_path, "datasets"))
+
 
-    logs_dir = (
+def logs_directory(distance_threshold: float, migration_recency_threshold: int, steps_limit: int) -> str:
+    return (
         "logs/"
-        f"{DISTANCE_THRESHOLD}dist-{MIGRATION_RECENCY_THRESHOLD}migr-{STEPS_LIMIT}steps/"
+        f"{distance_threshold}dist-{migration_recency_threshold}migr-{steps_limit}steps/"
         f"{time.strftime('%Y-%m-%d_%H-%M-%S')}"
     )
 
+
+def run_simulation(
+    distance_threshold: float,
+    migration_recency_threshold: int,
+    steps_limit: int,
+    input_data: str | dict = DATASET_FILE,
+    scenario: str | None = None,
+) -> espy.Simulator:
+    """Runs the simulation of a single configuration.
+
+    Args:
+        distance_threshold (float): Distance from users above which services are reallocated.
+        migration_recency_threshold (int): Steps during which a migrated service is not migrated again.
+        steps_limit (int): Number of simulated steps.
+        input_data (str | dict, optional): Dataset file or already parsed dataset. Defaults to DATASET_FILE.
+        scenario (str | None, optional): Fingerprint of the scenario (recorded in the run metadata). Defaults to None.
+
+    Returns:
+        simulator (espy.Simulator): Simulator after the run.
+    """
+    global DISTANCE_THRESHOLD, MIGRATION_RECENCY_THRESHOLD, STEPS_LIMIT
+    DISTANCE_THRESHOLD = distance_threshold
+    MIGRATION_RECENCY_THRESHOLD = migration_recency_threshold
+    STEPS_LIMIT = steps_limit
+
     print(
         "Initializing simulator with parameters:"
         f"\n- Distance threshold: {DISTANCE_THRESHOLD}"
@@ -111,18 +335,101 @@ def main():
         tick_unit="minutes",
         stopping_criterion=stopping_criterion,
         resource_management_algorithm=resource_management_algorithm,
-        logs_directory=logs_dir,
+        logs_directory=logs_directory(DISTANCE_THRESHOLD, MIGRATION_RECENCY_THRESHOLD, STEPS_LIMIT),
     )
 
     print("Initializing simulation")
     start_time = time.time()
-    simulator.initialize(input_file="datasets/generated_dataset.json")
+    # Observers of a previous run in the same process hold indexes of a discarded topology
+    clear_observers()
+    if isinstance(input_data, str):
+        input_data = load_scenario(input_data)
+    snapshot = open_snapshot(TOPOLOGY_SNAPSHOT_FILE) if TOPOLOGY_SNAPSHOT else None
+    if snapshot is not None and snapshot.matches_dataset(input_data):
+        input_data, switch_relationships = without_network_links(input_data)
+    else:
+        snapshot = None
+    # Mobility models and access patterns draw from the global generators, seeded per run so that runs are
+    # reproducible no matter which process (or how many runs before it) executes them
+    rng.seed(SIMULATION_SEED)
+    rng.seed_global_generators("mobility")
+    simulator.initialize(input_file=input_data)
+    if snapshot is not None:
+        restore_network_links(
+            simulator.topology,
+            snapshot,
+            link_class=espy.NetworkLink,
+            switch_relationships=switch_relationships,
+            initialize_agent=simulator.initialize_agent,
+        )
+        attach_snapshot(topology=simulator.topology, snapshot=snapshot, attach_delay_matrix=PRECOMPUTE_DELAY_MATRIX)
+    install_base_station_index(espy.BaseStation)
+    if CACHED_ROUTING and len(install_cached_routing([espy.User, espy.Service])) == 0:
+        print("EdgeSimPy's components do not look up paths with networkx.shortest_path, paths are not cached")
+    if PRECOMPUTE_DELAY_MATRIX:
+        if not hasattr(simulator.topology, "delay_matrix"):
+            load_or_compute_delay_matrix(topology=simulator.topology, file_path=DELAY_MATRIX_FILE)
+        # Without a delay matrix, links and switches are only observed once the helper methods create a path cache
+        watch_topology_changes(topology=simulator.topology, link_class=espy.NetworkLink)
+    spill = None
+    if COMPACT_COORDINATES_TRACES:
+        spill = install_coordinates_traces(
+            espy.User.all(),
+            capacity=TRACE_CAPACITY if SPILL_COORDINATES_TRACES else STEPS_LIMIT + TRACE_CAPACITY,
+            max_length=TRACE_MAX_LENGTH,
+            spill_file=f"{simulator.logs_directory}/coordinates_traces.bin" if SPILL_COORDINATES_TRACES else None,
+        )
+    if PEAK_TIMELINE_METRICS:
+        install_peak_timeline(simulator, espy.PointOfInterest)
+    if BATCHED_MOBILITY:
+        install_mobility_engine(
+            users=espy.User.all(), points_of_interest=espy.PointOfInterest.all(), base_stations=espy.BaseStation.all()
+        )
+    install_user_metrics(simulator)
+    if LOGS_FORMAT != "csv":
+        install_columnar_metrics(simulator, logs_format=LOGS_FORMAT)
     print(f"Initialization finished in {time.time() - start_time} seconds")
 
     print("Running model")
     start_time = time.time()
     simulator.run_model()
     print(f"Simulation finished in {time.time() - start_time} seconds")
+    if hasattr(simulator.topology, "path_cache"):
+        print(f"Path cache statistics: {simulator.topology.path_cache.statistics()}")
+    if spill is not None:
+        spill.close()
+
+    aggregate_store.write_run_metadata(
+        simulator.logs_directory,
+        {
+            "distance_threshold": DISTANCE_THRESHOLD,
+            "migration_recency_threshold": MIGRATION_RECENCY_THRESHOLD,
+            "steps_limit": STEPS_LIMIT,
+            "scenario": scenario,
+            "simulation_seed": SIMULATION_SEED,
+            "logs_format": LOGS_FORMAT,
+        },
+    )
+    if AGGREGATE_RUNS and aggregate_store.AVAILABLE:
+        aggregate_store.aggregate_run(simulator.logs_directory)
+
+    return simulator
+
+
+def main():
+    distance_threshold, migration_recency_threshold, steps_limit = DISTANCE_THRESHOLD, MIGRATION_RECENCY_THRESHOLD, STEPS_LIMIT
+    if len(sys.argv) == 4:
+        try:
+            distance_threshold = float(sys.argv[1])
+            migration_recency_threshold = int(sys.argv[2])
+            steps_limit = int(sys.argv[3])
+        except ValueError:
+            print("Usage: python3 script.py <distance_threshold> <migration_recency_threshold> <steps_limit>")
+            print("Example: python3 main.py 0.8 16 1080")
+            sys.exit(1)
+
+    fingerprint = generate_dataset()
+    run_simulation(distance_threshold, migration_recency_threshold, steps_limit, scenario=fingerprint)
 
 
 if __name__ == "__main__":
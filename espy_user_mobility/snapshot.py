@@ -0,0 +1,362 @@
+import json
+import mmap
+import os
+import struct
+from collections.abc import Callable, Iterable
+
+import networkx as nx
+import numpy as np
+
+from .delay_matrix import DelayMatrix
+
+SNAPSHOT_MAGIC = b"ESPYSNAP"
+SNAPSHOT_VERSION = 3  # Version 2 only stored the delay matrix
+SNAPSHOT_ALIGNMENT = 64  # Byte alignment of each array inside the file
+NO_SWITCH = -1
+
+# Magic bytes followed by the length of the JSON header
+HEADER_PREFIX = struct.Struct(f"<{len(SNAPSHOT_MAGIC)}sQ")
+
+
+class TopologySnapshot:
+    """Columnar snapshot of the static parts of a built scenario, stored as NumPy arrays in a single file.
+
+    Network switches are sorted by ID, and every other array refers to them by their position (column):
+    - "switch_ids", "switch_coordinates": network switches;
+    - "adjacency_indptr", "adjacency_indices": topology adjacency in CSR format (neighbors of the switch "c" are
+      "adjacency_indices[adjacency_indptr[c]:adjacency_indptr[c + 1]]"), with "link_ids", "link_delays",
+      "link_bandwidths" and "link_first" (whether the switch is the first of the link's nodes) aligned with
+      "adjacency_indices";
+    - "base_station_*" and "server_*": base station and server attributes (including the column of their switch);
+    - "delay_target_ids", "delays", "next_hops": optional delay matrix (see DelayMatrix).
+
+    Snapshots opened from the disk are memory-mapped read-only, so every process attached to the same file shares a
+    single physical copy of the arrays. Runs rebuild the network links from the adjacency arrays instead of parsing them
+    from the dataset (see "without_network_links" and "restore_network_links").
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray], mapped_file: mmap.mmap | None = None):
+        """Creates a snapshot from its arrays.
+
+        Args:
+            arrays (dict[str, np.ndarray]): Snapshot arrays, indexed by name.
+            mapped_file (mmap.mmap | None, optional): Memory map backing the arrays. Defaults to None.
+        """
+        self.arrays = arrays
+        self.mapped_file = mapped_file
+        self.switch_columns = {int(switch_id): column for column, switch_id in enumerate(arrays["switch_ids"])}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays
+
+    @classmethod
+    def build(
+        cls,
+        topology: nx.Graph,
+        base_stations: Iterable[object],
+        servers: Iterable[object],
+        delay_matrix: DelayMatrix | None = None,
+    ) -> "TopologySnapshot":
+        """Gathers the snapshot arrays from the components of a built scenario.
+
+        Args:
+            topology (nx.Graph): Network topology.
+            base_stations (Iterable[object]): Base stations of the scenario.
+            servers (Iterable[object]): Edge servers of the scenario.
+            delay_matrix (DelayMatrix | None, optional): Delay matrix stored along with the topology. Defaults to None.
+
+        Returns:
+            snapshot (TopologySnapshot): In-memory snapshot.
+        """
+        switches = sorted(topology.nodes(), key=lambda node: node.id)
+        switch_columns = {switch.id: column for column, switch in enumerate(switches)}
+
+        indptr = np.zeros(len(switches) + 1, dtype=np.int64)
+        indices, link_ids, link_delays, link_bandwidths, link_first = [], [], [], [], []
+        for column, switch in enumerate(switches):
+            for neighbor in sorted(topology[switch], key=lambda node: node.id):
+                link = topology[switch][neighbor]
+                indices.append(switch_columns[neighbor.id])
+                link_ids.append(link["id"])
+                link_delays.append(link["delay"])
+                link_bandwidths.append(link["bandwidth"])
+                link_first.append(link["nodes"][0] is switch)
+            indptr[column + 1] = len(indices)
+
+        def switch_column_of(component: object) -> int:
+            network_switch = getattr(component, "network_switch", None)
+            return switch_columns.get(network_switch.id, NO_SWITCH) if network_switch is not None else NO_SWITCH
+
+        base_stations = sorted(base_stations, key=lambda base_station: base_station.id)
+        servers = sorted(servers, key=lambda server: server.id)
+        arrays = {
+            "switch_ids": np.array([switch.id for switch in switches], dtype=np.int64),
+            "switch_coordinates": np.array([switch.coordinates for switch in switches], dtype=np.float64).reshape(-1, 2),
+            "adjacency_indptr": indptr,
+            "adjacency_indices": np.array(indices, dtype=np.int32),
+            "link_ids": np.array(link_ids, dtype=np.int64),
+            # Delays and bandwidths keep their type (e.g., integers), so rebuilt links have the same values as parsed ones
+            "link_delays": np.array(link_delays),
+            "link_bandwidths": np.array(link_bandwidths),
+            "link_first": np.array(link_first, dtype=np.bool_),
+            "base_station_ids": np.array([base_station.id for base_station in base_stations], dtype=np.int64),
+            "base_station_coordinates": np.array(
+                [base_station.coordinates for base_station in base_stations], dtype=np.float64
+            ).reshape(-1, 2),
+            "base_station_switches": np.array([switch_column_of(base_station) for base_station in base_stations], dtype=np.int32),
+            "server_ids": np.array([server.id for server in servers], dtype=np.int64),
+            "server_coordinates": np.array([server.coordinates for server in servers], dtype=np.float64).reshape(-1, 2),
+            "server_cpu": np.array([server.cpu for server in servers], dtype=np.float64),
+            "server_memory": np.array([server.memory for server in servers], dtype=np.float64),
+            "server_disk": np.array([server.disk for server in servers], dtype=np.float64),
+            "server_switches": np.array([switch_column_of(server) for server in servers], dtype=np.int32),
+        }
+        if delay_matrix is not None:
+            arrays["delay_target_ids"] = np.asarray(delay_matrix.target_ids, dtype=np.int64)
+            arrays["delays"] = np.asarray(delay_matrix.delays, dtype=np.float64)
+            arrays["next_hops"] = np.asarray(delay_matrix.next_hops, dtype=np.int32)
+        return cls(arrays)
+
+    def save(self, file_path: str):
+        """Writes the snapshot to a single file: a JSON header describing the arrays followed by the raw arrays.
+
+        Args:
+            file_path (str): Output file path.
+        """
+        directory = os.path.dirname(file_path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+
+        # Offsets are relative to the end of the header, which is padded to SNAPSHOT_ALIGNMENT bytes
+        entries, offset = {}, 0
+        for name, array in self.arrays.items():
+            entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset += -(-array.nbytes // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+        header = json.dumps({"version": SNAPSHOT_VERSION, "arrays": entries}).encode()
+        header_size = -(-(HEADER_PREFIX.size + len(header)) // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+        header = header.ljust(header_size - HEADER_PREFIX.size)
+
+        with open(f"{file_path}.tmp", "wb") as output_file:
+            output_file.write(HEADER_PREFIX.pack(SNAPSHOT_MAGIC, len(header)))
+            output_file.write(header)
+            for name, array in self.arrays.items():
+                data = np.ascontiguousarray(array).tobytes()
+                output_file.write(data)
+                output_file.write(b"\0" * (-len(data) % SNAPSHOT_ALIGNMENT))
+        os.replace(f"{file_path}.tmp", file_path)
+
+    @classmethod
+    def open(cls, file_path: str) -> "TopologySnapshot":
+        """Memory-maps a snapshot written by "TopologySnapshot.save" (arrays are read-only views of the file).
+
+        Args:
+            file_path (str): Snapshot file path.
+
+        Returns:
+            snapshot (TopologySnapshot): Memory-mapped snapshot.
+        """
+        with open(file_path, "rb") as input_file:
+            mapped_file = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = HEADER_PREFIX.unpack_from(mapped_file, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{file_path} is not a topology snapshot")
+        header = json.loads(bytes(mapped_file[HEADER_PREFIX.size : HEADER_PREFIX.size + header_length]))
+        if header["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported topology snapshot version in {file_path}: {header['version']}")
+
+        data_start = HEADER_PREFIX.size + header_length
+        arrays = {}
+        for name, entry in header["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"], dtype=np.int64))
+            array = np.frombuffer(mapped_file, dtype=dtype, count=count, offset=data_start + entry["offset"])
+            arrays[name] = array.reshape(entry["shape"])
+        return cls(arrays, mapped_file=mapped_file)
+
+    def matches(self, topology: nx.Graph) -> bool:
+        """Checks whether the snapshot was built from a topology with the same network switches."""
+        switch_ids = self.arrays["switch_ids"]
+        return len(switch_ids) == topology.number_of_nodes() and all(node.id in self.switch_columns for node in topology)
+
+    def network_link_ids(self) -> np.ndarray:
+        """Lists the IDs of the network links (each link is twice in the adjacency arrays), sorted."""
+        return np.sort(self.arrays["link_ids"][self.arrays["link_first"]])
+
+    def matches_dataset(self, input_data: dict) -> bool:
+        """Checks whether the snapshot was built with a dataset: same network switches, and the same network links listed
+        in the order of their IDs (the order in which "restore_network_links" rebuilds them).
+
+        Args:
+            input_data (dict): Parsed dataset (see "scenario_format.load_scenario").
+
+        Returns:
+            bool: Whether the dataset's network links can be rebuilt from the snapshot.
+        """
+        switch_ids = sorted(metadata["attributes"]["id"] for metadata in input_data.get("NetworkSwitch", []))
+        link_ids = [metadata["attributes"]["id"] for metadata in input_data.get("NetworkLink", [])]
+        return np.array_equal(switch_ids, self.arrays["switch_ids"]) and np.array_equal(link_ids, self.network_link_ids())
+
+    def neighbors(self, switch_id: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Gets the neighbors of a network switch and the delay and bandwidth of the links toward them.
+
+        Args:
+            switch_id (int): Network switch ID.
+
+        Returns:
+            (tuple[np.ndarray, np.ndarray, np.ndarray]): Neighbor IDs, link delays and link bandwidths.
+        """
+        column = self.switch_columns[switch_id]
+        start, end = self.arrays["adjacency_indptr"][column], self.arrays["adjacency_indptr"][column + 1]
+        neighbors = self.arrays["switch_ids"][self.arrays["adjacency_indices"][start:end]]
+        return neighbors, self.arrays["link_delays"][start:end], self.arrays["link_bandwidths"][start:end]
+
+    def delay_matrix(self) -> DelayMatrix | None:
+        """Creates a delay matrix backed by the snapshot arrays (copied only if the matrix is later repaired)."""
+        if "delays" not in self.arrays:
+            return None
+        return DelayMatrix(
+            node_ids=self.arrays["switch_ids"],
+            target_ids=self.arrays["delay_target_ids"],
+            delays=self.arrays["delays"],
+            next_hops=self.arrays["next_hops"],
+        )
+
+
+def open_snapshot(file_path: str) -> TopologySnapshot | None:
+    """Memory-maps a snapshot, if it exists and was written by this version.
+
+    Args:
+        file_path (str): Snapshot file path.
+
+    Returns:
+        snapshot (TopologySnapshot | None): Memory-mapped snapshot (None if it does not exist or cannot be read).
+    """
+    if not os.path.exists(file_path):
+        return None
+    try:
+        return TopologySnapshot.open(file_path)
+    except ValueError as error:  # E.g., a snapshot written by a previous version
+        print(f"Ignoring the topology snapshot {file_path} ({error})")
+        return None
+
+
+def without_network_links(input_data: dict) -> tuple[dict, list[str]]:
+    """Copies a parsed dataset without its network links, which are then rebuilt from a snapshot.
+
+    The network switch relationships that reference the links (e.g., "links") are emptied. The original dataset is not
+    modified (e.g., the copy shared by the runs of a sweep).
+
+    Args:
+        input_data (dict): Parsed dataset.
+
+    Returns:
+        (tuple[dict, list[str]]): Dataset without network links and names of the emptied network switch relationships.
+    """
+
+    def references_links(value: object) -> bool:
+        return (
+            isinstance(value, list)
+            and len(value) > 0
+            and all(isinstance(item, dict) and item.get("class") == "NetworkLink" for item in value)
+        )
+
+    scenario = {key: value for key, value in input_data.items() if key != "NetworkLink"}
+    relationship_names = set()
+    network_switches = []
+    for metadata in input_data.get("NetworkSwitch", []):
+        names = [name for name, value in metadata["relationships"].items() if references_links(value)]
+        if len(names) > 0:
+            relationship_names.update(names)
+            metadata = {**metadata, "relationships": {**metadata["relationships"], **{name: [] for name in names}}}
+        network_switches.append(metadata)
+    if "NetworkSwitch" in input_data:
+        scenario["NetworkSwitch"] = network_switches
+    return scenario, sorted(relationship_names)
+
+
+def restore_network_links(
+    topology: nx.Graph,
+    snapshot: TopologySnapshot,
+    link_class: type,
+    switch_relationships: Iterable[str] = (),
+    initialize_agent: Callable | None = None,
+) -> list:
+    """Rebuilds the network links of a topology (whose network switches were loaded without them) from a snapshot.
+
+    Links are created in the order of their IDs with their original IDs, so the topology's adjacency (and therefore the
+    paths picked among equally short ones) is the same as when the links are parsed from the dataset.
+
+    Args:
+        topology (nx.Graph): Network topology, with the snapshot's network switches.
+        snapshot (TopologySnapshot): Snapshot built with the dataset (see "TopologySnapshot.matches_dataset").
+        link_class (type): NetworkLink component class.
+        switch_relationships (Iterable[str], optional): Network switch attributes listing their links (see
+            "without_network_links"). Defaults to ().
+        initialize_agent (Callable | None, optional): Registers each link in the simulation (e.g.,
+            "Simulator.initialize_agent"). Defaults to None.
+
+    Returns:
+        links (list): Rebuilt network links.
+    """
+    switches = sorted(topology.nodes(), key=lambda node: node.id)
+    indptr, indices = snapshot["adjacency_indptr"], snapshot["adjacency_indices"]
+    rows = np.repeat(np.arange(len(switches)), np.diff(indptr))
+
+    # Each link is found once, from the adjacency entry of its first node
+    entries = np.flatnonzero(snapshot["link_first"])
+    entries = entries[np.argsort(snapshot["link_ids"][entries], kind="stable")]
+    pairs = [(switches[row], switches[column]) for row, column in zip(rows[entries].tolist(), indices[entries].tolist())]
+
+    # The edges are added in bulk and their data dictionaries are replaced by the links, as in "build_hexagonal_mesh"
+    topology.add_edges_from(pairs)
+    links = []
+    for (network_switch, neighbor), link_id, delay, bandwidth in zip(
+        pairs,
+        snapshot["link_ids"][entries].tolist(),
+        snapshot["link_delays"][entries].tolist(),
+        snapshot["link_bandwidths"][entries].tolist(),
+    ):
+        link = link_class()
+        link.id = link_id
+        link.topology = topology
+        link.delay = delay
+        link.bandwidth = bandwidth
+        link.nodes = [network_switch, neighbor]
+        topology._adj[network_switch][neighbor] = link
+        topology._adj[neighbor][network_switch] = link
+        if initialize_agent is not None:
+            initialize_agent(agent=link)
+        links.append(link)
+
+    for name in switch_relationships:
+        for switch in switches:
+            setattr(switch, name, [])
+        for link in links:
+            for switch in link.nodes:
+                getattr(switch, name).append(link)
+    return links
+
+
+def attach_snapshot(topology: nx.Graph, snapshot: TopologySnapshot, attach_delay_matrix: bool = True) -> bool:
+    """Attaches a snapshot (and its delay matrix) to the topology when it matches the topology's network switches.
+
+    Args:
+        topology (nx.Graph): Network topology.
+        snapshot (TopologySnapshot): Memory-mapped snapshot.
+        attach_delay_matrix (bool, optional): Whether the snapshot's delay matrix is used by the topology. Defaults to True.
+
+    Returns:
+        bool: Whether the snapshot was attached.
+    """
+    if not snapshot.matches(topology):
+        return False
+
+    topology.snapshot = snapshot  # type: ignore
+    delay_matrix = snapshot.delay_matrix() if attach_delay_matrix else None
+    if delay_matrix is not None and delay_matrix.bind(topology):
+        topology.delay_matrix = delay_matrix  # type: ignore
+    return True
@@ -0,0 +1,176 @@
+import heapq
+from collections.abc import Callable, Iterable
+from math import floor, sqrt
+
+DEFAULT_CELL_SIZE = 8
+
+
+class ServerSpatialIndex:
+    """Bucket grid over the hexagonal coordinates of edge and cloud servers.
+
+    Servers are bucketed into square cells of `cell_size` grid units keyed on the (x, y) coordinates produced by
+    `create_grid`. Nearest-neighbor queries expand rings of cells around the query point and stop as soon as no
+    unvisited cell can hold a closer server, so a query only touches the servers around the query point.
+    """
+
+    def __init__(self, servers: Iterable[object] = (), cell_size: int = DEFAULT_CELL_SIZE):
+        """Creates a spatial index over a collection of servers.
+
+        Args:
+            servers (Iterable[object], optional): Servers to be indexed. Defaults to ().
+            cell_size (int, optional): Side of each bucket cell, in grid units. Defaults to DEFAULT_CELL_SIZE.
+        """
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[object]] = {}
+        self.server_cells: dict[int, tuple[int, int]] = {}
+        self.cell_bounds: tuple[int, int, int, int] | None = None  # (min x, min y, max x, max y) of the occupied cells
+        for server in servers:
+            self.add(server)
+
+    def __len__(self) -> int:
+        return len(self.server_cells)
+
+    def _cell_of(self, coordinates) -> tuple[int, int]:
+        return (floor(coordinates[0] / self.cell_size), floor(coordinates[1] / self.cell_size))
+
+    def add(self, server: object):
+        """Adds a server to the index (servers already indexed are moved to their current coordinates).
+
+        Args:
+            server (object): Server to be indexed.
+        """
+        if server.id in self.server_cells:
+            self.remove(server)
+        cell = self._cell_of(server.coordinates)
+        self.cells.setdefault(cell, []).append(server)
+        self.server_cells[server.id] = cell
+        if self.cell_bounds is not None:
+            min_x, min_y, max_x, max_y = self.cell_bounds
+            self.cell_bounds = (min(min_x, cell[0]), min(min_y, cell[1]), max(max_x, cell[0]), max(max_y, cell[1]))
+        elif len(self.cells) == 1:
+            self.cell_bounds = (cell[0], cell[1], cell[0], cell[1])
+
+    def remove(self, server: object):
+        """Removes a server from the index.
+
+        Args:
+            server (object): Server to be removed.
+        """
+        cell = self.server_cells.pop(server.id, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        bucket.remove(server)
+        if len(bucket) == 0:
+            del self.cells[cell]
+            self.cell_bounds = None  # Recalculated by the next query
+
+    def _bounds(self) -> tuple[int, int, int, int]:
+        if self.cell_bounds is None:
+            xs, ys = [cell[0] for cell in self.cells], [cell[1] for cell in self.cells]
+            self.cell_bounds = (min(xs), min(ys), max(xs), max(ys))
+        return self.cell_bounds
+
+    def _ring(self, center: tuple[int, int], radius: int):
+        cx, cy = center
+        if radius == 0:
+            yield center
+            return
+        for dx in range(-radius, radius + 1):
+            yield (cx + dx, cy - radius)
+            yield (cx + dx, cy + radius)
+        for dy in range(-radius + 1, radius):
+            yield (cx - radius, cy + dy)
+            yield (cx + radius, cy + dy)
+
+    def nearest(self, coordinates, k: int = 1, predicate: Callable[[object], bool] | None = None) -> list[object]:
+        """Finds the k servers closest (euclidean distance) to a given point that satisfy a predicate.
+
+        Args:
+            coordinates (tuple): Query point.
+            k (int, optional): Maximum number of servers returned. Defaults to 1.
+            predicate (Callable[[object], bool] | None, optional): Filter applied to the candidates. Defaults to None.
+
+        Returns:
+            servers (list[object]): Up to k servers, sorted by their distance to the query point (and by ID).
+        """
+        if k <= 0 or len(self.cells) == 0:
+            return []
+
+        x, y = coordinates
+        center = self._cell_of(coordinates)
+
+        # Largest ring that still overlaps an occupied cell, after which the search is exhaustive
+        min_x, min_y, max_x, max_y = self._bounds()
+        max_radius = max(center[0] - min_x, max_x - center[0], center[1] - min_y, max_y - center[1], 0)
+
+        # Max-heap (negated distances and IDs) holding the best k candidates found so far, ordered by (distance, ID)
+        best: list[tuple[float, int, object]] = []
+        for radius in range(max_radius + 1):
+            for cell in self._ring(center=center, radius=radius):
+                for server in self.cells.get(cell, ()):
+                    distance = sqrt((server.coordinates[0] - x) ** 2 + (server.coordinates[1] - y) ** 2)
+                    if len(best) == k and (-best[0][0], -best[0][1]) < (distance, server.id):
+                        continue
+                    if predicate is not None and not predicate(server):
+                        continue
+                    if len(best) == k:
+                        heapq.heapreplace(best, (-distance, -server.id, server))
+                    else:
+                        heapq.heappush(best, (-distance, -server.id, server))
+
+            # Every unvisited cell is at least "radius" cells away from the cell holding the query point (servers at the
+            # same distance as the worst candidate may still have lower IDs)
+            if len(best) == k and -best[0][0] < radius * self.cell_size:
+                break
+
+        return [server for _, _, server in sorted(best, key=lambda item: (-item[0], -item[1]))]
+
+    def within(self, coordinates, radius: float, predicate: Callable[[object], bool] | None = None) -> list[object]:
+        """Finds the servers within a given (euclidean) distance of a point that satisfy a predicate.
+
+        Args:
+            coordinates (tuple): Query point.
+            radius (float): Maximum distance to the query point.
+            predicate (Callable[[object], bool] | None, optional): Filter applied to the candidates. Defaults to None.
+
+        Returns:
+            servers (list[object]): Servers found, sorted by their distance to the query point.
+        """
+        x, y = coordinates
+        first_cell, last_cell = self._cell_of((x - radius, y - radius)), self._cell_of((x + radius, y + radius))
+
+        # Scanning the cells that overlap the query square, or every occupied cell if there are fewer of them
+        if (last_cell[0] - first_cell[0] + 1) * (last_cell[1] - first_cell[1] + 1) <= len(self.cells):
+            cells = (
+                (cell_x, cell_y)
+                for cell_x in range(first_cell[0], last_cell[0] + 1)
+                for cell_y in range(first_cell[1], last_cell[1] + 1)
+            )
+        else:
+            cells = iter(self.cells)
+
+        found = []
+        for cell in cells:
+            for server in self.cells.get(cell, ()):
+                distance = sqrt((server.coordinates[0] - x) ** 2 + (server.coordinates[1] - y) ** 2)
+                if distance <= radius and (predicate is None or predicate(server)):
+                    found.append((distance, server.id, server))
+        return [server for _, _, server in sorted(found, key=lambda item: (item[0], item[1]))]
+
+
+def service_users_centroid(service: object) -> tuple[float, float]:
+    """Calculates the centroid of the coordinates of the users that access a service's application.
+
+    Args:
+        service (object): Service whose users' centroid must be calculated.
+
+    Returns:
+        centroid (tuple[float, float]): Mean (x, y) coordinates of the users.
+    """
+    users = service.application.users
+    if len(users) == 0:
+        return service.server.coordinates if service.server is not None else (0.0, 0.0)
+    x = sum(user.coordinates[0] for user in users) / len(users)
+    y = sum(user.coordinates[1] for user in users) / len(users)
+    return (x, y)
@@ -0,0 +1,192 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import simulate
+from .scenario_format import load_scenario
+
+DISTANCE_THRESHOLDS = [0.2, 0.4, 0.6, 0.8]
+MIGRATION_RECENCY_THRESHOLDS = [8, 16, 32, 64]
+MEMORY_PER_RUN_MB = 2048  # Estimated peak memory of a single run, used to size the process pool
+SWEEPS_DIRECTORY = "logs/sweeps"
+
+# Parsed dataset (pickled) and its fingerprint, set by the parent process before the pool is created so that forked
+# workers inherit them
+_SCENARIO: bytes | None = None
+_SCENARIO_FINGERPRINT: str | None = None
+
+
+def available_memory_mb() -> int:
+    """Gets the memory available for new processes without swapping (MemAvailable), in megabytes."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+
+
+def pool_size(runs: int, memory_per_run_mb: int = MEMORY_PER_RUN_MB, max_workers: int | None = None) -> int:
+    """Calculates how many configurations can run at once without oversubscribing the CPUs or the memory.
+
+    Args:
+        runs (int): Number of configurations in the sweep.
+        memory_per_run_mb (int, optional): Estimated peak memory of a single run. Defaults to MEMORY_PER_RUN_MB.
+        max_workers (int | None, optional): Upper bound given by the user. Defaults to None.
+
+    Returns:
+        workers (int): Number of worker processes.
+    """
+    workers = min(os.cpu_count() or 1, available_memory_mb() // max(memory_per_run_mb, 1), runs)
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    return max(workers, 1)
+
+
+def reset_peak_rss():
+    # Writing "5" to clear_refs resets the peak resident set size (VmHWM) of the process
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Gets the peak resident set size of the current process since the last "reset_peak_rss" call.
+
+    When "/proc" is not available, the peak since the process started (getrusage) is returned instead.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_configuration(distance_threshold: float, migration_recency_threshold: int, steps_limit: int) -> dict:
+    """Runs a single configuration of the sweep (inside a worker process).
+
+    Args:
+        distance_threshold (float): Distance from users above which services are reallocated.
+        migration_recency_threshold (int): Steps during which a migrated service is not migrated again.
+        steps_limit (int): Number of simulated steps.
+
+    Returns:
+        run (dict): Manifest entry of the run.
+    """
+    run = {
+        "distance_threshold": distance_threshold,
+        "migration_recency_threshold": migration_recency_threshold,
+        "steps_limit": steps_limit,
+        "pid": os.getpid(),
+    }
+    reset_peak_rss()
+    start_time = time.time()
+    try:
+        # Each run materializes a private copy of the dataset, as EdgeSimPy components keep references to its lists
+        input_data = pickle.loads(_SCENARIO) if _SCENARIO is not None else simulate.DATASET_FILE
+        simulator = simulate.run_simulation(
+            distance_threshold, migration_recency_threshold, steps_limit, input_data=input_data, scenario=_SCENARIO_FINGERPRINT
+        )
+        run["logs_directory"] = simulator.logs_directory
+        run["status"] = "finished"
+    except Exception as exception:
+        run["status"] = f"failed: {exception!r}"
+    run["wall_time_seconds"] = time.time() - start_time
+    run["peak_rss_mb"] = peak_rss_mb()
+    return run
+
+
+def sweep(
+    distance_thresholds: list[float],
+    migration_recency_thresholds: list[int],
+    steps_limit: int,
+    memory_per_run_mb: int = MEMORY_PER_RUN_MB,
+    max_workers: int | None = None,
+) -> list[dict]:
+    """Runs every (distance threshold, migration recency threshold) configuration in a bounded process pool.
+
+    The dataset is parsed once by the parent process, and workers are forked so that they share it (copy-on-write)
+    instead of parsing the JSON file again.
+
+    Args:
+        distance_thresholds (list[float]): Distance thresholds of the grid.
+        migration_recency_thresholds (list[int]): Migration recency thresholds of the grid.
+        steps_limit (int): Number of simulated steps of each run.
+        memory_per_run_mb (int, optional): Estimated peak memory of a single run. Defaults to MEMORY_PER_RUN_MB.
+        max_workers (int | None, optional): Upper bound of worker processes. Defaults to None.
+
+    Returns:
+        runs (list[dict]): Manifest entries, in the grid order.
+    """
+    global _SCENARIO, _SCENARIO_FINGERPRINT
+    configurations = list(itertools.product(distance_thresholds, migration_recency_thresholds))
+
+    _SCENARIO_FINGERPRINT = simulate.generate_dataset()
+    print("Parsing dataset")
+    _SCENARIO = pickle.dumps(load_scenario(simulate.DATASET_FILE), protocol=pickle.HIGHEST_PROTOCOL)
+
+    workers = pool_size(len(configurations), memory_per_run_mb=memory_per_run_mb, max_workers=max_workers)
+    print(f"Running {len(configurations)} configurations with {workers} workers")
+
+    runs: dict[tuple, dict] = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+        futures = {
+            executor.submit(run_configuration, distance_threshold, migration_recency_threshold, steps_limit): (
+                distance_threshold,
+                migration_recency_threshold,
+            )
+            for distance_threshold, migration_recency_threshold in configurations
+        }
+        for future in as_completed(futures):
+            run = future.result()
+            runs[futures[future]] = run
+            print(
+                f"Configuration {futures[future]} {run['status']} in {run['wall_time_seconds']:.1f} seconds "
+                f"(peak RSS: {run['peak_rss_mb']:.0f} MB)"
+            )
+
+    return [runs[configuration] for configuration in configurations]
+
+
+def write_manifest(runs: list[dict], steps_limit: int) -> str:
+    os.makedirs(SWEEPS_DIRECTORY, exist_ok=True)
+    manifest_path = f"{SWEEPS_DIRECTORY}/{time.strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    with open(manifest_path, "w", encoding="UTF-8") as manifest_file:
+        json.dump({"steps_limit": steps_limit, "runs": runs}, manifest_file, indent=4)
+    return manifest_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs a grid of simulation configurations in parallel.")
+    parser.add_argument("--distance-thresholds", type=float, nargs="+", default=DISTANCE_THRESHOLDS)
+    parser.add_argument("--recencies", type=int, nargs="+", default=MIGRATION_RECENCY_THRESHOLDS)
+    parser.add_argument("--steps-limit", type=int, default=simulate.STEPS_LIMIT)
+    parser.add_argument("--memory-per-run", type=int, default=MEMORY_PER_RUN_MB, help="Estimated peak memory of a run (MB)")
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    runs = sweep(
+        distance_thresholds=args.distance_thresholds,
+        migration_recency_thresholds=args.recencies,
+        steps_limit=args.steps_limit,
+        memory_per_run_mb=args.memory_per_run,
+        max_workers=args.max_workers,
+    )
+    print(f"Manifest written to {write_manifest(runs, steps_limit=args.steps_limit)}")
+
+
+if __name__ == "__main__":
+    main()
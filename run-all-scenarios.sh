@@ -4,9 +4,9 @@ THERSHOLDS=(0.2 0.4 0.6 0.8)
 RECENCIES=(8 16 32 64)
 STEPS_LIMIT=2160
 
-for threshold in "${THERSHOLDS[@]}"; do
-    for recency in "${RECENCIES[@]}"; do
-        echo "Running scenario with threshold: $threshold and recency: $recency"
-        screen -dmLS "config-$threshold-$recency" .venv/bin/python3 main.py "$threshold" "$recency" "$STEPS_LIMIT"
-    done
-done
+# Runs every threshold x recency configuration in a process pool sized to the available cores and memory
+.venv/bin/python3 -m espy_user_mobility.sweep \
+    --distance-thresholds "${THERSHOLDS[@]}" \
+    --recencies "${RECENCIES[@]}" \
+    --steps-limit "$STEPS_LIMIT" \
+    "$@"
@@ -0,0 +1,61 @@
+import pytest
+
+from espy_user_mobility.base_station_index import install_base_station_index
+from espy_user_mobility.observers import clear_observers
+
+
+class BaseStation:
+    _instances = []
+
+    def __init__(self, coordinates=None, wireless_delay=0):
+        self.id = len(BaseStation._instances) + 1
+        self.coordinates = coordinates
+        self.wireless_delay = wireless_delay
+        BaseStation._instances.append(self)
+
+    @classmethod
+    def all(cls) -> list:
+        return cls._instances
+
+    @classmethod
+    def find_by(cls, attribute_name: str, attribute_value: object) -> object:
+        # Linear search, as in EdgeSimPy's ComponentManager
+        return next((obj for obj in cls._instances if getattr(obj, attribute_name) == attribute_value), None)
+
+
+@pytest.fixture(autouse=True)
+def base_stations():
+    BaseStation._instances = []
+    yield
+    clear_observers()
+
+
+def linear_find_by(attribute_name: str, attribute_value: object) -> object:
+    return BaseStation._find_by_without_index(attribute_name=attribute_name, attribute_value=attribute_value)
+
+
+def test_shared_coordinates_return_the_first_base_station():
+    first, second = BaseStation((0, 0)), BaseStation((0, 0))
+    install_base_station_index(BaseStation)
+
+    assert BaseStation.find_by("coordinates", (0, 0)) is first
+    third = BaseStation((2, 0))
+    third.coordinates = (0, 0)
+    assert BaseStation.find_by("coordinates", (0, 0)) is first
+
+    first.coordinates = (4, 0)
+    assert BaseStation.find_by("coordinates", (0, 0)) is second is linear_find_by("coordinates", (0, 0))
+    assert BaseStation.find_by("coordinates", (4, 0)) is first
+    assert BaseStation.find_by("coordinates", (2, 0)) is None
+
+
+def test_lookups_match_linear_search():
+    for x in range(6):
+        BaseStation((2 * (x % 3), 0), wireless_delay=x)
+    install_base_station_index(BaseStation)
+    BaseStation.all()[1].coordinates = (1, 1)
+
+    for coordinates in [(0, 0), (2, 0), (4, 0), (1, 1), (9, 9)]:
+        assert BaseStation.find_by("coordinates", coordinates) is linear_find_by("coordinates", coordinates)
+    # Other attributes are answered by the original method
+    assert BaseStation.find_by("wireless_delay", 4) is BaseStation.all()[4]
@@ -0,0 +1,89 @@
+import itertools
+import sys
+import types
+from types import SimpleNamespace
+
+import networkx as nx
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility.delay_matrix import DelayMatrix  # noqa: E402
+from espy_user_mobility.helper_methods import ROUTED_NETWORKX, install_cached_routing  # noqa: E402
+from espy_user_mobility.observers import clear_observers  # noqa: E402
+
+
+class Switch:
+    def __init__(self, id: int, model: object):
+        self.id = id
+        self.model = model
+
+    def __repr__(self) -> str:
+        return f"Switch_{self.id}"
+
+
+@pytest.fixture
+def topology():
+    model = SimpleNamespace()
+    switches = [Switch(id, model) for id in range(1, 13)]
+    topology = nx.Graph()
+    # Ring with shortcuts, with equally short paths between some switches
+    for index, switch in enumerate(switches):
+        topology.add_edge(switch, switches[(index + 1) % len(switches)], delay=1 + index % 2)
+    topology.add_edge(switches[0], switches[6], delay=3)
+    topology.add_edge(switches[3], switches[9], delay=2)
+    model.topology = topology
+    yield topology
+    clear_observers()
+
+
+@pytest.fixture
+def component_module():
+    # Module of an EdgeSimPy component that finds paths with NetworkX (e.g., the one of User)
+    module = types.ModuleType("fake_component")
+    module.nx = nx
+    module.Component = type("Component", (), {"__module__": "fake_component"})
+    sys.modules["fake_component"] = module
+    yield module
+    del sys.modules["fake_component"]
+
+
+def test_routed_paths_match_networkx_and_are_cached(topology, component_module):
+    assert install_cached_routing([component_module.Component]) == ["fake_component"]
+    assert component_module.nx is ROUTED_NETWORKX
+
+    pairs = list(itertools.permutations(topology.nodes(), 2))
+    for _ in range(2):
+        for origin, target in pairs:
+            path = component_module.nx.shortest_path(G=topology, source=origin, target=target, weight="delay")
+            assert path == nx.shortest_path(G=topology, source=origin, target=target, weight="delay")
+
+    assert topology.path_cache.statistics()["misses"] == len(pairs)
+    assert topology.path_cache.statistics()["hits"] == len(pairs)
+
+
+def test_other_lookups_go_to_networkx(topology, component_module):
+    install_cached_routing([component_module.Component])
+    origin, target = list(topology.nodes())[0], list(topology.nodes())[5]
+
+    assert component_module.nx.shortest_path(G=topology, source=origin, target=target) == nx.shortest_path(
+        G=topology, source=origin, target=target
+    )
+    assert component_module.nx.shortest_path(topology.copy(), origin, target, "delay") == nx.shortest_path(
+        topology, origin, target, "delay"
+    )
+    assert component_module.nx.is_connected(topology)
+    assert not hasattr(topology, "path_cache")
+
+
+def test_routed_paths_use_the_delay_matrix(topology, component_module):
+    install_cached_routing([component_module.Component])
+    targets = [node for node in topology.nodes() if node.id in (1, 7)]
+    topology.delay_matrix = DelayMatrix.compute(topology=topology, targets=targets)
+    topology.delay_matrix.bind(topology)
+
+    for origin, target in itertools.product(topology.nodes(), targets):
+        path = component_module.nx.shortest_path(G=topology, source=origin, target=target, weight="delay")
+        assert path[0] is origin and path[-1] is target
+        assert nx.path_weight(topology, path, weight="delay") == nx.shortest_path_length(topology, origin, target, weight="delay")
+    assert not hasattr(topology, "path_cache")
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from espy_user_mobility.coordinates_trace import CoordinatesTrace, TraceSpill
+
+
+def random_walk(steps: int, seed: int = 0) -> list[tuple]:
+    generator = random.Random(seed)
+    return [(generator.randint(0, 200), generator.randint(0, 100)) for _ in range(steps)]
+
+
+def fill(trace: CoordinatesTrace, coordinates: list[tuple]):
+    # Mixes single appends (as "User.step" does) with batches (as the mobility engine does)
+    position = 0
+    while position < len(coordinates):
+        if position % 3 == 0:
+            trace.append(coordinates[position])
+            position += 1
+        else:
+            trace.extend(coordinates[position : position + 5])
+            position += 5
+
+
+def assert_same_entries(trace: CoordinatesTrace, expected: list[tuple], first_index: int = 0):
+    entries = list(trace)
+    assert entries == expected
+    assert [type(value) for entry in entries for value in entry] == [type(value) for entry in expected for value in entry]
+    assert [trace[index] for index in range(first_index, len(trace))] == expected
+    assert trace.tolist() == [list(entry) for entry in expected]
+
+
+def test_growing_trace_holds_every_entry():
+    coordinates = random_walk(100)
+    trace = CoordinatesTrace(coordinates[:2], capacity=4)
+    fill(trace, coordinates[2:])
+
+    assert len(trace) == len(coordinates)
+    assert_same_entries(trace, coordinates)
+    assert trace[-1] == coordinates[-1]
+    assert trace[10:20:3] == coordinates[10:20:3]
+
+
+def test_ring_buffer_keeps_the_latest_entries():
+    coordinates = random_walk(100)
+    trace = CoordinatesTrace(max_length=7)
+    fill(trace, coordinates)
+
+    assert len(trace) == len(coordinates)
+    assert_same_entries(trace, coordinates[-7:], first_index=len(coordinates) - 7)
+    assert trace[-1] == coordinates[-1]
+    with pytest.raises(IndexError):
+        trace[len(coordinates) - 8]
+
+
+def test_ring_buffer_extended_past_its_length():
+    coordinates = random_walk(20)
+    trace = CoordinatesTrace(max_length=5)
+    trace.extend(coordinates)
+
+    assert_same_entries(trace, coordinates[-5:], first_index=15)
+
+
+def test_spilled_trace_reads_back_every_entry(tmp_path):
+    spill = TraceSpill(str(tmp_path / "traces.bin"))
+    coordinates = random_walk(100)
+    other_coordinates = random_walk(50, seed=1)
+    trace = CoordinatesTrace(capacity=8, spill=spill)
+    other_trace = CoordinatesTrace(capacity=8, spill=spill)
+    fill(trace, coordinates)
+    fill(other_trace, other_coordinates)
+
+    assert len(trace.chunks) > 1
+    assert_same_entries(trace, coordinates)
+    assert_same_entries(other_trace, other_coordinates)
+
+    # Spilled entries remain readable once the run closes the file
+    spill.close()
+    assert_same_entries(trace, coordinates)
+
+
+def test_spill_and_ring_buffer_are_exclusive(tmp_path):
+    with pytest.raises(ValueError):
+        CoordinatesTrace(max_length=5, spill=TraceSpill(str(tmp_path / "traces.bin")))
+
+
+@pytest.mark.parametrize("mode", ["growing", "ring", "spill"])
+def test_entries_before_a_float_coordinate_remain_integers(mode, tmp_path):
+    keyword_arguments = {
+        "growing": {"capacity": 4},
+        "ring": {"max_length": 50},
+        "spill": {"capacity": 4, "spill": TraceSpill(str(tmp_path / "traces.bin"))},
+    }[mode]
+    coordinates = random_walk(20) + [(1.5, 2)] + random_walk(5, seed=1) + [(2.5, 3.0)]
+    trace = CoordinatesTrace(**keyword_arguments)
+    fill(trace, coordinates[:20])
+    trace.extend(coordinates[20:22])
+    fill(trace, coordinates[22:])
+
+    assert trace.buffer.dtype.kind == "f"
+    assert_same_entries(trace, [(x, y) if index < 20 else (float(x), float(y)) for index, (x, y) in enumerate(coordinates)])
+
+
+def test_coordinates_out_of_int16_range():
+    trace = CoordinatesTrace([(1, 2)])
+    trace.append((40_000, 3))
+
+    assert trace[1] == (40_000.0, 3.0)
+    assert trace[0] == (1, 2) and isinstance(trace[0][0], int)
@@ -0,0 +1,68 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility import delay_matrix as delay_matrix_module  # noqa: E402
+from espy_user_mobility.delay_matrix import DelayMatrix, load_or_compute_delay_matrix  # noqa: E402
+
+
+class Switch:
+    def __init__(self, id: int):
+        self.id = id
+
+    def __repr__(self) -> str:
+        return f"Switch_{self.id}"
+
+
+@pytest.fixture
+def topology() -> nx.Graph:
+    switches = [Switch(id) for id in range(1, 10)]
+    topology = nx.Graph()
+    for index, switch in enumerate(switches):
+        # Ring with a few shortcuts of different delays
+        topology.add_edge(switch, switches[(index + 1) % len(switches)], delay=1 + index % 3)
+    topology.add_edge(switches[0], switches[4], delay=2)
+    topology.add_edge(switches[2], switches[7], delay=1)
+    return topology
+
+
+@pytest.fixture
+def targets(topology: nx.Graph) -> list:
+    return [node for node in topology.nodes() if node.id in (1, 6)]
+
+
+def test_delays_and_paths_match_networkx(topology, targets):
+    delay_matrix = DelayMatrix.compute(topology=topology, targets=targets)
+
+    for target in targets:
+        for node in topology.nodes():
+            expected = nx.shortest_path_length(topology, node, target, weight="delay")
+            path = delay_matrix.path(origin_network_switch=node, target_network_switch=target)
+            assert delay_matrix.delay(origin_network_switch=node, target_network_switch=target) == expected
+            assert path[0] is node and path[-1] is target
+            assert nx.path_weight(topology, path, weight="delay") == expected
+
+
+def test_save_replaces_the_file_atomically(topology, targets, tmp_path):
+    file_path = tmp_path / "delays.npz"
+    delay_matrix = DelayMatrix.compute(topology=topology, targets=targets)
+    delay_matrix.save(str(file_path))
+
+    assert [path.name for path in tmp_path.iterdir()] == ["delays.npz"]
+    loaded = DelayMatrix.load(str(file_path))
+    assert np.array_equal(loaded.delays, delay_matrix.delays)
+    assert np.array_equal(loaded.next_hops, delay_matrix.next_hops)
+    assert loaded.bind(topology)
+
+
+def test_corrupt_file_is_recomputed(topology, targets, tmp_path, monkeypatch):
+    monkeypatch.setattr(delay_matrix_module, "server_network_switches", lambda: targets)
+    file_path = tmp_path / "delays.npz"
+    file_path.write_bytes(b"PK\x03\x04 truncated")
+
+    delay_matrix = load_or_compute_delay_matrix(topology=topology, file_path=str(file_path))
+
+    assert topology.delay_matrix is delay_matrix
+    assert np.array_equal(DelayMatrix.load(str(file_path)).delays, delay_matrix.delays)
@@ -0,0 +1,171 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from espy_user_mobility.distance_engine import DistanceEngine
+from espy_user_mobility.spatial_index import ServerSpatialIndex
+
+MAP_COORDINATES = [(0, 0), (30, 0), (0, 40), (30, 40)]
+
+
+def make_scenario(seed: int = 0, services: int = 12, servers: int = 9) -> tuple[list, list, list]:
+    generator = np.random.default_rng(seed)
+    users, scenario_services = [], []
+    for service_id in range(1, services + 1):
+        # Services of the last application have no users
+        application_users = []
+        for _ in range(int(generator.integers(0, 6)) if service_id < services else 0):
+            user = SimpleNamespace(id=len(users) + 1, coordinates=tuple(generator.integers(0, 30, size=2).tolist()))
+            users.append(user)
+            application_users.append(user)
+        scenario_services.append(SimpleNamespace(id=service_id, application=SimpleNamespace(users=application_users)))
+    edge_servers = [
+        SimpleNamespace(id=server_id, coordinates=tuple(generator.integers(0, 40, size=2).tolist()))
+        for server_id in range(1, servers + 1)
+    ]
+    return scenario_services, users, edge_servers
+
+
+def mean_distance(service: object, server: object) -> float:
+    users = service.application.users
+    if len(users) == 0:
+        return 0.0
+    return float(
+        np.mean(
+            [np.hypot(user.coordinates[0] - server.coordinates[0], user.coordinates[1] - server.coordinates[1]) for user in users]
+        )
+    )
+
+
+def test_distances_match_brute_force():
+    services, users, servers = make_scenario()
+    engine = DistanceEngine(services=services, users=users, servers=servers, map_coordinates=MAP_COORDINATES)
+
+    expected = np.array([[mean_distance(service, server) / 50 for server in servers] for service in services])
+    np.testing.assert_allclose(engine.service_server_distances(services), expected)
+    np.testing.assert_allclose(engine.service_server_distances(services[::-1]), expected[::-1])
+
+
+def test_distances_of_selected_columns():
+    services, users, servers = make_scenario()
+    engine = DistanceEngine(services=services, users=users, servers=servers, map_coordinates=MAP_COORDINATES)
+    columns = np.array([[(row + offset) % len(servers) for offset in (0, 4, 7)] for row in range(len(services))])
+
+    expected = np.take_along_axis(engine.service_server_distances(services), columns, axis=1)
+    np.testing.assert_allclose(engine.service_server_distances(services, columns=columns), expected)
+
+
+def test_distances_follow_user_movement():
+    services, users, servers = make_scenario()
+    engine = DistanceEngine(services=services, users=users, servers=servers, map_coordinates=MAP_COORDINATES)
+
+    users[0].coordinates = (29, 1)
+    engine._on_user_moved(users[0], "coordinates", users[0].coordinates, None)
+    expected = np.array([[mean_distance(service, server) / 50 for server in servers] for service in services])
+    np.testing.assert_allclose(engine.service_server_distances(services), expected)
+
+
+def test_calibration_reproduces_scaled_reference():
+    services, users, servers = make_scenario()
+    engine = DistanceEngine(services=services, users=users, servers=servers, map_coordinates=MAP_COORDINATES)
+
+    assert engine.calibrate(services, lambda service, server: mean_distance(service, server) / 7)
+    expected = np.array([[mean_distance(service, server) / 7 for server in servers] for service in services])
+    np.testing.assert_allclose(engine.service_server_distances(services), expected)
+
+
+def test_calibration_rejects_other_metrics():
+    services, users, servers = make_scenario()
+    engine = DistanceEngine(services=services, users=users, servers=servers, map_coordinates=MAP_COORDINATES)
+
+    def max_distance(service, server):
+        return max(
+            (np.hypot(*np.subtract(user.coordinates, server.coordinates)) for user in service.application.users), default=0.0
+        )
+
+    assert not engine.calibrate(services, max_distance)
+    assert engine.scale == 1 / 50
+
+
+def full_ranking(engine: DistanceEngine, service: object, predicate) -> tuple[object | None, float]:
+    distances = engine.service_server_distances([service])[0]
+    for column in np.argsort(distances, kind="stable"):
+        if predicate(engine.servers[column]):
+            return engine.servers[column], float(distances[column])
+    return None, float("inf")
+
+
+@pytest.mark.parametrize("k", [1, 3, 8, 200])
+@pytest.mark.parametrize("seed", range(5))
+def test_closest_server_matches_full_ranking(k, seed):
+    services, users, servers = make_scenario(seed=seed, services=40, servers=150)
+    engine = DistanceEngine(services=services, users=users, servers=servers, map_coordinates=MAP_COORDINATES)
+    spatial_index = ServerSpatialIndex(servers=servers, cell_size=4)
+    generator = np.random.default_rng(seed)
+    available = set(generator.choice([server.id for server in servers], size=100, replace=False).tolist())
+
+    def predicate(server):
+        return server.id in available
+
+    for service in services:
+        server, distance = engine.closest_server(service, spatial_index=spatial_index, k=k, predicate=predicate)
+        expected_server, expected_distance = full_ranking(engine, service, predicate)
+        assert server is expected_server
+        assert distance == pytest.approx(expected_distance)
+
+
+def test_closest_server_without_candidates():
+    services, users, servers = make_scenario()
+    engine = DistanceEngine(services=services, users=users, servers=servers, map_coordinates=MAP_COORDINATES)
+    spatial_index = ServerSpatialIndex(servers=servers)
+
+    assert engine.closest_server(services[0], spatial_index=spatial_index, k=4, predicate=lambda server: False) == (
+        None,
+        float("inf"),
+    )
+
+
+@pytest.fixture
+def espy_components():
+    pytest.importorskip("EdgeSimPy")
+    from EdgeSimPy import edge_sim_py as espy
+
+    component_classes = (espy.User, espy.Application, espy.Service, espy.EdgeServer)
+    for component_class in component_classes:
+        component_class._instances, component_class._object_count = [], 0
+    yield espy
+    for component_class in component_classes:
+        component_class._instances, component_class._object_count = [], 0
+
+
+def test_calibrated_distances_match_edgesimpy(espy_components):
+    espy = espy_components
+    generator = np.random.default_rng(0)
+    for _ in range(4):
+        application = espy.Application()
+        for _ in range(3):
+            user = espy.User()
+            user.coordinates = tuple(generator.integers(0, 20, size=2).tolist())
+            user.applications.append(application)
+            application.users.append(user)
+        application.connect_to_service(espy.Service(cpu_demand=1, memory_demand=1))
+    for _ in range(5):
+        server = espy.EdgeServer()
+        server.coordinates = tuple(generator.integers(0, 20, size=2).tolist())
+
+    engine = DistanceEngine(
+        services=espy.Service.all(),
+        users=espy.User.all(),
+        servers=espy.EdgeServer.all(),
+        map_coordinates=[(0, 0), (20, 20)],
+    )
+    assert engine.calibrate(espy.Service.all(), lambda service, server: service.distance_from_edge_server_to_users(server))
+
+    expected = np.array(
+        [
+            [service.distance_from_edge_server_to_users(server) for server in espy.EdgeServer.all()]
+            for service in espy.Service.all()
+        ]
+    )
+    np.testing.assert_allclose(engine.service_server_distances(espy.Service.all()), expected)
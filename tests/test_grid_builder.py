@@ -0,0 +1,46 @@
+import itertools
+
+import numpy as np
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility.grid_builder import hexagonal_neighbor_pairs  # noqa: E402
+
+
+def hexagonal_grid(x_size: int, y_size: int) -> list[tuple]:
+    # Same doubled-column layout as "create_grid": odd rows are shifted by one
+    return [(2 * column + (row % 2), row) for row in range(y_size) for column in range(x_size)]
+
+
+def brute_force_neighbor_pairs(coordinates: list[tuple]) -> list[tuple]:
+    pairs = []
+    for (row, (x, y)), (neighbor_row, (neighbor_x, neighbor_y)) in itertools.combinations(enumerate(coordinates), 2):
+        x_distance, y_distance = abs(x - neighbor_x), abs(y - neighbor_y)
+        if (x_distance, y_distance) in ((2, 0), (1, 1)):
+            pairs.append((row, neighbor_row))
+    return sorted(pairs)
+
+
+@pytest.mark.parametrize("x_size, y_size", [(1, 1), (1, 5), (5, 1), (2, 2), (6, 7), (10, 10)])
+def test_neighbor_pairs_match_brute_force(x_size, y_size):
+    coordinates = hexagonal_grid(x_size, y_size)
+    pairs = hexagonal_neighbor_pairs(coordinates)
+
+    assert pairs.shape[1] == 2
+    assert [tuple(pair) for pair in pairs.tolist()] == brute_force_neighbor_pairs(coordinates)
+
+
+def test_neighbor_pairs_of_irregular_grid():
+    # Cells are shuffled, some are missing and the grid does not start at the origin
+    generator = np.random.default_rng(0)
+    coordinates = [(x + 7, y - 3) for x, y in hexagonal_grid(12, 9)]
+    coordinates = [coordinates[row] for row in generator.permutation(len(coordinates)) if generator.random() > 0.2]
+
+    pairs = hexagonal_neighbor_pairs(coordinates)
+
+    assert [tuple(pair) for pair in pairs.tolist()] == brute_force_neighbor_pairs(coordinates)
+
+
+def test_neighbor_pairs_of_empty_grid():
+    assert hexagonal_neighbor_pairs([]).shape == (0, 2)
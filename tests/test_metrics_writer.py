@@ -0,0 +1,82 @@
+import pytest
+
+from espy_user_mobility.metrics_writer import ColumnarMetricsWriter, ColumnBuffer
+
+
+def test_column_buffer_grows_from_a_small_allocation():
+    column = ColumnBuffer(capacity=2)
+    for value in range(100):
+        column.append(value)
+
+    assert column.size == 100
+    assert 100 <= len(column.values) < 200
+    assert column.values[:100].tolist() == list(range(100))
+    assert not column.mask[:100].any()
+
+
+def test_column_buffer_pads_and_widens_after_growing():
+    column = ColumnBuffer(capacity=2, missing_rows=3)
+    column.append(True)
+    column.pad(10)
+    column.append(1.5)
+    column.append("text")
+
+    assert column.size == 12
+    assert column.mask[:12].tolist() == [True] * 3 + [False] + [True] * 6 + [False, False]
+    # Each value keeps the text logged by the CSV files, even after the column went through the float kind
+    assert column.values[3] == "True" and column.values[10] == "1.5" and column.values[11] == "text"
+
+
+def test_writer_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    writer = ColumnarMetricsWriter(logs_directory=str(tmp_path), logs_format="parquet", batch_rows=2_500)
+    records = [{"Time Step": step, "Instance ID": 1, "Load": step / 2} for step in range(3_000)]
+    records[1_500]["Extra"] = "late column"
+    writer.add_records("Server", records)
+    writer.flush()
+
+    table = pq.read_table(tmp_path / "Server.parquet")
+    assert table.num_rows == 3_000
+    assert table.column("Load").to_pylist() == [step / 2 for step in range(3_000)]
+    extra = table.column("Extra").to_pylist()
+    assert extra[1_500] == "late column" and extra.count(None) == 2_999
+
+
+def test_column_buffer_widens_each_value_from_its_own_kind():
+    column = ColumnBuffer()
+    for value in [False, 3, 2.5, [1, 2]]:
+        column.append(value)
+
+    assert column.values[:4].tolist() == ["False", "3", "2.5", "[1, 2]"]
+
+
+@pytest.mark.parametrize("logs_format", ["parquet", "arrow"])
+def test_part_files_share_one_schema(tmp_path, logs_format):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+
+    writer = ColumnarMetricsWriter(logs_directory=str(tmp_path), logs_format=logs_format, batch_rows=2)
+    records = [
+        {"Time Step": 0, "Delay": None, "Load": 1, "Online": True},
+        {"Time Step": 1, "Delay": None, "Load": 2, "Online": False},
+        {"Time Step": 2, "Delay": 1.5, "Load": 2.5, "Online": True},
+        {"Time Step": 3, "Delay": None, "Load": 4},
+        {"Time Step": 4, "Delay": 2.0, "Load": 5, "Online": "unknown", "Late": 7},
+    ]
+    writer.add_records("Server", records)
+    writer.flush()
+
+    directory = tmp_path / f"Server.{logs_format}"
+    parts = sorted(directory.iterdir())
+    assert len(parts) == 3
+    dataset_format = "parquet" if logs_format == "parquet" else "feather"
+    schemas = [ds.dataset(part, format=dataset_format).schema for part in parts]
+    assert all(schema.equals(schemas[0]) for schema in schemas)
+    assert schemas[0].field("Delay").type == pa.float64() and schemas[0].field("Load").type == pa.float64()
+
+    table = ds.dataset(directory, format=dataset_format).to_table()
+    assert table.column("Time Step").to_pylist() == [0, 1, 2, 3, 4]
+    assert table.column("Delay").to_pylist() == [None, None, 1.5, None, 2.0]
+    assert table.column("Load").to_pylist() == [1.0, 2.0, 2.5, 4.0, 5.0]
+    assert table.column("Online").to_pylist() == ["True", "False", "True", None, "unknown"]
+    assert table.column("Late").to_pylist() == [None, None, None, None, 7]
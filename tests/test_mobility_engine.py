@@ -0,0 +1,183 @@
+from math import dist
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from EdgeSimPy import edge_sim_py as espy  # noqa: E402
+from EdgeSimPy.edge_sim_py.components.point_of_interest import DAY_START_IN_MINUTES  # noqa: E402
+
+from espy_user_mobility import rng  # noqa: E402
+from espy_user_mobility.coordinates_trace import CoordinatesTrace  # noqa: E402
+from espy_user_mobility.mobility_engine import NO_TARGET, MobilityEngine, install_mobility_engine  # noqa: E402
+
+GRID_SIZE = 8
+COMPARED_STEPS = 40
+
+
+def hexagonal_grid(x_size: int, y_size: int) -> list[tuple]:
+    # Same doubled-column layout as "create_grid": odd rows are shifted by one
+    return [(2 * column + (row % 2), row) for row in range(y_size) for column in range(x_size)]
+
+
+def make_engine(chance: float, peak_end: float, users: int = 6, batch_steps: int = 10) -> MobilityEngine:
+    rng.seed(0)
+    grid = hexagonal_grid(GRID_SIZE, GRID_SIZE)
+    points_of_interest = [SimpleNamespace(id=1, coordinates=grid[-1], peak_start=DAY_START_IN_MINUTES, peak_end=peak_end)]
+    engine_users = [
+        SimpleNamespace(
+            id=row + 1,
+            coordinates_trace=[grid[row * 7 % len(grid)]] * 2,
+            movement_distance=0.3 + 0.1 * row,
+            chance_of_becoming_interested=chance,
+        )
+        for row in range(users)
+    ]
+    return MobilityEngine(engine_users, points_of_interest, base_station_coordinates=grid, batch_steps=batch_steps)
+
+
+def test_snap_to_hexagonal_grid():
+    engine = make_engine(chance=0, peak_end=DAY_START_IN_MINUTES + 60, users=3)
+    engine.cells = np.array([[4, 4], [4, 4], [4, 4]])
+
+    snapped = engine.snap(np.array([[3.4, 2.2], [6.9, 0.6], [100.0, 3.0]]))
+    # (3.4, 2.2) is on an even row (even x), (6.9, 0.6) on an odd row (odd x) and (100, 3) is outside the grid
+    np.testing.assert_array_equal(snapped, [[4, 2], [7, 1], [4, 4]])
+
+
+def test_interested_users_walk_to_the_point_of_interest_and_stay():
+    engine = make_engine(chance=100, peak_end=DAY_START_IN_MINUTES + 1000)
+    destination = engine.poi_coordinates[0]
+
+    for step in range(COMPARED_STEPS * 3):
+        previous = engine.positions.copy()
+        engine.advance(step)
+        assert (engine.targets == 0).all()
+        moved = np.hypot(*(engine.positions - previous).T)
+        assert (moved <= engine.speeds + 1e-9).all()
+        assert (np.hypot(*(engine.positions - destination).T) <= np.hypot(*(previous - destination).T) + 1e-9).all()
+
+    np.testing.assert_allclose(engine.positions, np.tile(destination, (len(engine.users), 1)))
+    np.testing.assert_array_equal(engine.cells, np.tile(destination, (len(engine.users), 1)))
+
+
+def test_users_lose_interest_when_the_peak_ends():
+    engine = make_engine(chance=100, peak_end=DAY_START_IN_MINUTES + 5)
+    for step in range(5):
+        engine.advance(step)
+    assert (engine.targets == 0).all()
+
+    engine.advance(5)
+    positions = engine.positions.copy()
+    assert (engine.targets == NO_TARGET).all()
+    for step in range(6, 20):
+        engine.advance(step)
+    np.testing.assert_array_equal(engine.positions, positions)
+
+
+def test_uninterested_users_do_not_move():
+    engine = make_engine(chance=0, peak_end=DAY_START_IN_MINUTES + 1000)
+    cells = engine.cells.copy()
+    for step in range(20):
+        engine.advance(step)
+    assert (engine.targets == NO_TARGET).all()
+    np.testing.assert_array_equal(engine.cells, cells)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_traces_are_extended_a_batch_at_a_time(compact):
+    engine = make_engine(chance=100, peak_end=DAY_START_IN_MINUTES + 1000, batch_steps=10)
+    if compact:
+        for user in engine.users:
+            user.coordinates_trace = CoordinatesTrace(user.coordinates_trace)
+
+    for user in engine.users:
+        engine.point_of_interest_mobility(user)
+        assert len(user.coordinates_trace) == 12
+    assert engine.batch_start == 2
+
+    # A user that catches up with the batch triggers the next batch (for every user)
+    engine.point_of_interest_mobility(engine.users[0])
+    assert len(engine.users[0].coordinates_trace) == 22
+    assert engine.batch_start == 12
+    assert all(isinstance(coordinates, tuple) for coordinates in engine.users[0].coordinates_trace)
+    assert dist(engine.users[0].coordinates_trace[-1], engine.poi_coordinates[0]) < dist(
+        engine.users[0].coordinates_trace[0], engine.poi_coordinates[0]
+    )
+
+
+def reset_components():
+    for component_class in espy.ComponentManager.__subclasses__():
+        component_class._instances, component_class._object_count = [], 0
+
+
+def export_mobility_scenario(chance: float, peak_end: float) -> dict:
+    from espy_user_mobility.custom_serialization import user_to_dict
+    from espy_user_mobility.grid_builder import build_base_stations, build_hexagonal_mesh
+
+    reset_components()
+    grid = hexagonal_grid(GRID_SIZE, GRID_SIZE)
+    build_base_stations(grid, wireless_delay=0)
+    build_hexagonal_mesh(espy.NetworkSwitch.all(), delay=1, bandwidth=10)
+
+    poi = espy.PointOfInterest()
+    poi.coordinates = grid[-1]
+    poi.peak_start = DAY_START_IN_MINUTES
+    poi.peak_end = peak_end
+    poi.name = "POI_AA"
+
+    for row in range(6):
+        user = espy.User()
+        user.mobility_model = espy.point_of_interest_mobility
+        user.chance_of_becoming_interested = chance
+        user.movement_distance = 0.3 + 0.1 * row
+        user._set_initial_position(coordinates=grid[row * 7 % len(grid)], number_of_replicates=2)
+
+    espy.User._to_dict = user_to_dict
+    return espy.ComponentManager.export_scenario(save_to_file=False)
+
+
+def simulate_traces(scenario: dict, batched: bool, logs_directory: str) -> dict:
+    reset_components()
+    simulator = espy.Simulator(
+        dump_interval=-1,
+        tick_duration=1,
+        tick_unit="minutes",
+        stopping_criterion=lambda model: model.schedule.steps >= COMPARED_STEPS,
+        resource_management_algorithm=lambda parameters: None,
+        logs_directory=logs_directory,
+    )
+    rng.seed(0)
+    rng.seed_global_generators("mobility")
+    simulator.initialize(input_file=scenario)
+    if batched:
+        install_mobility_engine(
+            users=espy.User.all(), points_of_interest=espy.PointOfInterest.all(), base_stations=espy.BaseStation.all()
+        )
+    simulator.run_model()
+    return {user.id: [tuple(coordinates) for coordinates in user.coordinates_trace[:COMPARED_STEPS]] for user in espy.User.all()}
+
+
+@pytest.mark.parametrize(
+    "chance, peak_end",
+    [
+        (100, DAY_START_IN_MINUTES + 1000),  # Every user walks to the point of interest and stays there
+        (100, DAY_START_IN_MINUTES + 10),  # Users stop when the peak ends
+        (0, DAY_START_IN_MINUTES + 1000),  # Users never become interested
+    ],
+)
+def test_traces_match_per_user_model(tmp_path, chance, peak_end):
+    # The interest draws of the two models come from different generators, so the traces are compared in the scenarios
+    # where they are decided by the chance alone (a single point of interest, always or never chosen)
+    if not hasattr(espy, "point_of_interest_mobility"):
+        pytest.skip("EdgeSimPy fork with point_of_interest_mobility required")
+    scenario = export_mobility_scenario(chance=chance, peak_end=peak_end)
+    try:
+        per_user = simulate_traces(scenario, batched=False, logs_directory=str(tmp_path / "per_user"))
+        batched = simulate_traces(scenario, batched=True, logs_directory=str(tmp_path / "batched"))
+    finally:
+        reset_components()
+
+    assert batched == per_user
@@ -0,0 +1,117 @@
+import itertools
+
+import networkx as nx
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility.observers import clear_observers  # noqa: E402
+from espy_user_mobility.path_cache import PathCache  # noqa: E402
+from espy_user_mobility.path_invalidation import watch_topology_changes  # noqa: E402
+
+
+class Switch:
+    def __init__(self, id: int):
+        self.id = id
+
+    def __repr__(self) -> str:
+        return f"Switch_{self.id}"
+
+
+class Link(dict):
+    # Attributes are stored as items, as in EdgeSimPy's NetworkLink (the items are the edge data read by NetworkX)
+    def __getattr__(self, attribute_name):
+        try:
+            return self[attribute_name]
+        except KeyError:
+            raise AttributeError(attribute_name) from None
+
+    def __setattr__(self, attribute_name, attribute_value):
+        self[attribute_name] = attribute_value
+
+
+@pytest.fixture
+def topology():
+    switches = [Switch(id) for id in range(1, 10)]
+    topology = nx.Graph()
+    edges = [(index, (index + 1) % len(switches), 2 + index % 3) for index in range(len(switches))] + [(0, 4, 5), (2, 7, 4)]
+    for node, neighbor, delay in edges:
+        link = Link()
+        link.topology, link.nodes, link.delay, link.bandwidth = topology, [switches[node], switches[neighbor]], delay, 10
+        topology.add_edge(switches[node], switches[neighbor])
+        topology._adj[switches[node]][switches[neighbor]] = link
+        topology._adj[switches[neighbor]][switches[node]] = link
+    topology.path_cache = PathCache()
+    watch_topology_changes(topology=topology, link_class=Link)
+    yield topology
+    clear_observers()
+
+
+def fill_cache(topology: nx.Graph):
+    for origin, target in itertools.permutations(topology.nodes(), 2):
+        delay, path = nx.bidirectional_dijkstra(topology, origin, target, weight="delay")
+        topology.path_cache.put(origin_network_switch=origin, target_network_switch=target, path=path, delay=delay)
+
+
+def assert_cached_paths_are_shortest(topology: nx.Graph):
+    nodes = {node.id: node for node in topology.nodes()}
+    for origin_id, target_id in list(topology.path_cache.entries):
+        path = topology.path_cache.get(origin_network_switch=nodes[origin_id], target_network_switch=nodes[target_id])
+        assert nx.path_weight(topology, path, weight="delay") == nx.shortest_path_length(
+            topology, nodes[origin_id], nodes[target_id], weight="delay"
+        )
+
+
+def link_between(topology: nx.Graph, node_id: int, neighbor_id: int) -> Link:
+    nodes = {node.id: node for node in topology.nodes()}
+    return topology[nodes[node_id]][nodes[neighbor_id]]
+
+
+@pytest.mark.parametrize("item_write", [False, True])
+@pytest.mark.parametrize("delay", [1, 9])
+def test_delay_changes_only_drop_affected_paths(topology, item_write, delay):
+    fill_cache(topology)
+    cached = len(topology.path_cache)
+
+    link = link_between(topology, 3, 4)
+    if item_write:
+        link["delay"] = delay
+    else:
+        link.delay = delay
+
+    assert 0 < len(topology.path_cache) < cached
+    assert_cached_paths_are_shortest(topology)
+
+
+def test_bandwidth_changes_drop_paths_through_the_link(topology):
+    fill_cache(topology)
+    through_link = set(topology.path_cache.keys_through_link(node_id=3, neighbor_id=4))
+    assert len(through_link) > 0
+
+    link_between(topology, 3, 4)["bandwidth"] = 1
+    assert through_link.isdisjoint(topology.path_cache.entries)
+    assert len(topology.path_cache) == len(list(itertools.permutations(topology.nodes(), 2))) - len(through_link)
+
+
+def test_unchanged_values_keep_the_cache(topology):
+    fill_cache(topology)
+    cached = len(topology.path_cache)
+
+    link = link_between(topology, 3, 4)
+    link.delay = link.delay
+    link["bandwidth"] = link["bandwidth"]
+    assert len(topology.path_cache) == cached
+
+
+def test_equally_short_paths_are_dropped(topology):
+    fill_cache(topology)
+    nodes = {node.id: node for node in topology.nodes()}
+    delay, _ = nx.bidirectional_dijkstra(topology, nodes[1], nodes[6], weight="delay")
+    link = Link()
+    link.topology, link.nodes, link.delay, link.bandwidth = topology, [nodes[1], nodes[6]], delay, 10
+    topology.add_edge(nodes[1], nodes[6])
+    topology._adj[nodes[1]][nodes[6]] = topology._adj[nodes[6]][nodes[1]] = link
+
+    topology.path_invalidator.on_link_added(topology=topology, link=link)
+    assert (1, 6) not in topology.path_cache
+    assert_cached_paths_are_shortest(topology)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from EdgeSimPy.edge_sim_py.components.point_of_interest import DAY_END_IN_MINUTES, DAY_START_IN_MINUTES  # noqa: E402
+
+from espy_user_mobility.peak_timeline import PEAK_METRIC, PeakTimeline, install_peak_timeline  # noqa: E402
+
+DAY_IN_MINUTES = DAY_END_IN_MINUTES - DAY_START_IN_MINUTES
+
+
+class PointOfInterest:
+    _instances = []
+
+    def __init__(self, id: int, peak_start: int, peak_end: int):
+        self.id, self.peak_start, self.peak_end = id, peak_start, peak_end
+        self.coordinates = (id, id)
+        PointOfInterest._instances.append(self)
+
+    @classmethod
+    def all(cls) -> list:
+        return cls._instances
+
+    def collect(self) -> dict:
+        return {"Instance ID": self.id, "Coordinates": self.coordinates, PEAK_METRIC: None}
+
+
+class Schedule:
+    steps = 0
+
+
+class Simulator:
+    def __init__(self):
+        self.schedule = Schedule()
+        self.metrics = []
+
+    def monitor(self):
+        self.metrics.append([poi.collect() for poi in PointOfInterest.all()])
+
+
+@pytest.fixture
+def points_of_interest() -> list:
+    generator = np.random.default_rng(0)
+    PointOfInterest._instances = []
+    for id in range(1, 21):
+        peak_start = int(generator.integers(DAY_START_IN_MINUTES, DAY_END_IN_MINUTES - 60))
+        PointOfInterest(id, peak_start, peak_start + int(generator.integers(1, 240)))
+    # Peaks starting when another one ends and peaks reaching the end of the day
+    PointOfInterest(21, DAY_START_IN_MINUTES, DAY_START_IN_MINUTES + 30)
+    PointOfInterest(22, DAY_START_IN_MINUTES + 30, DAY_END_IN_MINUTES)
+    return PointOfInterest.all()
+
+
+def in_peak(point_of_interest: PointOfInterest, step: int, minutes_per_step: int) -> bool:
+    minute = step * minutes_per_step % DAY_IN_MINUTES + DAY_START_IN_MINUTES
+    return point_of_interest.peak_start <= minute < point_of_interest.peak_end
+
+
+@pytest.mark.parametrize("minutes_per_step", [1, 7])
+def test_timeline_matches_peak_windows(points_of_interest, minutes_per_step):
+    timeline = PeakTimeline(points_of_interest, minutes_per_step=minutes_per_step)
+
+    for step in range(0, 2 * DAY_IN_MINUTES // minutes_per_step + 3):
+        timeline.advance(step)
+        expected = [in_peak(poi, step, minutes_per_step) for poi in points_of_interest]
+        assert [timeline.is_active(poi) for poi in points_of_interest] == expected
+        assert timeline.active_rows.tolist() == np.flatnonzero(expected).tolist()
+
+
+def test_sample_only_draws_points_of_interest_in_peak(points_of_interest):
+    timeline = PeakTimeline(points_of_interest, weights=range(1, len(points_of_interest) + 1))
+    timeline.advance(DAY_IN_MINUTES // 2)
+
+    rows = timeline.sample(np.random.default_rng(0), size=1_000)
+
+    assert len(timeline.active_rows) > 0
+    assert set(rows.tolist()) <= set(timeline.active_rows.tolist())
+
+
+def test_installed_timeline_advances_once_per_step(points_of_interest, monkeypatch):
+    simulator = Simulator()
+    monkeypatch.setattr(PointOfInterest, "collect", PointOfInterest.collect)
+    timeline = install_peak_timeline(simulator, PointOfInterest)
+    advances = []
+    advance = timeline.advance
+    monkeypatch.setattr(timeline, "advance", lambda step: advances.append(step) or advance(step))
+
+    for step in range(1, 100):
+        simulator.schedule.steps = step
+        simulator.monitor()
+
+    assert advances == list(range(1, 100))
+    for step, metrics in enumerate(simulator.metrics, 1):
+        assert [list(record) for record in metrics] == [["Instance ID", "Coordinates", PEAK_METRIC]] * len(metrics)
+        assert [record[PEAK_METRIC] for record in metrics] == [in_peak(poi, step, 1) for poi in points_of_interest]
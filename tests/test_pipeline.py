@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility.pipeline import Stage, prune_checkpoints, run_pipeline  # noqa: E402
+
+
+def _first_stage(context: dict):
+    context["first"] = context.get("first", 0) + 1
+
+
+def _second_stage(context: dict):
+    context["second"] = context["first"] * 10
+
+
+STAGES = [Stage("first", _first_stage, parameters=("size",)), Stage("second", _second_stage, parameters=("scale",))]
+
+
+def checkpoint_files(directory) -> list[str]:
+    return sorted(os.listdir(directory))
+
+
+def test_prune_keeps_the_most_recently_used_checkpoints(tmp_path):
+    for age, key in enumerate(["c", "b", "a"]):
+        file_path = tmp_path / f"00-grid-{key}.pkl"
+        file_path.write_bytes(b"")
+        os.utime(file_path, (1_000_000 - age * 1_000, 1_000_000 - age * 1_000))
+    (tmp_path / "01-topology-a.pkl").write_bytes(b"")
+
+    prune_checkpoints(str(tmp_path / "00-grid-a.pkl"), kept=2)
+
+    assert checkpoint_files(tmp_path) == ["00-grid-a.pkl", "00-grid-c.pkl", "01-topology-a.pkl"]
+
+
+def test_checkpoints_are_bounded_per_stage(tmp_path):
+    for size in range(4):
+        context, reports = run_pipeline({"size": size, "scale": 1}, stages=STAGES, checkpoint_directory=str(tmp_path))
+        assert context == {"first": 1, "second": 10}
+        assert [report["status"] for report in reports] == ["built", "built"]
+
+    files = checkpoint_files(tmp_path)
+    assert len(files) == 4
+    assert sum(file_name.startswith("00-first-") for file_name in files) == 2
+
+
+def test_resumes_from_the_latest_checkpoint(tmp_path):
+    run_pipeline({"size": 1, "scale": 1}, stages=STAGES, checkpoint_directory=str(tmp_path))
+
+    context, reports = run_pipeline({"size": 1, "scale": 2}, stages=STAGES, checkpoint_directory=str(tmp_path))
+
+    assert context == {"first": 1, "second": 10}
+    assert [report["status"] for report in reports] == ["restored", "built"]
+
+
+def test_checkpoint_failures_propagate(tmp_path):
+    def unpicklable_stage(context: dict):
+        context["callback"] = lambda: None
+
+    with pytest.raises(Exception):
+        run_pipeline({}, stages=[Stage("unpicklable", unpicklable_stage)], checkpoint_directory=str(tmp_path))
+    assert checkpoint_files(tmp_path) == []
+
+
+@pytest.mark.parametrize("trace_memory", [False, True])
+def test_reports_the_memory_of_each_stage(trace_memory):
+    import tracemalloc
+
+    import numpy as np
+
+    def allocating_stage(context: dict):
+        context["buffer"] = np.ones(2**23)  # 64 MiB
+
+    context, reports = run_pipeline(
+        {}, stages=[Stage("allocating", allocating_stage)], checkpoint_directory=None, trace_memory=trace_memory
+    )
+
+    assert reports[0]["rss_delta_mb"] > 32
+    assert ("allocated_mb" in reports[0]) == trace_memory
+    if trace_memory:
+        assert reports[0]["allocated_mb"] > 32
+    assert not tracemalloc.is_tracing()
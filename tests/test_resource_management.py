@@ -0,0 +1,168 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility import simulate  # noqa: E402
+from espy_user_mobility.observers import clear_observers  # noqa: E402
+
+MAP_SIZE = 20
+STEPS = 12
+
+
+def make_components(seed: int) -> SimpleNamespace:
+    """Creates a small scenario with the parts of EdgeSimPy's components used by the resource management algorithm
+    (provisioning is instantaneous and migrations are recent for MIGRATION_RECENCY_THRESHOLD steps)."""
+    generator = np.random.default_rng(seed)
+    topology = SimpleNamespace(model=SimpleNamespace(schedule=SimpleNamespace(steps=0)))
+    placements = []
+
+    class Component:
+        _instances: list = []
+
+        @classmethod
+        def all(cls) -> list:
+            return cls._instances
+
+    class Topology(Component):
+        @classmethod
+        def first(cls) -> object:
+            return topology
+
+    class BaseStation(Component):
+        _instances = [SimpleNamespace(id=1, coordinates=(0, 0)), SimpleNamespace(id=2, coordinates=(MAP_SIZE, MAP_SIZE))]
+
+    class EdgeServer(Component):
+        _instances = []
+
+        def __init__(self, coordinates: tuple, cpu: int):
+            self.id = len(EdgeServer._instances) + 1
+            self.coordinates = coordinates
+            self.cpu, self.memory, self.disk = cpu, cpu * 1024, 0
+            self.cpu_demand, self.memory_demand, self.disk_demand = 0, 0, 0
+            EdgeServer._instances.append(self)
+
+        def has_capacity_to_host(self, service: object) -> bool:
+            return self.cpu - self.cpu_demand >= service.cpu_demand and self.memory - self.memory_demand >= service.memory_demand
+
+        def _get_disk_demand_delta(self, service: object) -> int:
+            return 0
+
+    class User(Component):
+        _instances = []
+
+        def __init__(self, coordinates: tuple, application: object):
+            self.id = len(User._instances) + 1
+            self.coordinates = coordinates
+            self.applications = [application]
+            User._instances.append(self)
+
+    class Service(Component):
+        _instances = []
+
+        def __init__(self):
+            self.id = len(Service._instances) + 1
+            self.application = SimpleNamespace(users=[], services=[self])
+            self.cpu_demand, self.memory_demand, self.disk_demand = 1, 1024, 0
+            self.server, self.being_provisioned, self.migrated_at = None, False, None
+            Service._instances.append(self)
+
+        def distance_from_edge_server_to_users(self, server: object) -> float:
+            if len(self.application.users) == 0:
+                return 0.0
+            distances = [np.hypot(*np.subtract(user.coordinates, server.coordinates)) for user in self.application.users]
+            return float(np.mean(distances)) / MAP_SIZE
+
+        @property
+        def total_dist_from_users(self) -> float:
+            return self.distance_from_edge_server_to_users(self.server)
+
+        def was_recently_migrated(self, threshold: int) -> bool:
+            return self.migrated_at is not None and topology.model.schedule.steps - self.migrated_at < threshold
+
+        def provision(self, target_server: object):
+            if self.server is not None:
+                self.server.cpu_demand -= self.cpu_demand
+                self.server.memory_demand -= self.memory_demand
+            target_server.cpu_demand += self.cpu_demand
+            target_server.memory_demand += self.memory_demand
+            self.server, self.migrated_at = target_server, topology.model.schedule.steps
+            placements.append((topology.model.schedule.steps, self.id, target_server.id))
+
+    for _ in range(12):
+        EdgeServer(coordinates=tuple(generator.uniform(0, MAP_SIZE, size=2).tolist()), cpu=int(generator.integers(2, 6)))
+    for _ in range(24):
+        service = Service()
+        for _ in range(int(generator.integers(0, 4))):
+            service.application.users.append(
+                User(coordinates=tuple(generator.uniform(0, MAP_SIZE, size=2).tolist()), application=service.application)
+            )
+    moves = generator.uniform(-5, 5, size=(STEPS, len(User._instances), 2))
+
+    espy = SimpleNamespace(Topology=Topology, BaseStation=BaseStation, EdgeServer=EdgeServer, User=User, Service=Service)
+    return SimpleNamespace(espy=espy, topology=topology, moves=moves, placements=placements)
+
+
+def baseline_resource_management_algorithm(espy: SimpleNamespace):
+    # Placement loop before the capacity index, change tracking and distance engine
+    service: object
+    for service in espy.Service.all():
+        # Initial allocation
+        edge_servers = espy.EdgeServer.all()
+        edge_servers = [server for server in edge_servers if server.has_capacity_to_host(service)]
+        edge_servers.sort(reverse=False, key=lambda server: service.distance_from_edge_server_to_users(server))
+        if service.server is None and not service.being_provisioned:
+            for edge_server in edge_servers:
+                if edge_server.has_capacity_to_host(service=service):
+                    service.provision(target_server=edge_server)
+                    break
+        # Reallocation
+        elif (
+            service.server is not None
+            and not service.was_recently_migrated(simulate.MIGRATION_RECENCY_THRESHOLD)
+            and service.total_dist_from_users > simulate.DISTANCE_THRESHOLD
+        ):
+            for edge_server in edge_servers:
+                if (
+                    edge_server.has_capacity_to_host(service=service)
+                    and service.distance_from_edge_server_to_users(edge_server) < service.total_dist_from_users
+                ):
+                    service.provision(target_server=edge_server)
+                    break
+
+
+def simulate_placements(seed: int, algorithm) -> list[tuple]:
+    components = make_components(seed)
+    try:
+        for step in range(STEPS):
+            components.topology.model.schedule.steps = step
+            for user, move in zip(components.espy.User.all(), components.moves[step]):
+                user.coordinates = tuple(np.clip(np.add(user.coordinates, move), 0, MAP_SIZE).tolist())
+            algorithm(components.espy)
+    finally:
+        clear_observers()
+    return components.placements
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize(
+    "vectorized, candidate_servers, change_tracking",
+    [(False, None, False), (True, None, False), (True, 4, False), (True, 4, True), (False, None, True)],
+)
+def test_placements_match_baseline_loop(monkeypatch, seed, vectorized, candidate_servers, change_tracking):
+    monkeypatch.setattr(simulate, "DISTANCE_THRESHOLD", 0.1)
+    monkeypatch.setattr(simulate, "MIGRATION_RECENCY_THRESHOLD", 3)
+    monkeypatch.setattr(simulate, "VECTORIZED_DISTANCES", vectorized)
+    monkeypatch.setattr(simulate, "CANDIDATE_SERVERS", candidate_servers)
+    monkeypatch.setattr(simulate, "CHANGE_TRACKING", change_tracking)
+
+    expected = simulate_placements(seed, baseline_resource_management_algorithm)
+
+    def resource_management_algorithm(espy: SimpleNamespace):
+        monkeypatch.setattr(simulate, "espy", espy)
+        simulate.resource_management_algorithm(parameters={})
+
+    assert simulate_placements(seed, resource_management_algorithm) == expected
+    assert any(step > 0 for step, _, _ in expected)  # Reallocations are compared too
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility import map_build, scenario_cache  # noqa: E402
+
+
+@pytest.fixture
+def cache_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scenario_cache, "SCENARIO_CACHE_DIRECTORY", str(tmp_path / "cache"))
+    return tmp_path
+
+
+def test_file_hash_is_reused_while_the_file_is_unchanged(tmp_path, monkeypatch):
+    csv_path = tmp_path / "cell-towers.csv"
+    csv_path.write_text("radio,mcc\nGSM,724\n")
+    expected = map_build.file_sha256(str(csv_path), cache_dir=None)
+    assert map_build.file_sha256(str(csv_path), cache_dir=str(tmp_path)) == expected
+
+    with monkeypatch.context() as patch:
+        patch.setattr(map_build.hashlib, "sha256", lambda *args: pytest.fail("The unchanged file was hashed again"))
+        assert map_build.file_sha256(str(csv_path), cache_dir=str(tmp_path)) == expected
+        assert map_build.recorded_file_sha256(str(csv_path), cache_dir=str(tmp_path)) == expected
+
+    # A change of size (or modification time) hashes the file again
+    csv_path.write_text("radio,mcc\nGSM,724\nLTE,724\n")
+    assert map_build.file_sha256(str(csv_path), cache_dir=str(tmp_path)) == map_build.file_sha256(str(csv_path), cache_dir=None)
+    assert map_build.file_sha256(str(csv_path), cache_dir=None) != expected
+
+
+def test_links_point_to_the_cached_file(cache_directory):
+    os.makedirs(scenario_cache.scenario_directory("abc"))
+    with open(os.path.join(scenario_cache.scenario_directory("abc"), "dataset.json"), "w") as output_file:
+        output_file.write("{}")
+
+    scenario_cache.link_cached_file("abc", "dataset.json", "datasets/dataset.json")
+    assert os.path.islink("datasets/dataset.json")
+    with open("datasets/dataset.json") as input_file:
+        assert input_file.read() == "{}"
+
+    # Links of files the scenario does not have are removed
+    scenario_cache.link_cached_file("def", "dataset.json", "datasets/dataset.json")
+    assert not os.path.lexists("datasets/dataset.json")
+
+
+def test_regular_files_are_never_removed(cache_directory, capsys):
+    os.makedirs(scenario_cache.scenario_directory("abc"))
+    with open(os.path.join(scenario_cache.scenario_directory("abc"), "dataset.json"), "w") as output_file:
+        output_file.write("{}")
+    os.makedirs("datasets")
+    with open("datasets/dataset.json", "w") as output_file:
+        output_file.write("previous")
+
+    with pytest.raises(FileExistsError):
+        scenario_cache.link_cached_file("abc", "dataset.json", "datasets/dataset.json")
+    scenario_cache.link_cached_file("def", "dataset.json", "datasets/dataset.json")
+    assert "Warning" in capsys.readouterr().out
+
+    assert not os.path.islink("datasets/dataset.json")
+    with open("datasets/dataset.json") as input_file:
+        assert input_file.read() == "previous"
+
+
+def test_cached_scenario_is_found_without_the_cell_tower_dump(cache_directory):
+    parameters = {"map_build": {"cell_towers_sha256": "0123"}, "scenario_build": {"seed": 0}}
+    os.makedirs(scenario_cache.scenario_directory(scenario_cache.scenario_fingerprint(parameters)))
+    scenario_cache.mark_cached(scenario_cache.scenario_fingerprint(parameters), parameters)
+
+    without_dump = {"map_build": {"cell_towers_sha256": None}, "scenario_build": {"seed": 0}}
+    assert scenario_cache.find_cached_fingerprint(without_dump) == scenario_cache.scenario_fingerprint(parameters)
+    assert scenario_cache.find_cached_fingerprint({**without_dump, "scenario_build": {"seed": 1}}) is None
@@ -0,0 +1,189 @@
+from types import SimpleNamespace
+
+import networkx as nx
+import numpy as np
+import pytest
+
+pytest.importorskip("EdgeSimPy")
+
+from espy_user_mobility.delay_matrix import DelayMatrix  # noqa: E402
+from espy_user_mobility.snapshot import (  # noqa: E402
+    TopologySnapshot,
+    attach_snapshot,
+    open_snapshot,
+    restore_network_links,
+    without_network_links,
+)
+
+
+class Switch:
+    def __init__(self, id: int):
+        self.id = id
+        self.coordinates = (2 * (id % 4), id // 4)
+
+    def __repr__(self) -> str:
+        return f"Switch_{self.id}"
+
+
+class Link(dict):
+    # Attributes are stored as items, as in EdgeSimPy's NetworkLink (the items are the edge data read by NetworkX)
+    def __getattr__(self, attribute_name):
+        try:
+            return self[attribute_name]
+        except KeyError:
+            raise AttributeError(attribute_name) from None
+
+    def __setattr__(self, attribute_name, attribute_value):
+        self[attribute_name] = attribute_value
+
+
+# (first switch ID, second switch ID, delay), listed in the order of the link IDs
+LINKS = [(index % 12 + 1, (index + 1) % 12 + 1, 1 + index % 4) for index in range(12)] + [(7, 1, 3), (4, 10, 2)]
+
+
+def build_topology(switches: list[Switch]) -> nx.Graph:
+    nodes = {switch.id: switch for switch in switches}
+    topology = nx.Graph()
+    topology.add_nodes_from(switches)
+    for link_id, (node_id, neighbor_id, delay) in enumerate(LINKS, start=1):
+        link = Link(id=link_id, delay=delay, bandwidth=10 * link_id, nodes=[nodes[node_id], nodes[neighbor_id]])
+        topology.add_edge(nodes[node_id], nodes[neighbor_id])
+        topology._adj[nodes[node_id]][nodes[neighbor_id]] = link
+        topology._adj[nodes[neighbor_id]][nodes[node_id]] = link
+    return topology
+
+
+@pytest.fixture
+def topology() -> nx.Graph:
+    return build_topology([Switch(id) for id in range(1, 13)])
+
+
+def build_snapshot(topology: nx.Graph, delay_matrix: DelayMatrix | None = None) -> TopologySnapshot:
+    switches = sorted(topology.nodes(), key=lambda node: node.id)
+    base_stations = [SimpleNamespace(id=switch.id, coordinates=switch.coordinates, network_switch=switch) for switch in switches]
+    servers = [SimpleNamespace(id=1, coordinates=(0, 0), cpu=8, memory=8192, disk=0, network_switch=switches[4])]
+    return TopologySnapshot.build(topology=topology, base_stations=base_stations, servers=servers, delay_matrix=delay_matrix)
+
+
+def export_dataset(topology: nx.Graph) -> dict:
+    # Layout of EdgeSimPy's datasets (only the parts read by the snapshot)
+    links = sorted({id(link): link for _, _, link in topology.edges(data=True)}.values(), key=lambda link: link.id)
+    return {
+        "NetworkSwitch": [
+            {
+                "attributes": {"id": switch.id, "coordinates": switch.coordinates},
+                "relationships": {
+                    "power_model": "ConstantPowerModel",
+                    "links": [{"class": "NetworkLink", "id": link.id} for link in links if switch in link.nodes],
+                },
+            }
+            for switch in topology.nodes()
+        ],
+        "NetworkLink": [
+            {"attributes": {"id": link.id, "delay": link.delay, "bandwidth": link.bandwidth}, "relationships": {}}
+            for link in links
+        ],
+    }
+
+
+def topology_switch(topology: nx.Graph, switch_id: int) -> Switch:
+    return next(node for node in topology.nodes() if node.id == switch_id)
+
+
+def test_saved_snapshot_is_memory_mapped(topology, tmp_path):
+    file_path = str(tmp_path / "topology.snapshot")
+    build_snapshot(topology).save(file_path)
+
+    snapshot = open_snapshot(file_path)
+    assert snapshot is not None and snapshot.mapped_file is not None
+    assert not snapshot["adjacency_indices"].flags.writeable
+    assert snapshot["server_switches"].tolist() == [4]
+    np.testing.assert_array_equal(snapshot["base_station_coordinates"][2], topology_switch(topology, 3).coordinates)
+
+    neighbors, delays, bandwidths = snapshot.neighbors(1)
+    assert neighbors.tolist() == [2, 7, 12]
+    assert delays.tolist() == [1, 3, 4] and bandwidths.tolist() == [10, 130, 120]
+
+
+def test_network_links_are_rebuilt_from_the_snapshot(topology, tmp_path):
+    file_path = str(tmp_path / "topology.snapshot")
+    build_snapshot(topology).save(file_path)
+    snapshot = open_snapshot(file_path)
+    input_data = export_dataset(topology)
+    assert snapshot.matches_dataset(input_data)
+
+    scenario, switch_relationships = without_network_links(input_data)
+    assert "NetworkLink" not in scenario and switch_relationships == ["links"]
+    assert all(metadata["relationships"]["links"] == [] for metadata in scenario["NetworkSwitch"])
+    assert len(input_data["NetworkLink"]) == len(LINKS) and len(input_data["NetworkSwitch"][0]["relationships"]["links"]) > 0
+
+    # Network switches loaded without their links, as EdgeSimPy's Simulator.initialize would create them
+    loaded = nx.Graph()
+    loaded.add_nodes_from(Switch(metadata["attributes"]["id"]) for metadata in scenario["NetworkSwitch"])
+    registered = []
+    links = restore_network_links(
+        loaded,
+        snapshot,
+        link_class=Link,
+        switch_relationships=switch_relationships,
+        initialize_agent=lambda agent: registered.append(agent),
+    )
+
+    expected = build_topology(sorted(loaded.nodes(), key=lambda node: node.id))
+    assert registered == links and [link.id for link in links] == list(range(1, len(LINKS) + 1))
+    for node in loaded.nodes():
+        # Same neighbors in the same order, so NetworkX picks the same paths among equally short ones
+        assert list(loaded[node]) == list(expected[node])
+        for neighbor, link in loaded[node].items():
+            assert {key: link[key] for key in ("id", "delay", "bandwidth", "nodes")} == dict(expected[node][neighbor])
+            assert type(link.delay) is int
+        assert node.links == [link for link in links if node in link.nodes]
+    for origin, target in [(1, 6), (3, 9), (12, 5)]:
+        assert nx.shortest_path(loaded, topology_switch(loaded, origin), topology_switch(loaded, target), weight="delay") == (
+            nx.shortest_path(expected, topology_switch(expected, origin), topology_switch(expected, target), weight="delay")
+        )
+
+
+def test_snapshot_of_another_dataset_keeps_the_parsed_links(topology):
+    snapshot = build_snapshot(topology)
+    input_data = export_dataset(topology)
+    input_data["NetworkLink"] = input_data["NetworkLink"][:-1]
+    assert not snapshot.matches_dataset(input_data)
+
+    input_data = export_dataset(topology)
+    input_data["NetworkLink"].reverse()
+    assert not snapshot.matches_dataset(input_data)
+
+
+def test_attached_snapshot_shares_the_delay_matrix(topology, tmp_path):
+    targets = [node for node in topology.nodes() if node.id % 4 == 0]
+    delay_matrix = DelayMatrix.compute(topology=topology, targets=targets)
+    file_path = str(tmp_path / "topology.snapshot")
+    build_snapshot(topology, delay_matrix=delay_matrix).save(file_path)
+
+    snapshot = open_snapshot(file_path)
+    assert attach_snapshot(topology=topology, snapshot=snapshot)
+
+    assert topology.snapshot is snapshot and not snapshot["delays"].flags.writeable
+    attached = topology.delay_matrix
+    assert np.array_equal(attached.delays, delay_matrix.delays)
+    for target in targets:
+        for node in topology.nodes():
+            assert attached.path(node, target) == delay_matrix.path(node, target)
+
+
+def test_snapshot_of_another_topology_is_ignored(topology):
+    other_topology = nx.relabel_nodes(topology, {node: Switch(node.id + 100) for node in topology.nodes()})
+    delay_matrix = DelayMatrix.compute(topology=other_topology, targets=list(other_topology.nodes())[:2])
+    snapshot = build_snapshot(other_topology, delay_matrix=delay_matrix)
+
+    assert not attach_snapshot(topology=topology, snapshot=snapshot)
+    assert not hasattr(topology, "delay_matrix")
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    file_path = tmp_path / "topology.snapshot"
+    file_path.write_bytes(b"NOTASNAP" + bytes(64))
+
+    assert open_snapshot(str(file_path)) is None
+    assert open_snapshot(str(tmp_path / "missing.snapshot")) is None
@@ -0,0 +1,67 @@
+from math import dist
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from espy_user_mobility.spatial_index import ServerSpatialIndex
+
+
+def make_servers(seed: int, servers: int = 120) -> list:
+    generator = np.random.default_rng(seed)
+    return [
+        SimpleNamespace(id=server_id, coordinates=tuple(generator.integers(0, 60, size=2).tolist()))
+        for server_id in range(1, servers + 1)
+    ]
+
+
+@pytest.mark.parametrize("k", [1, 5, 200])
+@pytest.mark.parametrize("seed", range(3))
+def test_nearest_matches_brute_force(k, seed):
+    servers = make_servers(seed)
+    spatial_index = ServerSpatialIndex(servers=servers, cell_size=5)
+
+    for point in [(0, 0), (30.5, 12.25), (75, -10)]:
+        expected = sorted(servers, key=lambda server: (dist(server.coordinates, point), server.id))[:k]
+        assert spatial_index.nearest(point, k=k) == expected
+
+
+@pytest.mark.parametrize("radius", [0, 3, 10.5, 100])
+@pytest.mark.parametrize("seed", range(3))
+def test_within_matches_brute_force(radius, seed):
+    servers = make_servers(seed)
+    spatial_index = ServerSpatialIndex(servers=servers, cell_size=5)
+
+    for point in [(0, 0), (30.5, 12.25), (75, -10)]:
+        expected = sorted(
+            (server for server in servers if dist(server.coordinates, point) <= radius and server.id % 2 == 0),
+            key=lambda server: (dist(server.coordinates, point), server.id),
+        )
+        assert spatial_index.within(point, radius=radius, predicate=lambda server: server.id % 2 == 0) == expected
+
+
+def test_queries_follow_removed_and_moved_servers():
+    servers = make_servers(0)
+    spatial_index = ServerSpatialIndex(servers=servers, cell_size=5)
+    for server in servers[:60]:
+        spatial_index.remove(server)
+    servers[60].coordinates = (500, 500)
+    spatial_index.add(servers[60])
+
+    remaining = servers[60:]
+    for point in [(0, 0), (490, 480)]:
+        expected = sorted(remaining, key=lambda server: (dist(server.coordinates, point), server.id))[:3]
+        assert spatial_index.nearest(point, k=3) == expected
+    assert spatial_index.within((500, 500), radius=1) == [servers[60]]
+
+
+def test_nearest_breaks_ties_by_id_across_rings():
+    # Both servers are 3 units away from the query point, the one with the higher ID in the query point's cell
+    servers = [SimpleNamespace(id=2, coordinates=(1, 4)), SimpleNamespace(id=1, coordinates=(-2, 1))]
+    spatial_index = ServerSpatialIndex(servers=servers, cell_size=5)
+    point = (1, 1)
+
+    assert spatial_index._cell_of(servers[0].coordinates) == spatial_index._cell_of(point)
+    assert spatial_index._cell_of(servers[1].coordinates) != spatial_index._cell_of(point)
+    assert spatial_index.nearest(point, k=1) == [servers[1]]
+    assert spatial_index.nearest(point, k=2) == [servers[1], servers[0]]